@@ -0,0 +1,151 @@
+"""Proxy overhead of parsing streamed chat completions, in tokens per second.
+
+Feeds a synthetic stream of OpenAI SSE chunks and Ollama NDJSON lines through
+the parsing done for every proxied token and reports how many tokens per
+second each path sustains on one core. Upstream chunking is varied: one line
+per chunk, lines split at random points, and many lines merged per chunk. The
+baseline is the per-chunk decode, strip and json.loads that only handled one
+line per chunk. Run from the backend directory, with and without orjson
+installed:
+
+    python -m benchmarks.stream_proxy --tokens 200000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from open_webui.utils import stream
+from open_webui.utils.response import convert_streaming_response_ollama_to_openai
+
+
+def openai_lines(tokens: int) -> list[bytes]:
+    lines = []
+    for i in range(tokens):
+        chunk = {
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion.chunk",
+            "created": 1700000000,
+            "model": "benchmark",
+            "choices": [{"index": 0, "delta": {"content": f" tok{i}"}}],
+        }
+        lines.append(f"data: {json.dumps(chunk)}\n\n".encode())
+    lines.append(b"data: [DONE]\n\n")
+    return lines
+
+
+def ollama_lines(tokens: int) -> list[bytes]:
+    lines = []
+    for i in range(tokens):
+        chunk = {
+            "model": "benchmark",
+            "created_at": "2024-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": f" tok{i}"},
+            "done": False,
+        }
+        lines.append(f"{json.dumps(chunk)}\n".encode())
+    lines.append(b'{"model": "benchmark", "done": true, "eval_count": 1}\n')
+    return lines
+
+
+def rechunk(lines: list[bytes], mode: str) -> list[bytes]:
+    if mode == "line":
+        return lines
+
+    data = b"".join(lines)
+    rng = random.Random(0)
+    if mode == "split":
+        sizes = (1, 128)
+    else:
+        sizes = (4096, 16384)
+
+    chunks = []
+    offset = 0
+    while offset < len(data):
+        size = rng.randint(*sizes)
+        chunks.append(data[offset : offset + size])
+        offset += size
+    return chunks
+
+
+async def aiter_chunks(chunks: list[bytes]):
+    for chunk in chunks:
+        yield chunk
+
+
+async def baseline_sse(chunks: list[bytes]) -> int:
+    count = 0
+    for line in chunks:
+        line = line.decode("utf-8")
+        if not line.strip() or not line.startswith("data: "):
+            continue
+        try:
+            data = json.loads(line[len("data: ") :])
+            if data["choices"][0]["delta"].get("content"):
+                count += 1
+        except Exception:
+            continue
+    return count
+
+
+async def framed_sse(chunks: list[bytes]) -> int:
+    count = 0
+    async for data in stream.iter_sse_data(aiter_chunks(chunks)):
+        if data == b"[DONE]":
+            continue
+        data = stream.loads(data)
+        if data["choices"][0]["delta"].get("content"):
+            count += 1
+    return count
+
+
+async def ollama_conversion(chunks: list[bytes]) -> int:
+    class Response:
+        body_iterator = aiter_chunks(chunks)
+
+    count = 0
+    async for _ in convert_streaming_response_ollama_to_openai(Response()):
+        count += 1
+    return count
+
+
+def measure(fn, chunks: list[bytes], tokens: int, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(fn(chunks))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return tokens / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"JSON backend: {'orjson' if stream.orjson is not None else 'json'}")
+    print(f"{'path':<22}{'chunking':<10}{'tokens/s':>14}")
+
+    sse = openai_lines(args.tokens)
+    ndjson = ollama_lines(args.tokens)
+    for mode in ("line", "split", "merged"):
+        if mode == "line":
+            # The baseline miscounts when chunks don't align with lines
+            rate = measure(baseline_sse, sse, args.tokens, args.repeat)
+            print(f"{'sse baseline':<22}{mode:<10}{rate:>14,.0f}")
+
+        rate = measure(framed_sse, rechunk(sse, mode), args.tokens, args.repeat)
+        print(f"{'sse framed':<22}{mode:<10}{rate:>14,.0f}")
+
+        rate = measure(
+            ollama_conversion, rechunk(ndjson, mode), args.tokens, args.repeat
+        )
+        print(f"{'ollama -> openai':<22}{mode:<10}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Throughput of the Whisper worker pool per model size.
+
+Transcribes the same recording with several concurrent requests for each
+model and reports wall time, audio seconds transcribed per second and the
+real-time factor. Run from the backend directory:
+
+    python -m benchmarks.whisper_transcription recording.wav \
+        --models tiny base small --workers 2 --requests 4
+"""
+
+import argparse
+import asyncio
+import time
+
+from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
+
+from open_webui.utils.transcription import SAMPLE_RATE, WhisperWorkerPool
+
+
+async def run(pool: WhisperWorkerPool, file_path: str, requests: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[pool.transcribe(file_path) for _ in range(requests)])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="audio file to transcribe")
+    parser.add_argument("--models", nargs="+", default=["tiny", "base", "small"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--chunk-seconds", type=int, default=30)
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    args = parser.parse_args()
+
+    audio_seconds = (
+        len(decode_audio(args.file, sampling_rate=SAMPLE_RATE)) / SAMPLE_RATE
+    )
+    print(
+        f"{args.file}: {audio_seconds:.1f}s of audio, {args.requests} concurrent "
+        f"requests, {args.workers} workers, {args.chunk_seconds}s chunks"
+    )
+    print(f"{'model':<12}{'load s':>10}{'wall s':>10}{'audio s/s':>12}{'RTF':>8}")
+
+    for model_name in args.models:
+        start = time.perf_counter()
+        model = WhisperModel(
+            model_name,
+            device=args.device,
+            compute_type=args.compute_type,
+            num_workers=args.workers,
+        )
+        load_time = time.perf_counter() - start
+
+        pool = WhisperWorkerPool(args.workers, args.chunk_seconds)
+        pool.set_model(model, model_name)
+
+        # Warm up so the first measured request doesn't pay for lazy initialization
+        asyncio.run(run(pool, args.file, 1))
+        wall_time = asyncio.run(run(pool, args.file, args.requests))
+
+        throughput = audio_seconds * args.requests / wall_time
+        print(
+            f"{model_name:<12}{load_time:>10.1f}{wall_time:>10.1f}"
+            f"{throughput:>12.1f}{wall_time / (audio_seconds * args.requests):>8.3f}"
+        )
+        pool.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
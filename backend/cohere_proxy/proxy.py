@@ -6,6 +6,8 @@ from fastapi.responses import JSONResponse
 import botocore.exceptions
 
 from utils.aws import bedrock_client
+from utils.batching import EmbeddingBatcher
+from utils.cache import EmbeddingCache
 from utils.logs import setup_logging, structlog_context_middleware_factory
 
 
@@ -19,6 +21,55 @@ app.add_middleware(structlog_context_middleware_factory("cohere_proxy.http"))
 model_id = os.getenv("COHERE_EMBED_MODEL_ID", "You forgot to set COHERE_EMBED_MODEL_ID")
 
 
+def invoke_embed_model(texts: list, input_type: str) -> list:
+    body = json.dumps(
+        {
+            "texts": texts,
+            "input_type": input_type,  # You can change this to 'search_query', 'classification', or 'clustering' based on your use case  # noqa E501
+        }
+    )
+
+    response = bedrock_client.invoke_model(
+        body=body,
+        modelId=model_id,
+        accept="application/json",
+        contentType="application/json",
+    )
+
+    response_body = json.loads(response.get("body").read())
+    return response_body.get("embeddings")
+
+
+embedding_batcher = EmbeddingBatcher(invoke_embed_model)
+embedding_cache = EmbeddingCache()
+
+
+async def get_embeddings(texts: list, input_type: str) -> list:
+    keys = [EmbeddingCache.get_key(model_id, input_type, text) for text in texts]
+    embeddings = await embedding_cache.get_many(keys)
+
+    # Embed each distinct missing text once, even if it repeats in the request
+    missing = {}
+    for key, text, embedding in zip(keys, texts, embeddings):
+        if embedding is None:
+            missing.setdefault(key, text)
+
+    if missing:
+        new_embeddings = dict(
+            zip(
+                missing.keys(),
+                await embedding_batcher.embed(list(missing.values()), input_type),
+            )
+        )
+        await embedding_cache.set_many(new_embeddings)
+        embeddings = [
+            embedding if embedding is not None else new_embeddings[key]
+            for key, embedding in zip(keys, embeddings)
+        ]
+
+    return embeddings
+
+
 @app.post("/embeddings")
 async def proxy_embeddings(request: Request):
     try:
@@ -27,6 +78,8 @@ async def proxy_embeddings(request: Request):
         logger.debug(f"Cohere request body: {body}")
 
         body_input = body.get("input")
+        if isinstance(body_input, str):
+            body_input = [body_input]
         input_type = "search_query" if len(body_input) == 1 else "search_document"
 
         tokens = 0
@@ -34,22 +87,7 @@ async def proxy_embeddings(request: Request):
             words = input.split(" ")
             tokens += len(words) / 0.75  # we can get accurate token count from tiktoken
 
-        body = json.dumps(
-            {
-                "texts": body_input,
-                "input_type": input_type,  # You can change this to 'search_query', 'classification', or 'clustering' based on your use case  # noqa E501
-            }
-        )
-
-        response = bedrock_client.invoke_model(
-            body=body,
-            modelId=model_id,
-            accept="application/json",
-            contentType="application/json",
-        )
-
-        response_body = json.loads(response.get("body").read())
-        embeddings = response_body.get("embeddings")
+        embeddings = await get_embeddings(body_input, input_type)
 
         response_obj = {}
         response_obj["model"] = model_id
@@ -57,11 +95,11 @@ async def proxy_embeddings(request: Request):
         response_obj["usage"]["prompt_tokens"] = tokens
         response_obj["usage"]["total_tokens"] = tokens
         response_obj["data"] = []
-        for e in embeddings:
+        for idx, e in enumerate(embeddings):
             response_obj["data"].append(
                 {
                     "object": "embedding",
-                    "index": 0,
+                    "index": idx,
                     "embedding": e,
                 }
             )
@@ -76,6 +114,11 @@ async def proxy_embeddings(request: Request):
         return JSONResponse(status_code=500, content={"error": "Internal server error"})
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    return embedding_cache.get_stats()
+
+
 @app.get("/health")
 async def health():
     is_healthy = False
@@ -50,7 +50,9 @@ retry_config = Config(
     retries={
         "max_attempts": 5,  # Maximum number of retry attempts
         "mode": "standard",  # Retry mode: 'standard' or 'adaptive'
-    }
+    },
+    # One connection per concurrent embedding batch
+    max_pool_connections=int(os.getenv("COHERE_MAX_CONCURRENT_REQUESTS", "16")),
 )
 
 session = refreshable_session(ROLE_ARN)
@@ -0,0 +1,126 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+from typing import Callable, List
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Bedrock's Cohere embed models accept at most 96 texts per invoke_model call.
+COHERE_MAX_BATCH_SIZE = int(os.getenv("COHERE_MAX_BATCH_SIZE", "96"))
+# How long to hold a partial batch open for texts from concurrent requests.
+COHERE_BATCH_WAIT_MS = int(os.getenv("COHERE_BATCH_WAIT_MS", "5"))
+# Number of invoke_model calls allowed in flight at once.
+COHERE_MAX_CONCURRENT_REQUESTS = int(os.getenv("COHERE_MAX_CONCURRENT_REQUESTS", "16"))
+
+
+class EmbeddingBatcher:
+    """Coalesces texts from concurrent requests into Bedrock-sized batches.
+
+    Every text gets its own future, so callers get their embeddings back in
+    input order regardless of how the texts were grouped. Batches are keyed by
+    input_type because Cohere applies it to the whole call. The blocking
+    ``embed_fn(texts, input_type)`` runs on a dedicated thread pool so the event
+    loop is never blocked on Bedrock. If a batch that mixes requests fails, the
+    texts of each request are retried on their own, so a bad input only fails
+    the request that sent it.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str], str], List[List[float]]],
+        max_batch_size: int = COHERE_MAX_BATCH_SIZE,
+        max_wait_ms: int = COHERE_BATCH_WAIT_MS,
+        max_concurrency: int = COHERE_MAX_CONCURRENT_REQUESTS,
+    ):
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="cohere-embed"
+        )
+
+        self._pending = {}
+        self._flush_handles = {}
+        self._tasks = set()
+
+    async def embed(self, texts: List[str], input_type: str) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        # Identifies this call's texts within a batch
+        request = object()
+
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            pending = self._pending.setdefault(input_type, [])
+            pending.append((text, future, request))
+            futures.append(future)
+
+            if len(pending) >= self.max_batch_size:
+                self._flush(input_type)
+
+        if self._pending.get(input_type) and input_type not in self._flush_handles:
+            self._flush_handles[input_type] = loop.call_later(
+                self.max_wait, self._flush, input_type
+            )
+
+        # Wait for every text so no future is left with an unretrieved error
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    def _flush(self, input_type: str):
+        handle = self._flush_handles.pop(input_type, None)
+        if handle:
+            handle.cancel()
+
+        batch = self._pending.pop(input_type, None)
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run_batch(batch, input_type))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _embed(self, texts: List[str], input_type: str) -> List[List[float]]:
+        embeddings = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.embed_fn, texts, input_type
+        )
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        return embeddings
+
+    async def _run_batch(self, batch, input_type: str):
+        texts = [text for text, _, _ in batch]
+        logger.debug("Embedding batch", size=len(texts), input_type=input_type)
+
+        try:
+            embeddings = await self._embed(texts, input_type)
+        except Exception as e:
+            requests = {}
+            for item in batch:
+                requests.setdefault(item[2], []).append(item)
+
+            if len(requests) > 1:
+                logger.warning(
+                    f"Embedding batch failed, retrying per request: {e}",
+                    requests=len(requests),
+                )
+                await asyncio.gather(
+                    *[self._run_batch(items, input_type) for items in requests.values()]
+                )
+                return
+
+            logger.error(f"Embedding batch failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), embedding in zip(batch, embeddings):
+            # The request may have been cancelled while the batch was in flight
+            if not future.done():
+                future.set_result(embedding)
@@ -0,0 +1,110 @@
+from array import array
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from typing import List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Entries kept in process memory. A 1024-dim embedding is stored as 8 KB of doubles.
+COHERE_CACHE_MAX_ENTRIES = int(os.getenv("COHERE_CACHE_MAX_ENTRIES", "10000"))
+# Optional shared tier; leave unset to cache in memory only.
+COHERE_CACHE_REDIS_URL = os.getenv("COHERE_CACHE_REDIS_URL", None)
+COHERE_CACHE_TTL = int(os.getenv("COHERE_CACHE_TTL", str(7 * 24 * 60 * 60)))
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with an in-memory LRU and optional Redis tier.
+
+    Entries are keyed by the SHA-256 of (model id, input type, text), so the same
+    text embedded as a query and as a document are cached separately.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = COHERE_CACHE_MAX_ENTRIES,
+        redis_url: Optional[str] = COHERE_CACHE_REDIS_URL,
+        ttl: int = COHERE_CACHE_TTL,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+        self.redis = None
+        if redis_url:
+            import redis.asyncio
+
+            self.redis = redis.asyncio.from_url(redis_url)
+            logger.info("Embedding cache using Redis tier")
+
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "errors": 0}
+
+    @staticmethod
+    def get_key(model_id: str, input_type: str, text: str) -> str:
+        digest = hashlib.sha256(
+            f"{model_id}\x00{input_type}\x00{text}".encode("utf-8")
+        ).hexdigest()
+        return f"cohere_proxy:embedding:{digest}"
+
+    def _remember(self, key: str, embedding: List[float]):
+        self._entries[key] = array("d", embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        """Return the cached embedding for each key, or None for a miss."""
+        results = [None] * len(keys)
+
+        redis_lookups = []
+        for idx, key in enumerate(keys):
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                results[idx] = embedding.tolist()
+                self.stats["memory_hits"] += 1
+            else:
+                redis_lookups.append(idx)
+
+        if redis_lookups and self.redis is not None:
+            try:
+                values = await self.redis.mget([keys[idx] for idx in redis_lookups])
+                for idx, value in zip(redis_lookups, values):
+                    if value is not None:
+                        results[idx] = json.loads(value)
+                        self._remember(keys[idx], results[idx])
+                        self.stats["redis_hits"] += 1
+            except Exception as e:
+                logger.error(f"Embedding cache Redis read failed: {e}")
+                self.stats["errors"] += 1
+
+        self.stats["misses"] += sum(1 for result in results if result is None)
+        return results
+
+    async def set_many(self, items: dict):
+        for key, embedding in items.items():
+            self._remember(key, embedding)
+
+        if items and self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, embedding in items.items():
+                    pipe.set(key, json.dumps(embedding), ex=self.ttl)
+                await pipe.execute()
+            except Exception as e:
+                logger.error(f"Embedding cache Redis write failed: {e}")
+                self.stats["errors"] += 1
+
+    def get_stats(self) -> dict:
+        hits = self.stats["memory_hits"] + self.stats["redis_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": hits / lookups if lookups else None,
+            "redis_enabled": self.redis is not None,
+        }
@@ -374,6 +374,17 @@ class StorageProviderConfig(Config):
 UPLOAD_DIR = f"{DATA_DIR}/uploads"
 Path(UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
 
+# Uploads are streamed to storage in chunks of this many bytes
+UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+
+# Concurrent S3 requests (connection pool size, parallel transfers and deletes)
+S3_MAX_CONCURRENCY = int(os.environ.get("S3_MAX_CONCURRENCY", 32))
+
+# S3 multipart part size; S3 requires at least 5 MiB for every part but the last
+S3_MULTIPART_PART_SIZE = max(
+    int(os.environ.get("S3_MULTIPART_PART_SIZE", 8 * 1024 * 1024)), 5 * 1024 * 1024
+)
+
 
 ####################################
 # Cache DIR
@@ -382,6 +393,17 @@ Path(UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
 CACHE_DIR = f"{DATA_DIR}/cache"
 Path(CACHE_DIR).mkdir(parents=True, exist_ok=True)
 
+# Local read-through cache for files stored in S3
+S3_CACHE_DIR = f"{CACHE_DIR}/s3"
+S3_CACHE_MAX_SIZE = int(os.environ.get("S3_CACHE_MAX_SIZE", 2 * 1024 * 1024 * 1024))
+# Seconds a cached object's ETag is trusted before it is checked against S3 again
+S3_CACHE_VALIDATE_TTL = int(os.environ.get("S3_CACHE_VALIDATE_TTL", 300))
+
+# Synthesized speech cache bounds
+SPEECH_CACHE_DIR = f"{CACHE_DIR}/audio/speech"
+SPEECH_CACHE_MAX_SIZE = int(os.environ.get("SPEECH_CACHE_MAX_SIZE", 1024 * 1024 * 1024))
+SPEECH_CACHE_MAX_AGE = int(os.environ.get("SPEECH_CACHE_MAX_AGE", 30 * 24 * 60 * 60))
+
 
 ####################################
 # OLLAMA_BASE_URL
@@ -392,6 +392,149 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_OPENAI_MODEL_LIST = 5
 
+# Seconds a backend model list is served before it is refreshed in the background
+try:
+    MODEL_LIST_CACHE_TTL = int(os.environ.get("MODEL_LIST_CACHE_TTL", "60"))
+except Exception:
+    MODEL_LIST_CACHE_TTL = 60
+
+# Upper bound in seconds on the retry backoff for unreachable backends
+try:
+    MODEL_LIST_CACHE_MAX_BACKOFF = int(
+        os.environ.get("MODEL_LIST_CACHE_MAX_BACKOFF", "300")
+    )
+except Exception:
+    MODEL_LIST_CACHE_MAX_BACKOFF = 300
+
+# Shares model lists between replicas; set to an empty string to disable
+MODEL_LIST_CACHE_REDIS_URL = os.environ.get("MODEL_LIST_CACHE_REDIS_URL", REDIS_URL)
+
+####################################
+# TOOLS
+####################################
+
+# Seconds a single tool call may run before it is abandoned; 0 disables
+try:
+    TOOL_CALL_TIMEOUT = int(os.environ.get("TOOL_CALL_TIMEOUT", "60"))
+except Exception:
+    TOOL_CALL_TIMEOUT = 60
+
+# Characters of a tool's output passed on to the model; 0 disables the limit
+try:
+    TOOL_RESULT_MAX_LENGTH = int(os.environ.get("TOOL_RESULT_MAX_LENGTH", "20000"))
+except Exception:
+    TOOL_RESULT_MAX_LENGTH = 20000
+
+####################################
+# FILTER FUNCTIONS
+####################################
+
+# Function changes made through this instance take effect immediately; other
+# replicas pick them up once their compiled filter chains expire
+try:
+    FILTER_CHAIN_CACHE_TTL = int(os.environ.get("FILTER_CHAIN_CACHE_TTL", "60"))
+except Exception:
+    FILTER_CHAIN_CACHE_TTL = 60
+
+# Run outlet filters on the server as the response streams, instead of after
+# the client posts the finished chat back to /api/chat/completed
+ENABLE_STREAMING_OUTLET_FILTERS = (
+    os.environ.get("ENABLE_STREAMING_OUTLET_FILTERS", "False").lower() == "true"
+)
+
+####################################
+# TASK RESPONSE CACHE
+####################################
+
+# Seconds a task model completion (title, tags, queries, ...) is reused; 0 disables
+try:
+    TASK_CACHE_TTL = int(os.environ.get("TASK_CACHE_TTL", "600"))
+except Exception:
+    TASK_CACHE_TTL = 600
+
+try:
+    TASK_CACHE_MAX_ENTRIES = int(os.environ.get("TASK_CACHE_MAX_ENTRIES", "1000"))
+except Exception:
+    TASK_CACHE_MAX_ENTRIES = 1000
+
+####################################
+# PIPELINE FILTERS
+####################################
+
+# Seconds a single pipelines server filter call may take before it is skipped
+try:
+    PIPELINE_FILTER_TIMEOUT = int(os.environ.get("PIPELINE_FILTER_TIMEOUT", "30"))
+except Exception:
+    PIPELINE_FILTER_TIMEOUT = 30
+
+# Consecutive connection failures after which a filter is skipped for the cooldown
+try:
+    PIPELINE_FILTER_BREAKER_THRESHOLD = int(
+        os.environ.get("PIPELINE_FILTER_BREAKER_THRESHOLD", "5")
+    )
+except Exception:
+    PIPELINE_FILTER_BREAKER_THRESHOLD = 5
+
+try:
+    PIPELINE_FILTER_BREAKER_COOLDOWN = int(
+        os.environ.get("PIPELINE_FILTER_BREAKER_COOLDOWN", "30")
+    )
+except Exception:
+    PIPELINE_FILTER_BREAKER_COOLDOWN = 30
+
+####################################
+# WEBHOOK NOTIFICATIONS
+####################################
+
+try:
+    WEBHOOK_MAX_CONCURRENCY = int(os.environ.get("WEBHOOK_MAX_CONCURRENCY", "20"))
+except Exception:
+    WEBHOOK_MAX_CONCURRENCY = 20
+
+try:
+    WEBHOOK_MAX_RETRIES = int(os.environ.get("WEBHOOK_MAX_RETRIES", "3"))
+except Exception:
+    WEBHOOK_MAX_RETRIES = 3
+
+# Seconds to hold notifications for the same webhook URL so they can be sent together
+try:
+    WEBHOOK_BATCH_WINDOW = float(os.environ.get("WEBHOOK_BATCH_WINDOW", "0.5"))
+except Exception:
+    WEBHOOK_BATCH_WINDOW = 0.5
+
+try:
+    WEBHOOK_TIMEOUT = int(os.environ.get("WEBHOOK_TIMEOUT", "10"))
+except Exception:
+    WEBHOOK_TIMEOUT = 10
+
+####################################
+# WHISPER TRANSCRIPTION
+####################################
+
+# Number of faster-whisper transcriptions that run at the same time
+try:
+    WHISPER_WORKERS = int(os.environ.get("WHISPER_WORKERS", "2"))
+except Exception:
+    WHISPER_WORKERS = 2
+
+# Long recordings are split at silences into chunks of at most this many seconds,
+# which are transcribed in parallel
+try:
+    WHISPER_CHUNK_SECONDS = int(os.environ.get("WHISPER_CHUNK_SECONDS", "30"))
+except Exception:
+    WHISPER_CHUNK_SECONDS = 30
+
+####################################
+# IMAGE GENERATION
+####################################
+
+# Seconds image backend metadata (model lists, options, ComfyUI node info) is
+# served from cache before it is refreshed in the background
+try:
+    IMAGE_BACKEND_CACHE_TTL = int(os.environ.get("IMAGE_BACKEND_CACHE_TTL", "300"))
+except Exception:
+    IMAGE_BACKEND_CACHE_TTL = 300
+
 ####################################
 # OFFLINE_MODE
 ####################################
@@ -39,7 +39,7 @@ from fastapi import (
 from fastapi.openapi.docs import get_swagger_ui_html
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -133,6 +133,7 @@ from open_webui.utils.chat import (
     chat_action as chat_action_handler,
 )
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
+from open_webui.utils.metrics import record_stage, render_metrics, timed_stage
 from open_webui.utils.access_control import has_access
 
 from open_webui.utils.auth import (
@@ -142,8 +143,10 @@ from open_webui.utils.auth import (
     refresh_jwt,
     get_current_user,
 )
+from open_webui.utils.model_list_cache import model_list_cache
 from open_webui.utils.oauth import oauth_manager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
+from open_webui.utils.webhook import notification_dispatcher
 
 from open_webui.tasks import stop_task, task_channel_listener
 
@@ -194,8 +197,24 @@ async def lifespan(app: FastAPI):
 
     threading.Thread(target=task_channel_listener, daemon=True).start()
     asyncio.create_task(periodic_usage_pool_cleanup())
+    model_list_cache.start()
+
+    # Load the local Whisper model now rather than on the first transcription
+    if app.state.config.STT_ENGINE == "" and app.state.config.WHISPER_MODEL:
+        try:
+            await asyncio.to_thread(
+                audio.load_whisper_model, app.state.config.WHISPER_MODEL
+            )
+        except Exception as e:
+            log.exception(f"Failed to preload Whisper model: {e}")
+
     yield
 
+    await notification_dispatcher.close()
+    await model_list_cache.close()
+    await images.close_sessions()
+    await pipelines.close_session()
+
 
 app = FastAPI(
     docs_url="/docs" if ENV == "dev" else None,
@@ -479,7 +498,6 @@ app.state.config.TTS_AZURE_SPEECH_REGION = config.TTS_AZURE_SPEECH_REGION
 app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT = config.TTS_AZURE_SPEECH_OUTPUT_FORMAT
 
 
-app.state.faster_whisper_model = None
 app.state.speech_synthesiser = None
 app.state.speech_speaker_embeddings_dataset = None
 
@@ -566,11 +584,12 @@ async def commit_session_after_request(request: Request, call_next):
 
 @app.middleware("http")
 async def check_url(request: Request, call_next):
-    start_time = int(time.time())
+    start_time = time.perf_counter()
+    request.state.start_time = start_time
     request.state.enable_api_key = app.state.config.ENABLE_API_KEY
     response = await call_next(request)
-    process_time = int(time.time()) - start_time
-    response.headers["X-Process-Time"] = str(process_time)
+    process_time = time.perf_counter() - start_time
+    response.headers["X-Process-Time"] = f"{process_time:.4f}"
     return response
 
 
@@ -711,6 +730,7 @@ async def chat_completion(
     user=Depends(get_verified_user),
 ):
     log.debug("chat_completion", form_data=form_data, user=user.email)
+    model_lookup_start_time = time.perf_counter()
     if not request.app.state.MODELS:
         await get_all_models(request)
 
@@ -732,6 +752,11 @@ async def chat_completion(
                     model_id=model_id,
                 )
                 raise e
+        record_stage(
+            "model_lookup",
+            time.perf_counter() - model_lookup_start_time,
+            model=model_id,
+        )
 
         metadata = {
             "user_id": user.id,
@@ -744,9 +769,10 @@ async def chat_completion(
         }
         form_data["metadata"] = metadata
 
-        form_data, events = await process_chat_payload(
-            request, form_data, metadata, user, model
-        )
+        with timed_stage("process_payload", model=model_id):
+            form_data, events = await process_chat_payload(
+                request, form_data, metadata, user, model
+            )
     except Exception as e:
         log.exception("chat_completion error processing payload", exc_info=e)
         raise HTTPException(
@@ -755,7 +781,9 @@ async def chat_completion(
         )
 
     try:
-        response = await chat_completion_handler(request, form_data, user)
+        request.state.upstream_start_time = time.perf_counter()
+        with timed_stage("upstream_response", model=model_id):
+            response = await chat_completion_handler(request, form_data, user)
         return await process_chat_response(
             request, response, form_data, user, events, metadata, tasks
         )
@@ -772,6 +800,13 @@ generate_chat_completions = chat_completion
 generate_chat_completion = chat_completion
 
 
+@app.get("/api/metrics")
+async def get_metrics(user=Depends(get_admin_user)):
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.post("/api/chat/completed")
 async def chat_completed(
     request: Request, form_data: dict, user=Depends(get_verified_user)
@@ -0,0 +1,36 @@
+"""Add message indexes
+
+Revision ID: b5c6e2a1f0d3
+Revises: 3781e22d8b01
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+revision = "b5c6e2a1f0d3"
+down_revision = "3781e22d8b01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Channel timelines page through top-level messages by created_at
+    op.create_index(
+        "message_channel_id_parent_id_created_at_idx",
+        "message",
+        ["channel_id", "parent_id", "created_at"],
+    )
+    # Reply counts and latest reply times are looked up per parent message
+    op.create_index(
+        "message_parent_id_created_at_idx", "message", ["parent_id", "created_at"]
+    )
+    op.create_index(
+        "message_reaction_message_id_idx", "message_reaction", ["message_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("message_reaction_message_id_idx", table_name="message_reaction")
+    op.drop_index("message_parent_id_created_at_idx", table_name="message")
+    op.drop_index("message_channel_id_parent_id_created_at_idx", table_name="message")
@@ -0,0 +1,85 @@
+"""Add channel access table
+
+Revision ID: d1a7f3c92e4b
+Revises: b5c6e2a1f0d3
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+import time
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d1a7f3c92e4b"
+down_revision = "b5c6e2a1f0d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    channel_access = op.create_table(
+        "channel_access",
+        sa.Column("id", sa.Text(), nullable=False, primary_key=True, unique=True),
+        sa.Column("channel_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),  # "*" for public channels
+        sa.Column("permission", sa.Text(), nullable=False),  # "read" or "write"
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+    )
+    op.create_index(
+        "channel_access_user_id_permission_idx",
+        "channel_access",
+        ["user_id", "permission"],
+    )
+    op.create_index("channel_access_channel_id_idx", "channel_access", ["channel_id"])
+
+    # Backfill from existing channels and group memberships
+    conn = op.get_bind()
+    channel_table = sa.table(
+        "channel", sa.column("id", sa.Text()), sa.column("access_control", sa.JSON())
+    )
+    group_table = sa.table(
+        "group", sa.column("id", sa.Text()), sa.column("user_ids", sa.JSON())
+    )
+
+    group_user_ids = {
+        group_id: user_ids or []
+        for group_id, user_ids in conn.execute(
+            sa.select(group_table.c.id, group_table.c.user_ids)
+        )
+    }
+
+    ts = int(time.time_ns())
+    rows = []
+    for channel_id, access_control in conn.execute(
+        sa.select(channel_table.c.id, channel_table.c.access_control)
+    ):
+        for permission in ["read", "write"]:
+            if access_control is None:
+                user_ids = {"*"} if permission == "read" else set()
+            else:
+                permission_access = access_control.get(permission, {})
+                user_ids = set(permission_access.get("user_ids", []))
+                for group_id in permission_access.get("group_ids", []):
+                    user_ids.update(group_user_ids.get(group_id, []))
+
+            rows.extend(
+                {
+                    "id": str(uuid.uuid4()),
+                    "channel_id": channel_id,
+                    "user_id": user_id,
+                    "permission": permission,
+                    "created_at": ts,
+                }
+                for user_id in user_ids
+            )
+
+    if rows:
+        op.bulk_insert(channel_access, rows)
+
+
+def downgrade():
+    op.drop_index("channel_access_channel_id_idx", table_name="channel_access")
+    op.drop_index("channel_access_user_id_permission_idx", table_name="channel_access")
+    op.drop_table("channel_access")
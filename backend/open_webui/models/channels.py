@@ -4,10 +4,10 @@ import uuid
 from typing import Optional
 
 from open_webui.internal.db import Base, get_db
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import get_user_ids_with_access
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -34,6 +34,28 @@ class Channel(Base):
     updated_at = Column(BigInteger)
 
 
+# Materialized user -> channel access, derived from each channel's
+# access_control and the membership of the groups it references. A channel
+# readable by everyone (access_control is None) gets a single "*" row.
+PUBLIC_ACCESS_USER_ID = "*"
+
+
+class ChannelAccess(Base):
+    __tablename__ = "channel_access"
+
+    id = Column(Text, primary_key=True)
+    channel_id = Column(Text)
+    user_id = Column(Text)
+    permission = Column(Text)
+
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        Index("channel_access_user_id_permission_idx", "user_id", "permission"),
+        Index("channel_access_channel_id_idx", "channel_id"),
+    )
+
+
 class ChannelModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -85,6 +107,7 @@ class ChannelTable:
             new_channel = Channel(**channel.model_dump())
 
             db.add(new_channel)
+            self._set_channel_access(db, channel.id, channel.access_control)
             db.commit()
             return channel
 
@@ -96,13 +119,61 @@ class ChannelTable:
     def get_channels_by_user_id(
         self, user_id: str, permission: str = "read"
     ) -> list[ChannelModel]:
-        channels = self.get_channels()
-        return [
-            channel
-            for channel in channels
-            if channel.user_id == user_id
-            or has_access(user_id, permission, channel.access_control)
-        ]
+        with get_db() as db:
+            accessible_channel_ids = select(ChannelAccess.channel_id).where(
+                ChannelAccess.permission == permission,
+                ChannelAccess.user_id.in_([user_id, PUBLIC_ACCESS_USER_ID]),
+            )
+            channels = (
+                db.query(Channel)
+                .filter(
+                    or_(
+                        Channel.user_id == user_id,
+                        Channel.id.in_(accessible_channel_ids),
+                    )
+                )
+                .all()
+            )
+            return [ChannelModel.model_validate(channel) for channel in channels]
+
+    def _set_channel_access(self, db, channel_id: str, access_control: Optional[dict]):
+        db.query(ChannelAccess).filter(ChannelAccess.channel_id == channel_id).delete()
+
+        ts = int(time.time_ns())
+        for permission in ["read", "write"]:
+            if access_control is None:
+                # Mirrors has_access: no access control means public read only
+                user_ids = {PUBLIC_ACCESS_USER_ID} if permission == "read" else set()
+            else:
+                user_ids = get_user_ids_with_access(permission, access_control)
+
+            db.add_all(
+                [
+                    ChannelAccess(
+                        id=str(uuid.uuid4()),
+                        channel_id=channel_id,
+                        user_id=user_id,
+                        permission=permission,
+                        created_at=ts,
+                    )
+                    for user_id in user_ids
+                ]
+            )
+
+    def sync_channel_access_by_group_id(self, group_id: str):
+        """Rebuild the access rows of every channel that grants access to a group.
+
+        Call after the group's members change or the group is deleted.
+        """
+        with get_db() as db:
+            for channel in db.query(Channel).filter(Channel.access_control.isnot(None)):
+                access_control = channel.access_control or {}
+                if any(
+                    group_id in access_control.get(permission, {}).get("group_ids", [])
+                    for permission in ["read", "write"]
+                ):
+                    self._set_channel_access(db, channel.id, access_control)
+            db.commit()
 
     def get_channel_by_id(self, id: str) -> Optional[ChannelModel]:
         with get_db() as db:
@@ -123,12 +194,14 @@ class ChannelTable:
             channel.access_control = form_data.access_control
             channel.updated_at = int(time.time_ns())
 
+            self._set_channel_access(db, channel.id, channel.access_control)
             db.commit()
             return ChannelModel.model_validate(channel) if channel else None
 
     def delete_channel_by_id(self, id: str):
         with get_db() as db:
             db.query(Channel).filter(Channel.id == id).delete()
+            db.query(ChannelAccess).filter(ChannelAccess.channel_id == id).delete()
             db.commit()
             return True
 
@@ -266,6 +266,34 @@ class ChatTable:
         chat["history"] = history
         return self.update_chat_by_id(id, chat)
 
+    def add_message_source_to_chat_by_id_and_message_id(
+        self, id: str, message_id: str, source: dict
+    ) -> Optional[ChatModel]:
+        chat = self.get_chat_by_id(id)
+        if chat is None:
+            return None
+
+        chat = chat.chat
+        history = chat.get("history", {})
+
+        if message_id in history.get("messages", {}):
+            message = history["messages"][message_id]
+            if source.get("type") == "code_execution":
+                # Code executions are updated in place by id
+                code_executions = message.get("code_executions", [])
+                for idx, execution in enumerate(code_executions):
+                    if execution.get("id") == source.get("id"):
+                        code_executions[idx] = source
+                        break
+                else:
+                    code_executions.append(source)
+                message["code_executions"] = code_executions
+            else:
+                message["sources"] = message.get("sources", []) + [source]
+
+        chat["history"] = history
+        return self.update_chat_by_id(id, chat)
+
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
             # Get the existing chat to share
@@ -5,11 +5,13 @@ from typing import Optional
 
 from open_webui.internal.db import Base, get_db
 from open_webui.models.tags import TagModel, Tag, Tags
+from open_webui.models.users import User, UserNameResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql import exists
 
 ####################
@@ -25,6 +27,8 @@ class MessageReaction(Base):
     name = Column(Text)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("message_reaction_message_id_idx", "message_id"),)
+
 
 class MessageReactionModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -52,6 +56,16 @@ class Message(Base):
     created_at = Column(BigInteger)  # time_ns
     updated_at = Column(BigInteger)  # time_ns
 
+    __table_args__ = (
+        Index(
+            "message_channel_id_parent_id_created_at_idx",
+            "channel_id",
+            "parent_id",
+            "created_at",
+        ),
+        Index("message_parent_id_created_at_idx", "parent_id", "created_at"),
+    )
+
 
 class MessageModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -94,6 +108,11 @@ class MessageResponse(MessageModel):
     reactions: list[Reactions]
 
 
+class MessageUserResponse(MessageResponse):
+    # None when the author's account has been deleted
+    user: Optional[UserNameResponse] = None
+
+
 class MessageTable:
     def insert_new_message(
         self, form_data: MessageForm, channel_id: str, user_id: str
@@ -171,6 +190,102 @@ class MessageTable:
             )
             return [MessageModel.model_validate(message) for message in all_messages]
 
+    def get_channel_timeline(
+        self,
+        channel_id: str,
+        before: Optional[int] = None,
+        before_id: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> list[MessageUserResponse]:
+        """Return a page of top-level messages, newest first, with their authors,
+        reply counts, latest reply times and grouped reactions.
+
+        Pass the created_at and id of the oldest message already loaded as
+        `before` and `before_id` to get the next page; messages sharing a
+        timestamp are ordered by id so none are skipped or repeated. `skip` is
+        only used when no cursor is given.
+        """
+        with get_db() as db:
+            reply = aliased(Message)
+            reply_count = (
+                select(func.count(reply.id))
+                .where(reply.parent_id == Message.id)
+                .correlate(Message)
+                .scalar_subquery()
+            )
+            latest_reply_at = (
+                select(func.max(reply.created_at))
+                .where(reply.parent_id == Message.id)
+                .correlate(Message)
+                .scalar_subquery()
+            )
+
+            query = (
+                db.query(
+                    Message,
+                    reply_count.label("reply_count"),
+                    latest_reply_at.label("latest_reply_at"),
+                    User.name,
+                    User.role,
+                    User.profile_image_url,
+                )
+                .outerjoin(User, User.id == Message.user_id)
+                .filter(Message.channel_id == channel_id, Message.parent_id.is_(None))
+            )
+            if before is not None and before_id is not None:
+                query = query.filter(
+                    or_(
+                        Message.created_at < before,
+                        and_(Message.created_at == before, Message.id < before_id),
+                    )
+                )
+            elif before is not None:
+                query = query.filter(Message.created_at < before)
+            else:
+                query = query.offset(skip)
+
+            rows = (
+                query.order_by(Message.created_at.desc(), Message.id.desc())
+                .limit(limit)
+                .all()
+            )
+            if not rows:
+                return []
+
+            reactions = self.get_reactions_by_message_ids(
+                [message.id for message, *_ in rows]
+            )
+
+            return [
+                MessageUserResponse(
+                    **{
+                        **MessageModel.model_validate(message).model_dump(),
+                        "reply_count": reply_count,
+                        "latest_reply_at": latest_reply_at,
+                        "reactions": reactions.get(message.id, []),
+                        "user": (
+                            UserNameResponse(
+                                id=message.user_id,
+                                name=name,
+                                role=role,
+                                profile_image_url=profile_image_url,
+                            )
+                            if name is not None
+                            else None
+                        ),
+                    }
+                )
+                for (
+                    message,
+                    reply_count,
+                    latest_reply_at,
+                    name,
+                    role,
+                    profile_image_url,
+                ) in rows
+            ]
+
     def get_messages_by_parent_id(
         self, channel_id: str, parent_id: str, skip: int = 0, limit: int = 50
     ) -> list[MessageModel]:
@@ -225,21 +340,34 @@ class MessageTable:
             return MessageReactionModel.model_validate(result) if result else None
 
     def get_reactions_by_message_id(self, id: str) -> list[Reactions]:
+        return self.get_reactions_by_message_ids([id]).get(id, [])
+
+    def get_reactions_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, list[Reactions]]:
         with get_db() as db:
-            all_reactions = db.query(MessageReaction).filter_by(message_id=id).all()
+            all_reactions = (
+                db.query(MessageReaction)
+                .filter(MessageReaction.message_id.in_(ids))
+                .all()
+            )
 
             reactions = {}
             for reaction in all_reactions:
-                if reaction.name not in reactions:
-                    reactions[reaction.name] = {
+                message_reactions = reactions.setdefault(reaction.message_id, {})
+                if reaction.name not in message_reactions:
+                    message_reactions[reaction.name] = {
                         "name": reaction.name,
                         "user_ids": [],
                         "count": 0,
                     }
-                reactions[reaction.name]["user_ids"].append(reaction.user_id)
-                reactions[reaction.name]["count"] += 1
+                message_reactions[reaction.name]["user_ids"].append(reaction.user_id)
+                message_reactions[reaction.name]["count"] += 1
 
-            return [Reactions(**reaction) for reaction in reactions.values()]
+            return {
+                message_id: [Reactions(**reaction) for reaction in grouped.values()]
+                for message_id, grouped in reactions.items()
+            }
 
     def remove_reaction_by_id_and_user_id_and_name(
         self, id: str, user_id: str, name: str
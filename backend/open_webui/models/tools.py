@@ -142,6 +142,20 @@ class ToolsTable:
         except Exception:
             return None
 
+    def get_tool_versions_by_ids(self, ids: list[str]) -> dict[str, int]:
+        """Maps each existing tool id to its updated_at, without loading the rows."""
+        try:
+            with get_db() as db:
+                return {
+                    id: updated_at
+                    for id, updated_at in db.query(Tool.id, Tool.updated_at)
+                    .filter(Tool.id.in_(ids))
+                    .all()
+                }
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return {}
+
     def get_tools(self) -> list[ToolUserModel]:
         with get_db() as db:
             tools = []
@@ -13,6 +13,7 @@ from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
 from open_webui.utils.misc import get_last_user_message
 
 from open_webui.env import OFFLINE_MODE
+from open_webui.utils.metrics import timed_stage
 
 log = structlog.get_logger(__name__)
 
@@ -34,11 +35,14 @@ class VectorSearchRetriever(BaseRetriever):
         *,
         run_manager: CallbackManagerForRetrieverRun,
     ) -> list[Document]:
-        result = VECTOR_DB_CLIENT.search(
-            collection_name=self.collection_name,
-            vectors=[self.embedding_function(query)],
-            limit=self.top_k,
-        )
+        with timed_stage("retrieval_embed"):
+            query_embedding = self.embedding_function(query)
+        with timed_stage("retrieval_search"):
+            result = VECTOR_DB_CLIENT.search(
+                collection_name=self.collection_name,
+                vectors=[query_embedding],
+                limit=self.top_k,
+            )
 
         ids = result.ids[0]
         metadatas = result.metadatas[0]
@@ -210,15 +214,17 @@ def query_collection(
 ) -> dict:
     results = []
     for query in queries:
-        query_embedding = embedding_function(query)
+        with timed_stage("retrieval_embed"):
+            query_embedding = embedding_function(query)
         for collection_name in collection_names:
             if collection_name:
                 try:
-                    result = query_doc(
-                        collection_name=collection_name,
-                        k=k,
-                        query_embedding=query_embedding,
-                    )
+                    with timed_stage("retrieval_search"):
+                        result = query_doc(
+                            collection_name=collection_name,
+                            k=k,
+                            query_embedding=query_embedding,
+                        )
                     if result is not None:
                         results.append(result.model_dump())
                 except Exception as e:
@@ -538,18 +544,19 @@ class RerankCompressor(BaseDocumentCompressor):
     ) -> Sequence[Document]:
         reranking = self.reranking_function is not None
 
-        if reranking:
-            scores = self.reranking_function.predict(
-                [(query, doc.page_content) for doc in documents]
-            )
-        else:
-            from sentence_transformers import util
+        with timed_stage("retrieval_rerank", documents=len(documents)):
+            if reranking:
+                scores = self.reranking_function.predict(
+                    [(query, doc.page_content) for doc in documents]
+                )
+            else:
+                from sentence_transformers import util
 
-            query_embedding = self.embedding_function(query)
-            document_embedding = self.embedding_function(
-                [doc.page_content for doc in documents]
-            )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+                query_embedding = self.embedding_function(query)
+                document_embedding = self.embedding_function(
+                    [doc.page_content for doc in documents]
+                )
+                scores = util.cos_sim(query_embedding, document_embedding)[0]
 
         docs_with_scores = list(zip(documents, scores.tolist()))
         if self.r_score:
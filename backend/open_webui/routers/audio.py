@@ -1,15 +1,16 @@
+import asyncio
 import hashlib
 import json
 import logging
 import os
+import shutil
 import uuid
 from functools import lru_cache
-from pathlib import Path
+from typing import AsyncIterator
 from pydub import AudioSegment
 from pydub.silence import split_on_silence
 
 import aiohttp
-import aiofiles
 import requests
 
 from fastapi import (
@@ -23,11 +24,13 @@ from fastapi import (
     APIRouter,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.speech_cache import speech_cache
+from open_webui.utils.transcription import whisper_pool
 from open_webui.config import (
     CACHE_DIR,
     config,
@@ -38,6 +41,7 @@ from open_webui.env import (
     ENV,
     SRC_LOG_LEVELS,
     DEVICE_TYPE,
+    WHISPER_WORKERS,
     ENABLE_FORWARD_USER_INFO_HEADERS,
 )
 
@@ -51,8 +55,8 @@ MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024  # Convert MB to bytes
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["AUDIO"])
 
-SPEECH_CACHE_DIR = Path(CACHE_DIR).joinpath("./audio/speech/")
-SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+# Size of the audio chunks streamed from TTS engines
+SPEECH_CHUNK_SIZE = 16 * 1024
 
 
 ##########################################
@@ -99,6 +103,8 @@ def set_faster_whisper_model(model: str, auto_update: bool = False):
             "compute_type": "int8",
             "download_root": config.WHISPER_MODEL_DIR,
             "local_files_only": not auto_update,
+            # Lets the worker pool run transcriptions in parallel
+            "num_workers": WHISPER_WORKERS,
         }
 
         try:
@@ -191,8 +197,13 @@ async def update_audio_config(
     request.app.state.config.WHISPER_MODEL = form_data.stt.WHISPER_MODEL
 
     if request.app.state.config.STT_ENGINE == "":
-        request.app.state.faster_whisper_model = set_faster_whisper_model(
-            form_data.stt.WHISPER_MODEL, config.WHISPER_MODEL_AUTO_UPDATE
+        whisper_pool.set_model(
+            await asyncio.to_thread(
+                set_faster_whisper_model,
+                form_data.stt.WHISPER_MODEL,
+                config.WHISPER_MODEL_AUTO_UPDATE,
+            ),
+            form_data.stt.WHISPER_MODEL,
         )
 
     return {
@@ -232,6 +243,28 @@ def load_speech_pipeline(request):
         )
 
 
+async def stream_tts_response(url: str, **kwargs) -> AsyncIterator[bytes]:
+    """Posts a TTS request and yields the audio as it arrives."""
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, **kwargs) as r:
+            if r.status >= 400:
+                detail = None
+                try:
+                    res = await r.json()
+                    if "error" in res:
+                        detail = f"External: {res['error'].get('message', '')}"
+                except Exception:
+                    pass
+
+                raise HTTPException(
+                    status_code=r.status,
+                    detail=detail if detail else "Open WebUI: Server Connection Error",
+                )
+
+            async for chunk in r.content.iter_chunked(SPEECH_CHUNK_SIZE):
+                yield chunk
+
+
 @router.post("/speech")
 async def speech(request: Request, user=Depends(get_verified_user)):
     body = await request.body()
@@ -241,11 +274,9 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         + str(request.app.state.config.TTS_MODEL).encode("utf-8")
     ).hexdigest()
 
-    file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-    file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
-
     # Check if the file already exists in the cache
-    if file_path.is_file():
+    file_path = speech_cache.get(name)
+    if file_path:
         return FileResponse(file_path)
 
     payload = None
@@ -255,57 +286,28 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         log.exception(e)
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
+    chunks = None
     if request.app.state.config.TTS_ENGINE == "openai":
         payload["model"] = request.app.state.config.TTS_MODEL
 
-        try:
-            # print(payload)
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url=f"{request.app.state.config.TTS_OPENAI_API_BASE_URL}/audio/speech",
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {request.app.state.config.TTS_OPENAI_API_KEY}",
-                        **(
-                            {
-                                "X-OpenWebUI-User-Name": user.name,
-                                "X-OpenWebUI-User-Id": user.id,
-                                "X-OpenWebUI-User-Email": user.email,
-                                "X-OpenWebUI-User-Role": user.role,
-                            }
-                            if ENABLE_FORWARD_USER_INFO_HEADERS
-                            else {}
-                        ),
-                    },
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
-
-        except Exception as e:
-            log.exception(e)
-            detail = None
-
-            try:
-                if r.status != 200:
-                    res = await r.json()
-
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-            except Exception:
-                detail = f"External: {e}"
-
-            raise HTTPException(
-                status_code=getattr(r, "status", 500),
-                detail=detail if detail else "Open WebUI: Server Connection Error",
-            )
+        chunks = stream_tts_response(
+            f"{request.app.state.config.TTS_OPENAI_API_BASE_URL}/audio/speech",
+            json=payload,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {request.app.state.config.TTS_OPENAI_API_KEY}",
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS
+                    else {}
+                ),
+            },
+        )
 
     elif request.app.state.config.TTS_ENGINE == "elevenlabs":
         voice_id = payload.get("voice", "")
@@ -316,109 +318,40 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                 detail="Invalid voice id",
             )
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
-                    json={
-                        "text": payload["input"],
-                        "model_id": request.app.state.config.TTS_MODEL,
-                        "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
-                    },
-                    headers={
-                        "Accept": "audio/mpeg",
-                        "Content-Type": "application/json",
-                        "xi-api-key": request.app.state.config.TTS_API_KEY,
-                    },
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
-
-        except Exception as e:
-            log.exception(e)
-            detail = None
-
-            try:
-                if r.status != 200:
-                    res = await r.json()
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-            except Exception:
-                detail = f"External: {e}"
-
-            raise HTTPException(
-                status_code=getattr(r, "status", 500),
-                detail=detail if detail else "Open WebUI: Server Connection Error",
-            )
+        chunks = stream_tts_response(
+            f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream",
+            json={
+                "text": payload["input"],
+                "model_id": request.app.state.config.TTS_MODEL,
+                "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
+            },
+            headers={
+                "Accept": "audio/mpeg",
+                "Content-Type": "application/json",
+                "xi-api-key": request.app.state.config.TTS_API_KEY,
+            },
+        )
 
     elif request.app.state.config.TTS_ENGINE == "azure":
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         region = request.app.state.config.TTS_AZURE_SPEECH_REGION
         language = request.app.state.config.TTS_VOICE
         locale = "-".join(request.app.state.config.TTS_VOICE.split("-")[:1])
         output_format = request.app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT
 
-        try:
-            data = f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{locale}">
+        data = f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{locale}">
                 <voice name="{language}">{payload["input"]}</voice>
             </speak>"""
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"https://{region}.tts.speech.microsoft.com/cognitiveservices/v1",
-                    headers={
-                        "Ocp-Apim-Subscription-Key": request.app.state.config.TTS_API_KEY,
-                        "Content-Type": "application/ssml+xml",
-                        "X-Microsoft-OutputFormat": output_format,
-                    },
-                    data=data,
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-                    return FileResponse(file_path)
-
-        except Exception as e:
-            log.exception(e)
-            detail = None
-
-            try:
-                if r.status != 200:
-                    res = await r.json()
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-            except Exception:
-                detail = f"External: {e}"
-
-            raise HTTPException(
-                status_code=getattr(r, "status", 500),
-                detail=detail if detail else "Open WebUI: Server Connection Error",
-            )
+        chunks = stream_tts_response(
+            f"https://{region}.tts.speech.microsoft.com/cognitiveservices/v1",
+            headers={
+                "Ocp-Apim-Subscription-Key": request.app.state.config.TTS_API_KEY,
+                "Content-Type": "application/ssml+xml",
+                "X-Microsoft-OutputFormat": output_format,
+            },
+            data=data,
+        )
 
     elif request.app.state.config.TTS_ENGINE == "transformers":
-        payload = None
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         import torch
         import soundfile as sf
 
@@ -443,87 +376,129 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             forward_params={"speaker_embeddings": speaker_embedding},
         )
 
+        file_path = speech_cache.get_file_path(name)
         sf.write(file_path, speech["audio"], samplerate=speech["sampling_rate"])
-
-        async with aiofiles.open(file_body_path, "w") as f:
-            await f.write(json.dumps(payload))
+        speech_cache.add(name, payload)
 
         return FileResponse(file_path)
 
+    if chunks is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("TTS engine not configured"),
+        )
+
+    # Audio is sent to the client as it is synthesized and cached on the side
+    try:
+        audio = await speech_cache.stream(name, chunks, payload)
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.exception(e)
+        raise HTTPException(
+            status_code=500,
+            detail=(
+                f"External: {e}" if str(e) else "Open WebUI: Server Connection Error"
+            ),
+        )
+
+    return StreamingResponse(audio, media_type="audio/mpeg")
+
+
+@router.get("/speech/cache")
+async def get_speech_cache_stats(user=Depends(get_admin_user)):
+    return speech_cache.get_stats()
+
+
+def load_whisper_model(model_name: str):
+    """Loads a model into the worker pool if it isn't already."""
+    if whisper_pool.model is None or whisper_pool.model_name != model_name:
+        whisper_pool.set_model(
+            set_faster_whisper_model(model_name, config.WHISPER_MODEL_AUTO_UPDATE),
+            model_name,
+        )
+
 
-def transcribe(request: Request, file_path):
-    print("transcribe", file_path)
+async def transcribe_stream(request: Request, file_path: str) -> AsyncIterator[str]:
+    """Yields partial transcripts; the full transcript is saved next to the file."""
     filename = os.path.basename(file_path)
     file_dir = os.path.dirname(file_path)
     id = filename.split(".")[0]
 
     if request.app.state.config.STT_ENGINE == "":
-        if request.app.state.faster_whisper_model is None:
-            request.app.state.faster_whisper_model = set_faster_whisper_model(
-                request.app.state.config.WHISPER_MODEL
+        if whisper_pool.model is None:
+            await asyncio.to_thread(
+                load_whisper_model, request.app.state.config.WHISPER_MODEL
             )
 
-        model = request.app.state.faster_whisper_model
-        segments, info = model.transcribe(file_path, beam_size=5)
-        log.info(
-            "Detected language '%s' with probability %f"
-            % (info.language, info.language_probability)
-        )
-
-        transcript = "".join([segment.text for segment in list(segments)])
+        transcript = ""
+        async for text in whisper_pool.transcribe_stream(file_path):
+            transcript += text
+            yield text
         data = {"text": transcript.strip()}
 
-        # save the transcript to a json file
-        transcript_file = f"{file_dir}/{id}.json"
-        with open(transcript_file, "w") as f:
-            json.dump(data, f)
-
-        log.debug(data)
-        return data
     elif request.app.state.config.STT_ENGINE == "openai":
-        if is_mp4_audio(file_path):
-            os.rename(file_path, file_path.replace(".wav", ".mp4"))
-            # Convert MP4 audio file to WAV format
-            convert_mp4_to_wav(file_path.replace(".wav", ".mp4"), file_path)
+        data = await transcribe_openai(request, file_path)
+        yield data["text"]
 
-        r = None
-        try:
-            r = requests.post(
-                url=f"{request.app.state.config.STT_OPENAI_API_BASE_URL}/audio/transcriptions",
-                headers={
-                    "Authorization": f"Bearer {request.app.state.config.STT_OPENAI_API_KEY}"
-                },
-                files={"file": (filename, open(file_path, "rb"))},
-                data={"model": request.app.state.config.STT_MODEL},
-            )
+    else:
+        return
 
-            r.raise_for_status()
-            data = r.json()
+    # save the transcript to a json file
+    transcript_file = f"{file_dir}/{id}.json"
+    with open(transcript_file, "w") as f:
+        json.dump(data, f)
 
-            # save the transcript to a json file
-            transcript_file = f"{file_dir}/{id}.json"
-            with open(transcript_file, "w") as f:
-                json.dump(data, f)
+    log.debug(data)
 
-            return data
-        except Exception as e:
-            log.exception(e)
 
-            detail = None
-            if r is not None:
-                try:
-                    res = r.json()
-                    if "error" in res:
-                        detail = f"External: {res['error'].get('message', '')}"
-                except Exception:
-                    detail = f"External: {e}"
+async def transcribe_openai(request: Request, file_path: str) -> dict:
+    if await asyncio.to_thread(is_mp4_audio, file_path):
+        os.rename(file_path, file_path.replace(".wav", ".mp4"))
+        # Convert MP4 audio file to WAV format
+        await asyncio.to_thread(
+            convert_mp4_to_wav, file_path.replace(".wav", ".mp4"), file_path
+        )
+
+    # The OpenAI API rejects uploads over MAX_FILE_SIZE
+    file_path = await asyncio.to_thread(compress_audio, file_path)
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            with open(file_path, "rb") as f:
+                form = aiohttp.FormData()
+                form.add_field("file", f, filename=os.path.basename(file_path))
+                form.add_field("model", request.app.state.config.STT_MODEL)
 
-            raise Exception(detail if detail else "Open WebUI: Server Connection Error")
+                async with session.post(
+                    url=f"{request.app.state.config.STT_OPENAI_API_BASE_URL}/audio/transcriptions",
+                    headers={
+                        "Authorization": f"Bearer {request.app.state.config.STT_OPENAI_API_KEY}"
+                    },
+                    data=form,
+                ) as r:
+                    if r.status >= 400:
+                        detail = None
+                        try:
+                            res = await r.json()
+                            if "error" in res:
+                                detail = f"External: {res['error'].get('message', '')}"
+                        except Exception:
+                            detail = f"External: {r.status} {r.reason}"
+                        raise Exception(
+                            detail if detail else "Open WebUI: Server Connection Error"
+                        )
+
+                    return await r.json()
+    except aiohttp.ClientError as e:
+        log.exception(e)
+        raise Exception("Open WebUI: Server Connection Error")
 
 
 def compress_audio(file_path):
     if os.path.getsize(file_path) > MAX_FILE_SIZE:
         file_dir = os.path.dirname(file_path)
+        id = os.path.basename(file_path).split(".")[0]
         audio = AudioSegment.from_file(file_path)
         audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
         compressed_path = f"{file_dir}/{id}_compressed.opus"
@@ -539,12 +514,24 @@ def compress_audio(file_path):
         return file_path
 
 
+def save_upload(file: UploadFile, file_path: str):
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(file.file, f, 1024 * 1024)
+
+
 @router.post("/transcriptions")
-def transcription(
+async def transcription(
     request: Request,
     file: UploadFile = File(...),
+    stream: bool = False,
     user=Depends(get_verified_user),
 ):
+    """Transcribes an audio file.
+
+    With ``?stream=true`` the response is NDJSON: one ``{"text": ...}`` line per
+    partial transcript as it is ready, then a final line with the full
+    transcript, the filename and ``"done": true``.
+    """
     log.info(f"file.content_type: {file.content_type}")
 
     if file.content_type not in ["audio/mpeg", "audio/wav", "audio/ogg", "audio/x-m4a"]:
@@ -558,29 +545,37 @@ def transcription(
         id = uuid.uuid4()
 
         filename = f"{id}.{ext}"
-        contents = file.file.read()
 
         file_dir = f"{CACHE_DIR}/audio/transcriptions"
         os.makedirs(file_dir, exist_ok=True)
         file_path = f"{file_dir}/{filename}"
 
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        await asyncio.to_thread(save_upload, file, file_path)
 
-        try:
-            try:
-                file_path = compress_audio(file_path)
-            except Exception as e:
-                log.exception(e)
+        if stream:
 
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=ERROR_MESSAGES.DEFAULT(e),
-                )
+            async def stream_transcript():
+                transcript = ""
+                try:
+                    async for text in transcribe_stream(request, file_path):
+                        transcript += text
+                        yield json.dumps({"text": text}) + "\n"
+                    yield json.dumps(
+                        {"text": transcript.strip(), "filename": filename, "done": True}
+                    ) + "\n"
+                except Exception as e:
+                    log.exception(e)
+                    yield json.dumps({"error": ERROR_MESSAGES.DEFAULT(e)}) + "\n"
+
+            return StreamingResponse(
+                stream_transcript(), media_type="application/x-ndjson"
+            )
 
-            data = transcribe(request, file_path)
-            file_path = file_path.split("/")[-1]
-            return {**data, "filename": file_path}
+        try:
+            transcript = "".join(
+                [text async for text in transcribe_stream(request, file_path)]
+            )
+            return {"text": transcript.strip(), "filename": filename}
         except Exception as e:
             log.exception(e)
 
@@ -589,6 +584,8 @@ def transcription(
                 detail=ERROR_MESSAGES.DEFAULT(e),
             )
 
+    except HTTPException:
+        raise
     except Exception as e:
         log.exception(e)
 
@@ -80,7 +80,7 @@ def upload_file(
         id = str(uuid.uuid4())
         name = filename
         filename = f"{id}_{filename}"
-        contents, file_path = Storage.upload_file(file.file, filename)
+        size, sha256, file_path = Storage.upload_file(file.file, filename)
 
         file_item = Files.insert_new_file(
             user.id,
@@ -92,7 +92,8 @@ def upload_file(
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": size,
+                        "sha256": sha256,
                     },
                 }
             ),
@@ -151,7 +152,7 @@ async def delete_all_files(user=Depends(get_admin_user)):
     result = Files.delete_all_files()
     if result:
         try:
-            Storage.delete_all_files()
+            await Storage.delete_all_files_async()
         except Exception as e:
             log.exception(e)
             log.error(f"Error deleting files")
@@ -242,30 +243,53 @@ async def update_file_data_content_by_id(
 
 
 @router.get("/{id}/content")
-async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
+async def get_file_content_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
     file = Files.get_file_by_id(id)
     if file and (file.user_id == user.id or user.role == "admin"):
         try:
-            file_path = Storage.get_file(file.path)
+            # Handle Unicode filenames
+            filename = file.meta.get("name", file.filename)
+            encoded_filename = quote(filename)  # RFC5987 encoding
+
+            headers = {}
+            if file.meta.get("content_type") not in [
+                "application/pdf",
+                "text/plain",
+            ]:
+                headers = {
+                    **headers,
+                    "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
+                }
+
+            # Serve ranged reads without fetching the whole object from storage
+            range_header = request.headers.get("range")
+            if range_header:
+                file_range = await Storage.get_file_range(file.path, range_header)
+                if file_range:
+                    chunks, start, end, size = file_range
+                    return StreamingResponse(
+                        chunks,
+                        status_code=status.HTTP_206_PARTIAL_CONTENT,
+                        media_type=file.meta.get("content_type")
+                        or "application/octet-stream",
+                        headers={
+                            **headers,
+                            "Accept-Ranges": "bytes",
+                            "Content-Range": f"bytes {start}-{end}/{size}",
+                            "Content-Length": str(end - start + 1),
+                        },
+                    )
+
+            file_path = await Storage.get_file_async(file.path)
             file_path = Path(file_path)
 
             # Check if the file already exists in the cache
             if file_path.is_file():
-                # Handle Unicode filenames
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)  # RFC5987 encoding
-
-                headers = {}
-                if file.meta.get("content_type") not in [
-                    "application/pdf",
-                    "text/plain",
-                ]:
-                    headers = {
-                        **headers,
-                        "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
-                    }
-
-                return FileResponse(file_path, headers=headers)
+                return FileResponse(
+                    file_path, headers={**headers, "Accept-Ranges": "bytes"}
+                )
 
             else:
                 raise HTTPException(
@@ -291,7 +315,7 @@ async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
     file = Files.get_file_by_id(id)
     if file and (file.user_id == user.id or user.role == "admin"):
         try:
-            file_path = Storage.get_file(file.path)
+            file_path = await Storage.get_file_async(file.path)
             file_path = Path(file_path)
 
             # Check if the file already exists in the cache
@@ -332,7 +356,7 @@ async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
         }
 
         if file_path:
-            file_path = Storage.get_file(file_path)
+            file_path = await Storage.get_file_async(file_path)
             file_path = Path(file_path)
 
             # Check if the file already exists in the cache
@@ -376,7 +400,7 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
         result = Files.delete_file_by_id(id)
         if result:
             try:
-                Storage.delete_file(file.path)
+                await Storage.delete_file_async(file.path)
             except Exception as e:
                 log.exception(e)
                 log.error(f"Error deleting files")
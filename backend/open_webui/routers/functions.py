@@ -8,6 +8,7 @@ from open_webui.models.functions import (
     FunctionResponse,
     Functions,
 )
+from open_webui.utils.filter import filter_chain_cache
 from open_webui.utils.plugin import load_function_module_by_id, replace_imports
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
@@ -67,6 +68,7 @@ async def create_new_function(
             FUNCTIONS[form_data.id] = function_module
 
             function = Functions.insert_new_function(user.id, function_type, form_data)
+            filter_chain_cache.invalidate()
 
             function_cache_dir = Path(CACHE_DIR) / "functions" / form_data.id
             function_cache_dir.mkdir(parents=True, exist_ok=True)
@@ -121,6 +123,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
         function = Functions.update_function_by_id(
             id, {"is_active": not function.is_active}
         )
+        filter_chain_cache.invalidate()
 
         if function:
             return function
@@ -148,6 +151,7 @@ async def toggle_global_by_id(id: str, user=Depends(get_admin_user)):
         function = Functions.update_function_by_id(
             id, {"is_global": not function.is_global}
         )
+        filter_chain_cache.invalidate()
 
         if function:
             return function
@@ -186,6 +190,7 @@ async def update_function_by_id(
         print(updated)
 
         function = Functions.update_function_by_id(id, updated)
+        filter_chain_cache.invalidate()
 
         if function:
             return function
@@ -217,6 +222,7 @@ async def delete_function_by_id(
         FUNCTIONS = request.app.state.FUNCTIONS
         if id in FUNCTIONS:
             del FUNCTIONS[id]
+        filter_chain_cache.invalidate()
 
     return result
 
@@ -297,6 +303,7 @@ async def update_function_valves_by_id(
                 form_data = {k: v for k, v in form_data.items() if v is not None}
                 valves = Valves(**form_data)
                 Functions.update_function_valves_by_id(id, valves.model_dump())
+                filter_chain_cache.invalidate()
                 return valves.model_dump()
             except Exception as e:
                 print(e)
@@ -9,6 +9,7 @@ from open_webui.models.groups import (
     GroupResponse,
 )
 
+from open_webui.models.channels import Channels
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -82,6 +83,7 @@ async def update_group_by_id(
     try:
         group = Groups.update_group_by_id(id, form_data)
         if group:
+            Channels.sync_channel_access_by_group_id(id)
             return group
         else:
             raise HTTPException(
@@ -106,6 +108,7 @@ async def delete_group_by_id(id: str, user=Depends(get_admin_user)):
     try:
         result = Groups.delete_group_by_id(id)
         if result:
+            Channels.sync_channel_access_by_group_id(id)
             return result
         else:
             raise HTTPException(
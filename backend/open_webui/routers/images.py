@@ -1,5 +1,6 @@
 import asyncio
 import base64
+import hashlib
 import json
 import logging
 import mimetypes
@@ -8,6 +9,8 @@ import uuid
 from pathlib import Path
 from typing import Optional
 
+import aiofiles
+import aiohttp
 import requests
 
 
@@ -18,12 +21,19 @@ from pydantic import BaseModel
 
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
-from open_webui.env import ENV, SRC_LOG_LEVELS, ENABLE_FORWARD_USER_INFO_HEADERS
+from open_webui.env import (
+    AIOHTTP_CLIENT_TIMEOUT,
+    ENV,
+    SRC_LOG_LEVELS,
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+)
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.images.backend_cache import image_backend_cache
 from open_webui.utils.images.comfyui import (
     ComfyUIGenerateImageForm,
     ComfyUIWorkflow,
+    close_comfyui_clients,
     comfyui_generate_image,
 )
 
@@ -34,6 +44,8 @@ log.setLevel(SRC_LOG_LEVELS["IMAGES"])
 IMAGE_CACHE_DIR = Path(CACHE_DIR).joinpath("./image/generations/")
 IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+_session: Optional[aiohttp.ClientSession] = None
+
 
 router = APIRouter()
 
@@ -134,6 +146,9 @@ async def update_config(
         form_data.comfyui.COMFYUI_WORKFLOW_NODES
     )
 
+    # Model lists and node metadata may differ on the new backend or workflow
+    image_backend_cache.invalidate()
+
     return {
         "enabled": request.app.state.config.ENABLE_IMAGE_GENERATION,
         "engine": request.app.state.config.IMAGE_GENERATION_ENGINE,
@@ -169,6 +184,33 @@ def get_automatic1111_api_auth(request: Request):
         return f"Basic {auth1111_base64_encoded_string}"
 
 
+def get_backend_request(request: Request, path: str) -> tuple[str, dict, str]:
+    """URL, headers and cache key for a GET against the configured backend."""
+    if request.app.state.config.IMAGE_GENERATION_ENGINE == "comfyui":
+        url = f"{request.app.state.config.COMFYUI_BASE_URL}/{path}"
+        headers = {
+            "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
+        }
+    else:
+        url = f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/{path}"
+        headers = {"authorization": get_automatic1111_api_auth(request)}
+
+    key = hashlib.sha256(json.dumps([url, headers]).encode()).hexdigest()
+    return url, headers, key
+
+
+async def get_json(url: str, **kwargs):
+    async with get_session().get(url, **kwargs) as r:
+        r.raise_for_status()
+        return await r.json(content_type=None)
+
+
+async def get_backend_info(request: Request, path: str):
+    """Cached backend metadata such as model lists, samplers or node info."""
+    url, headers, key = get_backend_request(request, path)
+    return await image_backend_cache.get(key, lambda: get_json(url, headers=headers))
+
+
 @router.get("/config/url/verify")
 async def verify_url(request: Request, user=Depends(get_admin_user)):
     if request.app.state.config.IMAGE_GENERATION_ENGINE == "automatic1111":
@@ -196,27 +238,24 @@ async def verify_url(request: Request, user=Depends(get_admin_user)):
         return True
 
 
-def set_image_model(request: Request, model: str):
+async def set_image_model(request: Request, model: str):
     log.info(f"Setting image model to {model}")
     request.app.state.config.IMAGE_GENERATION_MODEL = model
     if request.app.state.config.IMAGE_GENERATION_ENGINE in ["", "automatic1111"]:
-        api_auth = get_automatic1111_api_auth(request)
-        r = requests.get(
-            url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
-            headers={"authorization": api_auth},
-        )
-        options = r.json()
+        url, headers, key = get_backend_request(request, "options")
+
+        # Always read the live options: the backend may be shared and switched
+        # elsewhere, and cached options can be stale. Only the model switch
+        # itself is skipped when it's already loaded.
+        options = await get_json(url, headers=headers)
         if model != options["sd_model_checkpoint"]:
             options["sd_model_checkpoint"] = model
-            r = requests.post(
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
-                json=options,
-                headers={"authorization": api_auth},
-            )
+            await post_json(url, json=options, headers=headers)
+        image_backend_cache.set(key, options)
     return request.app.state.config.IMAGE_GENERATION_MODEL
 
 
-def get_image_model(request):
+async def get_image_model(request):
     if request.app.state.config.IMAGE_GENERATION_ENGINE == "openai":
         return (
             request.app.state.config.IMAGE_GENERATION_MODEL
@@ -234,11 +273,7 @@ def get_image_model(request):
         or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
     ):
         try:
-            r = requests.get(
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
-                headers={"authorization": get_automatic1111_api_auth(request)},
-            )
-            options = r.json()
+            options = await get_backend_info(request, "options")
             return options["sd_model_checkpoint"]
         except Exception as e:
             request.app.state.config.ENABLE_IMAGE_GENERATION = False
@@ -265,7 +300,7 @@ async def update_image_config(
     request: Request, form_data: ImageConfigForm, user=Depends(get_admin_user)
 ):
 
-    set_image_model(request, form_data.MODEL)
+    await set_image_model(request, form_data.MODEL)
 
     pattern = r"^\d+x\d+$"
     if re.match(pattern, form_data.IMAGE_SIZE):
@@ -292,7 +327,7 @@ async def update_image_config(
 
 
 @router.get("/models")
-def get_models(request: Request, user=Depends(get_verified_user)):
+async def get_models(request: Request, user=Depends(get_verified_user)):
     try:
         if request.app.state.config.IMAGE_GENERATION_ENGINE == "openai":
             return [
@@ -300,15 +335,7 @@ def get_models(request: Request, user=Depends(get_verified_user)):
                 {"id": "dall-e-3", "name": "DALL·E 3"},
             ]
         elif request.app.state.config.IMAGE_GENERATION_ENGINE == "comfyui":
-            # TODO - get models from comfyui
-            headers = {
-                "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
-            }
-            r = requests.get(
-                url=f"{request.app.state.config.COMFYUI_BASE_URL}/object_info",
-                headers=headers,
-            )
-            info = r.json()
+            info = await get_backend_info(request, "object_info")
 
             workflow = json.loads(request.app.state.config.COMFYUI_WORKFLOW)
             model_node_id = None
@@ -322,7 +349,6 @@ def get_models(request: Request, user=Depends(get_verified_user)):
             if model_node_id:
                 model_list_key = None
 
-                print(workflow[model_node_id]["class_type"])
                 for key in info[workflow[model_node_id]["class_type"]]["input"][
                     "required"
                 ]:
@@ -352,11 +378,7 @@ def get_models(request: Request, user=Depends(get_verified_user)):
             request.app.state.config.IMAGE_GENERATION_ENGINE == "automatic1111"
             or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
         ):
-            r = requests.get(
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/sd-models",
-                headers={"authorization": get_automatic1111_api_auth(request)},
-            )
-            models = r.json()
+            models = await get_backend_info(request, "sd-models")
             return list(
                 map(
                     lambda model: {"id": model["title"], "name": model["model_name"]},
@@ -368,6 +390,20 @@ def get_models(request: Request, user=Depends(get_verified_user)):
         raise HTTPException(status_code=400, detail=ERROR_MESSAGES.DEFAULT(e))
 
 
+@router.get("/samplers")
+async def get_samplers(request: Request, user=Depends(get_verified_user)):
+    try:
+        if request.app.state.config.IMAGE_GENERATION_ENGINE == "comfyui":
+            info = await get_backend_info(request, "object_info")
+            return info["KSampler"]["input"]["required"]["sampler_name"][0]
+        elif request.app.state.config.IMAGE_GENERATION_ENGINE in ["", "automatic1111"]:
+            samplers = await get_backend_info(request, "samplers")
+            return [sampler["name"] for sampler in samplers]
+        return []
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=ERROR_MESSAGES.DEFAULT(e))
+
+
 class GenerateImageForm(BaseModel):
     model: Optional[str] = None
     prompt: str
@@ -376,66 +412,100 @@ class GenerateImageForm(BaseModel):
     negative_prompt: Optional[str] = None
 
 
-def save_b64_image(b64_str):
+def get_session() -> aiohttp.ClientSession:
+    """Shared session, so image backend requests reuse pooled connections."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+            trust_env=True,
+        )
+    return _session
+
+
+async def close_sessions():
+    if _session is not None:
+        await _session.close()
+    await close_comfyui_clients()
+
+
+async def post_json(url: str, **kwargs) -> dict:
+    async with get_session().post(url, **kwargs) as r:
+        res = await r.json(content_type=None)
+        if r.status >= 400:
+            error = res.get("error") if isinstance(res, dict) else None
+            if isinstance(error, dict) and "message" in error:
+                raise Exception(error["message"])
+            raise Exception(f"{r.status} {r.reason}")
+        return res
+
+
+async def save_b64_image(b64_str):
     try:
         image_id = str(uuid.uuid4())
 
         if "," in b64_str:
             header, encoded = b64_str.split(",", 1)
             mime_type = header.split(";")[0]
-
-            img_data = base64.b64decode(encoded)
             image_format = mimetypes.guess_extension(mime_type)
-
-            image_filename = f"{image_id}{image_format}"
-            file_path = IMAGE_CACHE_DIR / f"{image_filename}"
-            with open(file_path, "wb") as f:
-                f.write(img_data)
-            return image_filename
         else:
-            image_filename = f"{image_id}.png"
-            file_path = IMAGE_CACHE_DIR.joinpath(image_filename)
+            encoded = b64_str
+            image_format = ".png"
 
-            img_data = base64.b64decode(b64_str)
+        # Decoding a large image is CPU work, keep it off the event loop
+        img_data = await asyncio.to_thread(base64.b64decode, encoded)
 
-            # Write the image data to a file
-            with open(file_path, "wb") as f:
-                f.write(img_data)
-            return image_filename
+        image_filename = f"{image_id}{image_format}"
+        file_path = IMAGE_CACHE_DIR.joinpath(image_filename)
+        async with aiofiles.open(file_path, "wb") as f:
+            await f.write(img_data)
+        return image_filename
 
     except Exception as e:
         log.exception(f"Error saving image: {e}")
         return None
 
 
-def save_url_image(url):
+async def save_url_image(url):
     image_id = str(uuid.uuid4())
     try:
-        r = requests.get(url)
-        r.raise_for_status()
-        if r.headers["content-type"].split("/")[0] == "image":
-            mime_type = r.headers["content-type"]
-            image_format = mimetypes.guess_extension(mime_type)
+        async with get_session().get(url) as r:
+            r.raise_for_status()
+            if r.headers["content-type"].split("/")[0] == "image":
+                mime_type = r.headers["content-type"]
+                image_format = mimetypes.guess_extension(mime_type)
 
-            if not image_format:
-                raise ValueError("Could not determine image type from MIME type")
+                if not image_format:
+                    raise ValueError("Could not determine image type from MIME type")
 
-            image_filename = f"{image_id}{image_format}"
+                image_filename = f"{image_id}{image_format}"
 
-            file_path = IMAGE_CACHE_DIR.joinpath(f"{image_filename}")
-            with open(file_path, "wb") as image_file:
-                for chunk in r.iter_content(chunk_size=8192):
-                    image_file.write(chunk)
-            return image_filename
-        else:
-            log.error("Url does not point to an image.")
-            return None
+                file_path = IMAGE_CACHE_DIR.joinpath(f"{image_filename}")
+                async with aiofiles.open(file_path, "wb") as image_file:
+                    async for chunk in r.content.iter_chunked(64 * 1024):
+                        await image_file.write(chunk)
+                return image_filename
+            else:
+                log.error("Url does not point to an image.")
+                return None
 
     except Exception as e:
         log.exception(f"Error saving image: {e}")
         return None
 
 
+async def save_images(saves: list, body: dict) -> list[dict]:
+    """Runs the image saves concurrently and records the request next to each image."""
+    images = []
+    for image_filename in await asyncio.gather(*saves):
+        images.append({"url": f"/cache/image/generations/{image_filename}"})
+        file_body_path = IMAGE_CACHE_DIR.joinpath(f"{image_filename}.json")
+
+        async with aiofiles.open(file_body_path, "w") as f:
+            await f.write(json.dumps(body))
+    return images
+
+
 @router.post("/generations")
 async def image_generations(
     request: Request,
@@ -444,7 +514,6 @@ async def image_generations(
 ):
     width, height = tuple(map(int, request.app.state.config.IMAGE_SIZE.split("x")))
 
-    r = None
     try:
         if request.app.state.config.IMAGE_GENERATION_ENGINE == "openai":
             headers = {}
@@ -466,7 +535,7 @@ async def image_generations(
                     else "dall-e-2"
                 ),
                 "prompt": form_data.prompt,
-                "n": form_data.n,
+                "n": 1,
                 "size": (
                     form_data.size
                     if form_data.size
@@ -475,28 +544,27 @@ async def image_generations(
                 "response_format": "b64_json",
             }
 
-            # Use asyncio.to_thread for the requests.post call
-            r = await asyncio.to_thread(
-                requests.post,
-                url=f"{request.app.state.config.IMAGES_OPENAI_API_BASE_URL}/images/generations",
-                json=data,
-                headers=headers,
+            # One request per image, generated concurrently (dall-e-3 only
+            # accepts n=1)
+            responses = await asyncio.gather(
+                *[
+                    post_json(
+                        f"{request.app.state.config.IMAGES_OPENAI_API_BASE_URL}/images/generations",
+                        json=data,
+                        headers=headers,
+                    )
+                    for _ in range(form_data.n)
+                ]
             )
 
-            r.raise_for_status()
-            res = r.json()
-
-            images = []
-
-            for image in res["data"]:
-                image_filename = save_b64_image(image["b64_json"])
-                images.append({"url": f"/cache/image/generations/{image_filename}"})
-                file_body_path = IMAGE_CACHE_DIR.joinpath(f"{image_filename}.json")
-
-                with open(file_body_path, "w") as f:
-                    json.dump(data, f)
-
-            return images
+            return await save_images(
+                [
+                    save_b64_image(image["b64_json"])
+                    for res in responses
+                    for image in res["data"]
+                ],
+                data,
+            )
 
         elif request.app.state.config.IMAGE_GENERATION_ENGINE == "comfyui":
             data = {
@@ -526,21 +594,15 @@ async def image_generations(
             res = await comfyui_generate_image(
                 request.app.state.config.IMAGE_GENERATION_MODEL,
                 form_data,
-                user.id,
                 request.app.state.config.COMFYUI_BASE_URL,
                 request.app.state.config.COMFYUI_API_KEY,
             )
             log.debug(f"res: {res}")
 
-            images = []
-
-            for image in res["data"]:
-                image_filename = save_url_image(image["url"])
-                images.append({"url": f"/cache/image/generations/{image_filename}"})
-                file_body_path = IMAGE_CACHE_DIR.joinpath(f"{image_filename}.json")
-
-                with open(file_body_path, "w") as f:
-                    json.dump(form_data.model_dump(exclude_none=True), f)
+            images = await save_images(
+                [save_url_image(image["url"]) for image in res["data"]],
+                form_data.model_dump(exclude_none=True),
+            )
 
             log.debug(f"images: {images}")
             return images
@@ -549,7 +611,7 @@ async def image_generations(
             or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
         ):
             if form_data.model:
-                set_image_model(form_data.model)
+                await set_image_model(request, form_data.model)
 
             data = {
                 "prompt": form_data.prompt,
@@ -573,32 +635,17 @@ async def image_generations(
             if request.app.state.config.AUTOMATIC1111_SCHEDULER:
                 data["scheduler"] = request.app.state.config.AUTOMATIC1111_SCHEDULER
 
-            # Use asyncio.to_thread for the requests.post call
-            r = await asyncio.to_thread(
-                requests.post,
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/txt2img",
+            res = await post_json(
+                f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/txt2img",
                 json=data,
                 headers={"authorization": get_automatic1111_api_auth(request)},
             )
-
-            res = r.json()
             log.debug(f"res: {res}")
 
-            images = []
-
-            for image in res["images"]:
-                image_filename = save_b64_image(image)
-                images.append({"url": f"/cache/image/generations/{image_filename}"})
-                file_body_path = IMAGE_CACHE_DIR.joinpath(f"{image_filename}.json")
-
-                with open(file_body_path, "w") as f:
-                    json.dump({**data, "info": res["info"]}, f)
-
-            return images
+            return await save_images(
+                [save_b64_image(image) for image in res["images"]],
+                {**data, "info": res["info"]},
+            )
     except Exception as e:
-        error = e
-        if r != None:
-            data = r.json()
-            if "error" in data:
-                error = data["error"]["message"]
-        raise HTTPException(status_code=400, detail=ERROR_MESSAGES.DEFAULT(error))
+        log.exception(e)
+        raise HTTPException(status_code=400, detail=ERROR_MESSAGES.DEFAULT(e))
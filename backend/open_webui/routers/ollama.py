@@ -13,7 +13,6 @@ from typing import Optional, Union
 from urllib.parse import urlparse
 
 import aiohttp
-from aiocache import cached
 
 import requests
 
@@ -29,7 +28,7 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict
-from starlette.background import BackgroundTask
+from starlette.background import BackgroundTask, BackgroundTasks
 
 
 from open_webui.models.models import Models
@@ -43,6 +42,7 @@ from open_webui.utils.payload import (
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_list_cache import get_config_version, model_list_cache
 
 
 from open_webui.config import (
@@ -82,6 +82,26 @@ async def send_get_request(url, key=None):
         return None
 
 
+def get_cached_models(url: str, key: Optional[str], config_version: str):
+    return model_list_cache.get(
+        f"{url}/api/tags",
+        key,
+        config_version,
+        lambda: send_get_request(f"{url}/api/tags", key),
+    )
+
+
+def invalidate_models_after(response: StreamingResponse, url: str):
+    """Refresh the model list of url once a streamed pull or create finishes."""
+    response.background = BackgroundTasks(
+        [
+            response.background,
+            BackgroundTask(model_list_cache.invalidate, f"{url}/api/tags"),
+        ]
+    )
+    return response
+
+
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
     session: Optional[aiohttp.ClientSession],
@@ -251,22 +271,26 @@ async def update_config(
     }
 
 
-@cached(ttl=3)
 async def get_all_models(request: Request):
     log.info("get_all_models()")
     if request.app.state.config.ENABLE_OLLAMA_API:
+        config_version = get_config_version(
+            request.app.state.config.OLLAMA_BASE_URLS,
+            request.app.state.config.OLLAMA_API_CONFIGS,
+        )
+
         request_tasks = []
 
         for idx, url in enumerate(request.app.state.config.OLLAMA_BASE_URLS):
             if url not in request.app.state.config.OLLAMA_API_CONFIGS:
-                request_tasks.append(send_get_request(f"{url}/api/tags"))
+                request_tasks.append(get_cached_models(url, None, config_version))
             else:
                 api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(url, {})
                 enable = api_config.get("enable", True)
                 key = api_config.get("key", None)
 
                 if enable:
-                    request_tasks.append(send_get_request(f"{url}/api/tags", key))
+                    request_tasks.append(get_cached_models(url, key, config_version))
                 else:
                     request_tasks.append(asyncio.ensure_future(asyncio.sleep(0, None)))
 
@@ -280,17 +304,27 @@ async def get_all_models(request: Request):
                 prefix_id = api_config.get("prefix_id", None)
                 model_ids = api_config.get("model_ids", [])
 
+                # Cached responses are shared, so filter and prefix copies
                 if len(model_ids) != 0 and "models" in response:
-                    response["models"] = list(
-                        filter(
-                            lambda model: model["model"] in model_ids,
-                            response["models"],
-                        )
-                    )
+                    response = {
+                        **response,
+                        "models": [
+                            model
+                            for model in response["models"]
+                            if model["model"] in model_ids
+                        ],
+                    }
 
                 if prefix_id:
-                    for model in response.get("models", []):
-                        model["model"] = f"{prefix_id}.{model['model']}"
+                    response = {
+                        **response,
+                        "models": [
+                            {**model, "model": f"{prefix_id}.{model['model']}"}
+                            for model in response.get("models", [])
+                        ],
+                    }
+
+                responses[idx] = response
 
         def merge_models_lists(model_lists):
             merged_models = {}
@@ -300,8 +334,7 @@ async def get_all_models(request: Request):
                     for model in model_list:
                         id = model["model"]
                         if id not in merged_models:
-                            model["urls"] = [idx]
-                            merged_models[id] = model
+                            merged_models[id] = {**model, "urls": [idx]}
                         else:
                             merged_models[id]["urls"].append(idx)
 
@@ -485,11 +518,12 @@ async def pull_model(
     # Admin should be able to pull models from any source
     payload = {**form_data.model_dump(exclude_none=True), "insecure": True}
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/pull",
         payload=json.dumps(payload),
         key=get_api_key(url, request.app.state.config.OLLAMA_API_CONFIGS),
     )
+    return invalidate_models_after(response, url)
 
 
 class PushModelForm(BaseModel):
@@ -546,11 +580,12 @@ async def create_model(
     log.debug(f"form_data: {form_data}")
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/create",
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url, request.app.state.config.OLLAMA_API_CONFIGS),
     )
+    return invalidate_models_after(response, url)
 
 
 class CopyModelForm(BaseModel):
@@ -592,6 +627,7 @@ async def copy_model(
             data=form_data.model_dump_json(exclude_none=True).encode(),
         )
         r.raise_for_status()
+        await model_list_cache.invalidate(f"{url}/api/tags")
 
         log.debug(f"r.text: {r.text}")
         return True
@@ -647,6 +683,7 @@ async def delete_model(
             },
         )
         r.raise_for_status()
+        await model_list_cache.invalidate(f"{url}/api/tags")
 
         log.debug(f"r.text: {r.text}")
         return True
@@ -6,7 +6,6 @@ from pathlib import Path
 from typing import Literal, Optional, overload
 
 import aiohttp
-from aiocache import cached
 import requests
 
 
@@ -37,6 +36,7 @@ from open_webui.utils.payload import (
 )
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.model_list_cache import get_config_version, model_list_cache
 from open_webui.utils.access_control import has_access
 
 
@@ -64,6 +64,15 @@ async def send_get_request(url, key=None):
         return None
 
 
+def get_cached_models(url: str, key: Optional[str], config_version: str):
+    return model_list_cache.get(
+        f"{url}/models",
+        key,
+        config_version,
+        lambda: send_get_request(f"{url}/models", key),
+    )
+
+
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
     session: Optional[aiohttp.ClientSession],
@@ -261,12 +270,17 @@ async def get_all_models_responses(request: Request) -> list:
         else:
             request.app.state.config.OPENAI_API_KEYS += [""] * (num_urls - num_keys)
 
+    config_version = get_config_version(
+        request.app.state.config.OPENAI_API_BASE_URLS,
+        request.app.state.config.OPENAI_API_CONFIGS,
+    )
+
     request_tasks = []
     for idx, url in enumerate(request.app.state.config.OPENAI_API_BASE_URLS):
         if url not in request.app.state.config.OPENAI_API_CONFIGS:
             request_tasks.append(
-                send_get_request(
-                    f"{url}/models", request.app.state.config.OPENAI_API_KEYS[idx]
+                get_cached_models(
+                    url, request.app.state.config.OPENAI_API_KEYS[idx], config_version
                 )
             )
         else:
@@ -278,9 +292,10 @@ async def get_all_models_responses(request: Request) -> list:
             if enable:
                 if len(model_ids) == 0:
                     request_tasks.append(
-                        send_get_request(
-                            f"{url}/models",
+                        get_cached_models(
+                            url,
                             request.app.state.config.OPENAI_API_KEYS[idx],
+                            config_version,
                         )
                     )
                 else:
@@ -314,10 +329,20 @@ async def get_all_models_responses(request: Request) -> list:
             prefix_id = api_config.get("prefix_id", None)
 
             if prefix_id:
-                for model in (
-                    response if isinstance(response, list) else response.get("data", [])
-                ):
-                    model["id"] = f"{prefix_id}.{model['id']}"
+                # Cached responses are shared, so prefix copies of the models
+                models = [
+                    {**model, "id": f"{prefix_id}.{model['id']}"}
+                    for model in (
+                        response
+                        if isinstance(response, list)
+                        else response.get("data", [])
+                    )
+                ]
+                responses[idx] = (
+                    models
+                    if isinstance(response, list)
+                    else {**response, "data": models}
+                )
 
     log.debug("get_all_models_responses", responses=responses)
     return responses
@@ -336,7 +361,6 @@ async def get_filtered_models(models, user):
     return filtered_models
 
 
-@cached(ttl=3)
 async def get_all_models(request: Request) -> dict[str, list]:
     log.debug("get_all_models()")
 
@@ -9,15 +9,23 @@ from fastapi import (
     status,
     APIRouter,
 )
+import asyncio
 import os
 import logging
 import shutil
+import time
+import aiohttp
 import requests
 from pydantic import BaseModel
 from starlette.responses import FileResponse
 from typing import Optional
 
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import (
+    PIPELINE_FILTER_BREAKER_COOLDOWN,
+    PIPELINE_FILTER_BREAKER_THRESHOLD,
+    PIPELINE_FILTER_TIMEOUT,
+    SRC_LOG_LEVELS,
+)
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 
@@ -56,98 +64,308 @@ def get_sorted_filters(model_id, models):
     return sorted_filters
 
 
-def process_pipeline_inlet_filter(request, payload, user, models):
-    user = {"id": user.id, "email": user.email, "name": user.name, "role": user.role}
-    model_id = payload["model"]
+class PipelineFilterError(Exception):
+    """A pipelines server answered a filter call with an HTTP error."""
+
+    def __init__(self, status: int, res: Optional[dict]):
+        super().__init__(status, res)
+        self.status = status
+        self.res = res
+
+
+class CircuitBreaker:
+    """Skips a filter whose pipelines server keeps failing to answer.
+
+    After `threshold` consecutive connection failures or timeouts the breaker
+    opens and the filter is skipped, as unreachable filters always were, without
+    waiting for the timeout. Once `cooldown` seconds have passed a call is let
+    through again and a single failure reopens it.
+    """
+
+    def __init__(
+        self,
+        threshold: int = PIPELINE_FILTER_BREAKER_THRESHOLD,
+        cooldown: int = PIPELINE_FILTER_BREAKER_COOLDOWN,
+    ):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return False
+        self.opened_at = None
+        self.failures = self.threshold - 1
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+_session: Optional[aiohttp.ClientSession] = None
+# (url, filter id) -> CircuitBreaker
+_breakers = {}
+# Pipelines servers that answered 404 to the batch endpoint
+_batch_unsupported = set()
+# (url, filter id) of filters that claimed to be commutative but changed the
+# same key as a neighbour
+_not_commutative = set()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Shared session, so filter calls reuse pooled connections."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(trust_env=True)
+    return _session
+
+
+async def close_session():
+    if _session is not None:
+        await _session.close()
+
+
+def get_breaker(url: str, filter_id: str) -> CircuitBreaker:
+    breaker = _breakers.get((url, filter_id))
+    if breaker is None:
+        breaker = _breakers[(url, filter_id)] = CircuitBreaker()
+    return breaker
+
+
+async def post_filter(url: str, key: str, path: str, data: dict, timeout: float):
+    async with get_session().post(
+        f"{url}/{path}",
+        headers={"Authorization": f"Bearer {key}"},
+        json=data,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    ) as r:
+        if r.status >= 400:
+            try:
+                res = await r.json(content_type=None)
+            except Exception:
+                res = None
+            raise PipelineFilterError(r.status, res)
+        return await r.json(content_type=None)
 
-    sorted_filters = get_sorted_filters(model_id, models)
-    model = models[model_id]
 
-    if "pipeline" in model:
-        sorted_filters.append(model)
+def raise_filter_error(e: PipelineFilterError, stage: str):
+    log.error(f"Pipeline {stage} filter error: {e.status} {e.res}")
+    if isinstance(e.res, dict) and "detail" in e.res:
+        if stage == "inlet":
+            raise Exception(e.status, e.res["detail"])
+        raise Exception(e.status, e.res)
 
-    for filter in sorted_filters:
-        r = None
-        try:
-            urlIdx = filter["urlIdx"]
 
-            url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
-            key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
+async def call_filter(filter: dict, stage: str, payload: dict, user: dict) -> dict:
+    url, key = filter["url"], filter["key"]
+    breaker = get_breaker(url, filter["id"])
+    if not breaker.allow():
+        log.warning(f"Skipping {stage} filter {filter['id']}: circuit open")
+        return payload
 
-            if key == "":
-                continue
+    try:
+        payload = await post_filter(
+            url,
+            key,
+            f"{filter['id']}/filter/{stage}",
+            {"user": user, "body": payload},
+            PIPELINE_FILTER_TIMEOUT,
+        )
+        breaker.record_success()
+    except PipelineFilterError as e:
+        # The server answered, so the filter is reachable
+        breaker.record_success()
+        raise_filter_error(e, stage)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        breaker.record_failure()
+        log.error(f"Connection error calling {stage} filter {filter['id']}: {e}")
+    return payload
 
-            headers = {"Authorization": f"Bearer {key}"}
-            r = requests.post(
-                f"{url}/{filter['id']}/filter/inlet",
-                headers=headers,
-                json={
-                    "user": user,
-                    "body": payload,
-                },
-            )
 
-            r.raise_for_status()
-            payload = r.json()
-        except Exception as e:
-            # Handle connection error here
-            print(f"Connection error: {e}")
+async def call_filter_batch(
+    filters: list[dict], stage: str, payload: dict, user: dict
+) -> dict:
+    """Runs filters hosted on one pipelines server in a single request.
 
-            if r is not None:
-                res = r.json()
-                if "detail" in res:
-                    raise Exception(r.status_code, res["detail"])
+    Falls back to one request per filter on servers without the batch endpoint.
+    """
+    url, key = filters[0]["url"], filters[0]["key"]
+    filters = [filter for filter in filters if get_breaker(url, filter["id"]).allow()]
+    if len(filters) < 2 or url in _batch_unsupported:
+        for filter in filters:
+            payload = await call_filter(filter, stage, payload, user)
+        return payload
 
+    try:
+        res = await post_filter(
+            url,
+            key,
+            f"filters/{stage}:batch",
+            {
+                "filter_ids": [filter["id"] for filter in filters],
+                "user": user,
+                "body": payload,
+                "timeout": PIPELINE_FILTER_TIMEOUT,
+            },
+            PIPELINE_FILTER_TIMEOUT * len(filters),
+        )
+        timed_out = {
+            timing.get("id")
+            for timing in res.get("timings") or []
+            if timing.get("timed_out")
+        }
+        for filter in filters:
+            breaker = get_breaker(url, filter["id"])
+            if filter["id"] in timed_out:
+                # The server skipped it, but it holds up every request it runs in
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        log.debug(f"Pipeline {stage} filter timings: {res.get('timings')}")
+        return res["body"]
+    except PipelineFilterError as e:
+        # Older servers have no such route and answer with the default error
+        if e.res in ({"detail": "Not Found"}, {"detail": "Method Not Allowed"}):
+            _batch_unsupported.add(url)
+            return await call_filter_batch(filters, stage, payload, user)
+        raise_filter_error(e, stage)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # The batch can't tell which filter failed; calling them one by one
+        # charges each breaker only for its own filter
+        log.error(f"Connection error calling {stage} filters at {url}: {e}")
+        for filter in filters:
+            payload = await call_filter(filter, stage, payload, user)
     return payload
 
 
-def process_pipeline_outlet_filter(request, payload, user, models):
+async def call_commutative_filters(
+    filters: list[dict], stage: str, payload: dict, user: dict
+) -> dict:
+    """Runs filters that don't depend on each other's changes concurrently.
+
+    A filter that declares itself commutative promises to only change
+    top-level body keys that its commutative neighbours leave alone. Each
+    filter sees the same input body, and the keys each one changed are
+    applied to it in priority order. A filter that changes a key an earlier
+    one in the group already changed has broken that promise. Its result is
+    discarded, it is run again on the merged body, and from then on it runs
+    sequentially.
+    """
+    results = await asyncio.gather(
+        *[call_filter(filter, stage, payload, user) for filter in filters]
+    )
+
+    merged = {**payload}
+    changed_keys = set()
+    conflicting = []
+    for filter, result in zip(filters, results):
+        if not isinstance(result, dict):
+            continue
+
+        changed = {
+            key
+            for key, value in result.items()
+            if key not in payload or payload[key] != value
+        } | {key for key in payload if key not in result}
+        if changed & changed_keys:
+            conflicting.append(filter)
+            continue
+
+        changed_keys |= changed
+        for key in changed:
+            if key in result:
+                merged[key] = result[key]
+            else:
+                merged.pop(key, None)
+
+    for filter in conflicting:
+        log.warning(
+            f"Commutative {stage} filter {filter['id']} changed the same keys as "
+            "another filter in its group; running it sequentially"
+        )
+        _not_commutative.add((filter["url"], filter["id"]))
+        merged = await call_filter(filter, stage, merged, user)
+    return merged
+
+
+async def process_pipeline_filters(request, filters, payload, user, stage):
     user = {"id": user.id, "email": user.email, "name": user.name, "role": user.role}
+
+    chain = []
+    for filter in filters:
+        urlIdx = filter["urlIdx"]
+        key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
+        if key == "":
+            continue
+
+        url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
+        chain.append(
+            {
+                "id": filter["id"],
+                "url": url,
+                "key": key,
+                "commutative": filter["pipeline"].get("commutative", False)
+                and (url, filter["id"]) not in _not_commutative,
+            }
+        )
+
+    # Group neighbouring filters that can run in one batch or concurrently
+    groups = []
+    for filter in chain:
+        previous = groups[-1][-1] if groups else None
+        if (
+            previous is not None
+            and previous["commutative"] == filter["commutative"]
+            and (filter["commutative"] or previous["url"] == filter["url"])
+        ):
+            groups[-1].append(filter)
+        else:
+            groups.append([filter])
+
+    for group in groups:
+        if group[0]["commutative"] and len(group) > 1:
+            payload = await call_commutative_filters(group, stage, payload, user)
+        else:
+            payload = await call_filter_batch(group, stage, payload, user)
+
+    return payload
+
+
+async def process_pipeline_inlet_filter(request, payload, user, models):
     model_id = payload["model"]
 
     sorted_filters = get_sorted_filters(model_id, models)
     model = models[model_id]
 
     if "pipeline" in model:
-        sorted_filters = [model] + sorted_filters
+        sorted_filters.append(model)
 
-    for filter in sorted_filters:
-        r = None
-        try:
-            urlIdx = filter["urlIdx"]
-
-            url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
-            key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
-
-            if key != "":
-                r = requests.post(
-                    f"{url}/{filter['id']}/filter/outlet",
-                    headers={"Authorization": f"Bearer {key}"},
-                    json={
-                        "user": user,
-                        "body": payload,
-                    },
-                )
-
-                r.raise_for_status()
-                data = r.json()
-                payload = data
-        except Exception as e:
-            # Handle connection error here
-            print(f"Connection error: {e}")
-
-            if r is not None:
-                try:
-                    res = r.json()
-                    if "detail" in res:
-                        return Exception(r.status_code, res)
-                except Exception:
-                    pass
+    return await process_pipeline_filters(
+        request, sorted_filters, payload, user, "inlet"
+    )
 
-            else:
-                pass
 
-    return payload
+async def process_pipeline_outlet_filter(request, payload, user, models):
+    model_id = payload["model"]
+
+    sorted_filters = get_sorted_filters(model_id, models)
+    model = models[model_id]
+
+    if "pipeline" in model:
+        sorted_filters = [model] + sorted_filters
+
+    return await process_pipeline_filters(
+        request, sorted_filters, payload, user, "outlet"
+    )
 
 
 ##################################
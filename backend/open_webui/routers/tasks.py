@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 
 from pydantic import BaseModel
+import asyncio
 from typing import Optional
 import structlog
 
@@ -19,6 +20,9 @@ from open_webui.constants import TASKS
 
 from open_webui.routers.pipelines import process_pipeline_inlet_filter
 from open_webui.utils.task import get_task_model_id
+from open_webui.utils.task_cache import task_response_cache
+from open_webui.utils.misc import get_last_user_message
+from open_webui.utils.stream import dumps, iter_sse_data, loads
 
 from open_webui.config import config
 from open_webui.env import SRC_LOG_LEVELS
@@ -36,6 +40,14 @@ router = APIRouter()
 ##################################
 
 
+async def generate_task_completion(request: Request, payload: dict, user):
+    return await task_response_cache.get_or_generate(
+        user.id,
+        payload,
+        lambda: generate_chat_completion(request, form_data=payload, user=user),
+    )
+
+
 @router.get("/config")
 async def get_task_config(request: Request, user=Depends(get_verified_user)):
     return {
@@ -175,7 +187,7 @@ async def generate_title(
     }
 
     try:
-        return await generate_chat_completion(request, form_data=payload, user=user)
+        return await generate_task_completion(request, payload, user)
     except Exception as e:
         log.exception("generate_title:error", exc_info=e)
         return JSONResponse(
@@ -236,7 +248,7 @@ async def generate_chat_tags(
     }
 
     try:
-        return await generate_chat_completion(request, form_data=payload, user=user)
+        return await generate_task_completion(request, payload, user)
     except Exception as e:
         log.exception(f"generate_chat_tags:error", exc_info=e)
         return JSONResponse(
@@ -313,7 +325,7 @@ async def generate_queries(
     log.debug("generate_queries:check_payload", payload=payload)
 
     try:
-        return await generate_chat_completion(request, form_data=payload, user=user)
+        return await generate_task_completion(request, payload, user)
     except Exception as e:
         log.exception("generate_queries:error", exc_info=e)
         return JSONResponse(
@@ -388,7 +400,7 @@ async def generate_autocompletion(
     }
 
     try:
-        return await generate_chat_completion(request, form_data=payload, user=user)
+        return await generate_task_completion(request, payload, user)
     except Exception as e:
         log.exception(f"generate_autocompletion:error", exc_info=e)
         return JSONResponse(
@@ -448,7 +460,7 @@ async def generate_emoji(
     }
 
     try:
-        return await generate_chat_completion(request, form_data=payload, user=user)
+        return await generate_task_completion(request, payload, user)
     except Exception as e:
         log.exception("generate_emoji:error", exc_info=e)
         return JSONResponse(
@@ -457,25 +469,11 @@ async def generate_emoji(
         )
 
 
-@router.post("/moa/completions")
-async def generate_moa_response(
-    request: Request, form_data: dict, user=Depends(get_verified_user)
-):
-    log.debug("generate_moa_response", form_data=form_data, user=user.email)
-
-    models = request.app.state.MODELS
-    model_id = form_data["model"]
-
-    if model_id not in models:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Model not found",
-        )
-
+def get_moa_payload(request: Request, form_data: dict, models: dict) -> dict:
     # Check if the user has a custom task model
     # If the user has a custom task model, use that model
     task_model_id = get_task_model_id(
-        model_id,
+        form_data["model"],
         request.app.state.config.TASK_MODEL,
         request.app.state.config.TASK_MODEL_EXTERNAL,
         models,
@@ -489,7 +487,7 @@ async def generate_moa_response(
         form_data["responses"],
     )
 
-    payload = {
+    return {
         "model": task_model_id,
         "messages": [{"role": "user", "content": content}],
         "stream": form_data.get("stream", False),
@@ -500,6 +498,24 @@ async def generate_moa_response(
         },
     }
 
+
+@router.post("/moa/completions")
+async def generate_moa_response(
+    request: Request, form_data: dict, user=Depends(get_verified_user)
+):
+    log.debug("generate_moa_response", form_data=form_data, user=user.email)
+
+    models = request.app.state.MODELS
+    model_id = form_data["model"]
+
+    if model_id not in models:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Model not found",
+        )
+
+    payload = get_moa_payload(request, form_data, models)
+
     try:
         return await generate_chat_completion(request, form_data=payload, user=user)
     except Exception as e:
@@ -508,3 +524,151 @@ async def generate_moa_response(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"detail": str(e)},
         )
+
+
+@router.post("/fanout/completions")
+async def generate_fanout_response(
+    request: Request, form_data: dict, user=Depends(get_verified_user)
+):
+    """Streams the answers of several models to the same messages concurrently.
+
+    Takes the chat completion body with a list of `models` instead of one
+    model. Every event carries the `index` and `model` it belongs to:
+    `{"chunk": ...}` for each upstream chunk, `{"error": ...}` if the model
+    failed and finally `{"done": true, "content": ...}`. With `aggregate` set,
+    a mixture-of-agents answer from the task model for `model` (the first of
+    `models` by default) starts streaming as soon as `quorum` answers (all by
+    default) are complete; its events carry `"aggregate": true` instead of an
+    index. The stream ends with `[DONE]` once every model and the aggregation
+    have finished.
+    """
+    log.debug("generate_fanout_response", form_data=form_data, user=user.email)
+
+    models = request.app.state.MODELS
+
+    model_ids = form_data.get("models") or []
+    if not model_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one model is required",
+        )
+    # Checked here, as errors can't be sent as a status once streaming starts
+    aggregate_model_id = form_data.get("model") or model_ids[0]
+    for model_id in [*model_ids, aggregate_model_id]:
+        if model_id not in models:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Model not found: {model_id}",
+            )
+
+    aggregate = form_data.get("aggregate", False)
+    quorum = min(form_data.get("quorum") or len(model_ids), len(model_ids))
+    prompt = form_data.get("prompt") or get_last_user_message(form_data["messages"])
+
+    body = {
+        key: value
+        for key, value in form_data.items()
+        if key not in ("models", "model", "aggregate", "quorum", "prompt")
+    }
+
+    queue = asyncio.Queue()
+
+    async def stream_completion(payload: dict, tags: dict):
+        content = ""
+        try:
+            response = await generate_chat_completion(
+                request, form_data=payload, user=user
+            )
+
+            if hasattr(response, "body_iterator"):
+                try:
+                    async for data in iter_sse_data(response.body_iterator):
+                        if data == b"[DONE]":
+                            continue
+                        chunk = loads(data)
+                        if "error" in chunk:
+                            await queue.put({**tags, "error": chunk["error"]})
+                            continue
+
+                        choices = chunk.get("choices") or [{}]
+                        content += choices[0].get("delta", {}).get("content") or ""
+                        await queue.put({**tags, "chunk": chunk})
+                finally:
+                    if response.background is not None:
+                        await response.background()
+            else:
+                content = response["choices"][0]["message"]["content"]
+                await queue.put({**tags, "chunk": response})
+        except Exception as e:
+            log.exception("generate_fanout_response:error", exc_info=e, **tags)
+            await queue.put({**tags, "error": {"detail": str(e)}})
+            content = None
+
+        await queue.put({**tags, "done": True, "content": content})
+
+    async def event_stream():
+        tasks = [
+            asyncio.create_task(
+                stream_completion(
+                    {**body, "model": model_id, "stream": True},
+                    {"index": idx, "model": model_id},
+                )
+            )
+            for idx, model_id in enumerate(model_ids)
+        ]
+
+        remaining = len(model_ids) + (1 if aggregate else 0)
+        finished = 0
+        responses = []
+        aggregating = False
+
+        try:
+            while remaining:
+                event = await queue.get()
+                yield f"data: {dumps(event)}\n\n"
+
+                if not event.get("done"):
+                    continue
+                remaining -= 1
+                if event.get("aggregate"):
+                    continue
+
+                finished += 1
+                if event["content"]:
+                    responses.append(event["content"])
+
+                if not aggregate or aggregating:
+                    continue
+                if len(responses) >= quorum or finished == len(model_ids):
+                    aggregating = True
+                    if not responses:
+                        remaining -= 1
+                        error = {"aggregate": True, "error": {"detail": "No responses"}}
+                        yield f"data: {dumps(error)}\n\n"
+                        continue
+
+                    payload = get_moa_payload(
+                        request,
+                        {
+                            **body,
+                            "model": aggregate_model_id,
+                            "prompt": prompt,
+                            "responses": responses,
+                            "stream": True,
+                        },
+                        models,
+                    )
+                    tasks.append(
+                        asyncio.create_task(
+                            stream_completion(
+                                payload, {"aggregate": True, "model": payload["model"]}
+                            )
+                        )
+                    )
+
+            yield "data: [DONE]\n\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -0,0 +1,132 @@
+import pytest
+
+from open_webui.routers import pipelines
+from open_webui.routers.pipelines import CircuitBreaker, call_commutative_filters
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pipelines.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_circuit_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_success_resets_failures(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+
+
+def test_circuit_breaker_half_opens_after_cooldown(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock[0] += 29
+    assert not breaker.allow()
+
+    clock[0] += 1
+    assert breaker.allow()
+
+    # A single failed trial call reopens it
+    breaker.record_failure()
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_closes_after_successful_trial(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+
+
+@pytest.fixture
+def fake_filters(monkeypatch):
+    """Replaces call_filter with local functions of the payload."""
+    handlers = {}
+    calls = []
+
+    async def call_filter(filter, stage, payload, user):
+        calls.append((filter["id"], payload))
+        return handlers[filter["id"]](payload)
+
+    monkeypatch.setattr(pipelines, "call_filter", call_filter)
+    monkeypatch.setattr(pipelines, "_not_commutative", set())
+    return handlers, calls
+
+
+def make_filter(filter_id):
+    return {"id": filter_id, "url": "http://pipelines", "key": "key"}
+
+
+@pytest.mark.asyncio
+async def test_commutative_filters_merge_disjoint_changes(fake_filters):
+    handlers, calls = fake_filters
+    handlers["tag"] = lambda body: {**body, "tag": "x"}
+    handlers["strip"] = lambda body: {
+        key: value for key, value in body.items() if key != "debug"
+    }
+
+    payload = {"model": "m", "messages": [], "debug": True}
+    merged = await call_commutative_filters(
+        [make_filter("tag"), make_filter("strip")], "inlet", payload, {}
+    )
+
+    assert merged == {"model": "m", "messages": [], "tag": "x"}
+    assert [filter_id for filter_id, _ in calls] == ["tag", "strip"]
+    assert pipelines._not_commutative == set()
+
+
+@pytest.mark.asyncio
+async def test_commutative_filters_rerun_conflicting_filter(fake_filters):
+    handlers, calls = fake_filters
+    handlers["first"] = lambda body: {
+        **body,
+        "messages": body["messages"] + ["first"],
+    }
+    handlers["second"] = lambda body: {
+        **body,
+        "messages": body["messages"] + ["second"],
+    }
+
+    payload = {"model": "m", "messages": []}
+    merged = await call_commutative_filters(
+        [make_filter("first"), make_filter("second")], "inlet", payload, {}
+    )
+
+    # Neither change is lost; the conflicting filter ran again on the merge
+    assert merged["messages"] == ["first", "second"]
+    assert calls[-1] == ("second", {"model": "m", "messages": ["first"]})
+    assert pipelines._not_commutative == {("http://pipelines", "second")}
+
+
+@pytest.mark.asyncio
+async def test_commutative_filters_ignore_non_dict_results(fake_filters):
+    handlers, _ = fake_filters
+    handlers["broken"] = lambda body: None
+    handlers["tag"] = lambda body: {**body, "tag": "x"}
+
+    merged = await call_commutative_filters(
+        [make_filter("broken"), make_filter("tag")], "inlet", {"model": "m"}, {}
+    )
+
+    assert merged == {"model": "m", "tag": "x"}
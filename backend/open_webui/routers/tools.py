@@ -12,7 +12,7 @@ from open_webui.utils.plugin import load_tools_module_by_id, replace_imports
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from open_webui.utils.tools import get_tools_specs
+from open_webui.utils.tools import get_tools_specs, tool_registry
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
 
@@ -99,6 +99,7 @@ async def create_new_tools(
 
             specs = get_tools_specs(TOOLS[form_data.id])
             tools = Tools.insert_new_tool(user.id, form_data, specs)
+            tool_registry.invalidate(form_data.id)
 
             tool_cache_dir = Path(CACHE_DIR) / "tools" / form_data.id
             tool_cache_dir.mkdir(parents=True, exist_ok=True)
@@ -190,6 +191,7 @@ async def update_tools_by_id(
 
         print(updated)
         tools = Tools.update_tool_by_id(id, updated)
+        tool_registry.invalidate(id)
 
         if tools:
             return tools
@@ -233,6 +235,7 @@ async def delete_tools_by_id(
         TOOLS = request.app.state.TOOLS
         if id in TOOLS:
             del TOOLS[id]
+        tool_registry.invalidate(id)
 
     return result
 
@@ -321,6 +324,7 @@ async def update_tools_valves_by_id(
         form_data = {k: v for k, v in form_data.items() if v is not None}
         valves = Valves(**form_data)
         Tools.update_tool_valves_by_id(id, valves.model_dump())
+        tool_registry.invalidate(id)
         return valves.model_dump()
     except Exception as e:
         print(e)
@@ -13,6 +13,7 @@ from open_webui.env import (
     WEBSOCKET_MANAGER,
     WEBSOCKET_REDIS_URL,
 )
+from open_webui.utils import stream as stream_json
 from open_webui.utils.auth import decode_token
 from open_webui.socket.utils import RedisDict, RedisLock
 
@@ -35,6 +36,7 @@ if WEBSOCKET_MANAGER == "redis":
         transports=(["websocket"] if ENABLE_WEBSOCKET_SUPPORT else ["polling"]),
         allow_upgrades=ENABLE_WEBSOCKET_SUPPORT,
         always_connect=True,
+        json=stream_json,
         client_manager=mgr,
     )
 else:
@@ -44,6 +46,7 @@ else:
         transports=(["websocket"] if ENABLE_WEBSOCKET_SUPPORT else ["polling"]),
         allow_upgrades=ENABLE_WEBSOCKET_SUPPORT,
         always_connect=True,
+        json=stream_json,
     )
 
 
@@ -300,6 +303,13 @@ def get_event_emitter(request_info):
                 event_data.get("data", {}),
             )
 
+        if "type" in event_data and event_data["type"] in ("source", "citation"):
+            Chats.add_message_source_to_chat_by_id_and_message_id(
+                request_info["chat_id"],
+                request_info["message_id"],
+                event_data.get("data", {}),
+            )
+
         if "type" in event_data and event_data["type"] == "message":
             message = Chats.get_message_by_id_and_message_id(
                 request_info["chat_id"],
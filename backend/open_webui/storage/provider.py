@@ -1,118 +1,478 @@
+import asyncio
+import hashlib
 import os
+import re
+import threading
+import time
 import boto3
+from abc import ABC, abstractmethod
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 import shutil
 import logging
+from collections import OrderedDict
 
+import aiofiles
+import aiofiles.os
 
-from typing import BinaryIO, Tuple, Optional, Union
+from typing import AsyncIterator, BinaryIO, Callable, Tuple, Optional, Union
 
 from open_webui.env import SRC_LOG_LEVELS
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.config import (
     config,
+    S3_CACHE_DIR,
+    S3_CACHE_MAX_SIZE,
+    S3_CACHE_VALIDATE_TTL,
+    S3_MAX_CONCURRENCY,
+    S3_MULTIPART_PART_SIZE,
+    UPLOAD_CHUNK_SIZE,
     UPLOAD_DIR,
 )
 
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class S3MultipartWriter:
+    """Feeds a stream into an S3 multipart upload one part at a time.
+
+    Only the part being filled is held in memory. Uploads smaller than one part
+    are sent with a single put_object call instead.
+    """
+
+    def __init__(
+        self, s3_client, bucket_name: str, key: str, part_size=S3_MULTIPART_PART_SIZE
+    ):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.part_size = part_size
+
+        self.buffer = bytearray()
+        self.upload_id: Optional[str] = None
+        self.parts = []
+
+    def write(self, chunk: bytes) -> None:
+        self.buffer += chunk
+        if len(self.buffer) >= self.part_size:
+            self._upload_part()
+
+    def _upload_part(self) -> None:
+        if self.upload_id is None:
+            self.upload_id = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name, Key=self.key
+            )["UploadId"]
+
+        part_number = len(self.parts) + 1
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=self.buffer,
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        self.buffer = bytearray()
+
+    def complete(self) -> str:
+        """Finishes the upload and returns the object's ETag."""
+        if self.upload_id is None:
+            response = self.s3_client.put_object(
+                Bucket=self.bucket_name, Key=self.key, Body=self.buffer
+            )
+            return response["ETag"]
+
+        if self.buffer:
+            self._upload_part()
+        response = self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self.parts},
+        )
+        return response["ETag"]
 
-import boto3
-from botocore.exceptions import ClientError
-from typing import BinaryIO, Tuple, Optional
+    def abort(self) -> None:
+        if self.upload_id is None:
+            return
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id
+            )
+        except ClientError as e:
+            log.error(f"Error aborting multipart upload of {self.key}: {e}")
+
+
+def parse_range_header(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parses a single-range ``bytes=`` header into inclusive (start, end) offsets.
+
+    Returns None for multi-range, malformed or unsatisfiable ranges.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+    if start == "":
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0 or size == 0:
+            return None
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return None
+    return start, end
+
+
+async def aiter_file_range(
+    file_path: str, start: int, end: int, chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    async with aiofiles.open(file_path, "rb") as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def aiter_s3_body(
+    body, chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Reads a botocore StreamingBody chunk by chunk off the event loop."""
+    try:
+        while chunk := await asyncio.to_thread(body.read, chunk_size):
+            yield chunk
+    finally:
+        body.close()
+
+
+class S3FileCache:
+    """Local read-through cache for S3 objects.
+
+    Objects are stored content-addressed by ETag as ``{cache_dir}/{etag}/{name}``,
+    so the same upload referenced by different keys is stored once. A key's ETag
+    is checked with a HEAD request at most once per ``validate_ttl`` seconds.
+    Concurrent requests for an object that is not cached yet wait for a single
+    download. The least recently used objects are evicted once the cache grows
+    past ``max_size`` bytes.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        cache_dir: str = S3_CACHE_DIR,
+        max_size: int = S3_CACHE_MAX_SIZE,
+        validate_ttl: int = S3_CACHE_VALIDATE_TTL,
+    ):
+        self.s3_client = s3_client
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.validate_ttl = validate_ttl
+        # Large objects are downloaded as parallel ranged GETs
+        self.transfer_config = TransferConfig(max_concurrency=S3_MAX_CONCURRENCY)
+
+        self.lock = threading.Lock()
+        # etag -> size in bytes, least recently used first
+        self.entries = OrderedDict()
+        self.total_size = 0
+        # (bucket, key) -> (etag, size, validated_at)
+        self.objects = {}
+        # etag -> threading.Event set when its download finishes
+        self.downloads = {}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def _normalize_etag(etag: str) -> str:
+        return re.sub(r"[^A-Za-z0-9-]", "", etag)
+
+    def _load(self) -> None:
+        """Rebuilds the LRU index from the cache directory, oldest access first."""
+        found = []
+        for etag in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, etag)
+            if not os.path.isdir(entry_dir):
+                continue
+
+            names = [
+                name for name in os.listdir(entry_dir) if not name.endswith(".part")
+            ]
+            if not names:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                continue
+
+            stat = os.stat(os.path.join(entry_dir, names[0]))
+            found.append((stat.st_atime, etag, stat.st_size))
+
+        for _, etag, size in sorted(found):
+            self.entries[etag] = size
+            self.total_size += size
+
+    def _path(self, etag: str, key: str) -> str:
+        return os.path.join(self.cache_dir, etag, os.path.basename(key))
+
+    def _validate(self, bucket_name: str, key: str) -> Tuple[str, int]:
+        cached = self.objects.get((bucket_name, key))
+        if cached and time.monotonic() - cached[2] < self.validate_ttl:
+            return cached[0], cached[1]
+
+        response = self.s3_client.head_object(Bucket=bucket_name, Key=key)
+        etag = self._normalize_etag(response["ETag"])
+        size = response["ContentLength"]
+        self.objects[(bucket_name, key)] = (etag, size, time.monotonic())
+        return etag, size
+
+    def _lookup(self, etag: str, key: str) -> Optional[str]:
+        """Returns the cached path for etag, linking it under key's name if needed.
+
+        Must be called with the lock held.
+        """
+        if etag not in self.entries:
+            return None
+
+        path = self._path(etag, key)
+        if not os.path.isfile(path):
+            entry_dir = os.path.dirname(path)
+            names = [
+                name for name in os.listdir(entry_dir) if not name.endswith(".part")
+            ]
+            if not names:
+                return None
+            os.link(os.path.join(entry_dir, names[0]), path)
+
+        self.entries.move_to_end(etag)
+        return path
+
+    def _add(self, etag: str, size: int) -> None:
+        """Records a new entry and evicts old ones. Must be called with the lock held."""
+        if etag not in self.entries:
+            self.entries[etag] = size
+            self.total_size += size
+        self.entries.move_to_end(etag)
+
+        while self.total_size > self.max_size and len(self.entries) > 1:
+            evicted, evicted_size = self.entries.popitem(last=False)
+            self.total_size -= evicted_size
+            shutil.rmtree(os.path.join(self.cache_dir, evicted), ignore_errors=True)
+            log.debug(f"Evicted {evicted} from the S3 file cache")
+
+    def get(self, bucket_name: str, key: str) -> str:
+        """Returns a local path holding the current version of the object."""
+        etag, size = self._validate(bucket_name, key)
+
+        while True:
+            with self.lock:
+                path = self._lookup(etag, key)
+                if path:
+                    os.utime(path)
+                    return path
+
+                event = self.downloads.get(etag)
+                if event is None:
+                    event = self.downloads[etag] = threading.Event()
+                    break
+
+            # Another request is downloading this object, wait and check again
+            event.wait()
+
+        path = self._path(etag, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.s3_client.download_file(
+                bucket_name, key, f"{path}.part", Config=self.transfer_config
+            )
+            os.replace(f"{path}.part", path)
+            with self.lock:
+                self._add(etag, size)
+            return path
+        finally:
+            with self.lock:
+                self.downloads.pop(etag, None)
+            event.set()
+
+    def open_range(
+        self, bucket_name: str, key: str, range_header: str
+    ) -> Optional[Tuple[Union[str, object], int, int, int]]:
+        """Resolves a ``Range`` header to (source, start, end, size).
+
+        The source is the cached file's path, or on a miss the body of a ranged
+        GetObject so the range is read without downloading the whole object.
+        """
+        etag, size = self._validate(bucket_name, key)
+        byte_range = parse_range_header(range_header, size)
+        if byte_range is None:
+            return None
+
+        start, end = byte_range
+        with self.lock:
+            path = self._lookup(etag, key)
+        if path:
+            return path, start, end, size
+
+        response = self.s3_client.get_object(
+            Bucket=bucket_name,
+            Key=key,
+            Range=f"bytes={start}-{end}",
+            IfMatch=f'"{etag}"',
+        )
+        return response["Body"], start, end, size
+
+    def put(self, bucket_name: str, key: str, etag: str, local_path: str) -> None:
+        """Moves a freshly uploaded file into the cache."""
+        etag = self._normalize_etag(etag)
+        size = os.path.getsize(local_path)
+        path = self._path(etag, key)
+
+        with self.lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.move(local_path, path)
+            self._add(etag, size)
+            self.objects[(bucket_name, key)] = (etag, size, time.monotonic())
+
+    def invalidate(self, bucket_name: str, key: str) -> None:
+        """Forgets a deleted object and removes its file from the cache.
+
+        The entry itself is dropped once no other key's name is linked to it.
+        """
+        with self.lock:
+            cached = self.objects.pop((bucket_name, key), None)
+            # After a restart only the files are known, so look for the name
+            etags = [cached[0]] if cached else list(self.entries)
+            for etag in etags:
+                path = self._path(etag, key)
+                if not os.path.isfile(path):
+                    continue
+
+                os.remove(path)
+                entry_dir = os.path.dirname(path)
+                if etag not in self.downloads and not os.listdir(entry_dir):
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    self.total_size -= self.entries.pop(etag, 0)
+                break
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.objects.clear()
+            self.total_size = 0
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+
+class StorageProvider(ABC):
+    """Base class for file storage backends.
+
+    The blocking methods are for sync callers such as file processing. Request
+    handlers use the async methods, which keep blocking I/O off the event loop
+    and stream file contents as async iterators.
+    """
+
+    @abstractmethod
+    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[int, str, str]:
+        """Streams a file into storage.
+
+        Returns the size in bytes, the SHA-256 hex digest of the contents and the
+        stored file path.
+        """
+
+    @abstractmethod
+    def get_file(self, file_path: str) -> str:
+        """Returns a local path holding the file's contents."""
 
+    @abstractmethod
+    async def get_file_range(
+        self, file_path: str, range_header: str
+    ) -> Optional[Tuple[AsyncIterator[bytes], int, int, int]]:
+        """Returns (chunks, start, end, size) for a ``Range`` header, or None if
+        the range can't be served and the whole file should be sent instead."""
 
-class StorageProvider:
-    def __init__(self, provider: Optional[str] = None):
-        self.storage_provider: str = provider or config.STORAGE_PROVIDER
+    @abstractmethod
+    def delete_file(self, file_path: str) -> None:
+        """Deletes a file from storage."""
 
-        self.s3_client = None
-        self.s3_bucket_name: Optional[str] = None
+    @abstractmethod
+    def delete_all_files(self) -> None:
+        """Deletes all files from storage."""
 
-        if self.storage_provider == "s3":
-            self._initialize_s3()
+    async def get_file_async(self, file_path: str) -> str:
+        return await asyncio.to_thread(self.get_file, file_path)
 
-    def _initialize_s3(self) -> None:
-        """Initializes the S3 client and bucket name if using S3 storage."""
-        self.s3_client = boto3.client(
-            "s3",
-            region_name=config.S3_REGION_NAME,
-            endpoint_url=config.S3_ENDPOINT_URL,
-            aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
-        )
-        self.bucket_name = config.S3_BUCKET_NAME
+    async def delete_file_async(self, file_path: str) -> None:
+        await asyncio.to_thread(self.delete_file, file_path)
 
-    def _upload_to_s3(self, file_path: str, filename: str) -> Tuple[bytes, str]:
-        """Handles uploading of the file to S3 storage."""
-        if not self.s3_client:
-            raise RuntimeError("S3 Client is not initialized.")
+    async def delete_all_files_async(self) -> None:
+        await asyncio.to_thread(self.delete_all_files)
 
-        try:
-            self.s3_client.upload_file(file_path, self.bucket_name, filename)
-            return (
-                open(file_path, "rb").read(),
-                "s3://" + self.bucket_name + "/" + filename,
-            )
-        except ClientError as e:
-            raise RuntimeError(f"Error uploading file to S3: {e}")
-
-    def _upload_to_local(self, contents: bytes, filename: str) -> Tuple[bytes, str]:
-        """Handles uploading of the file to local storage."""
-        file_path = f"{UPLOAD_DIR}/{filename}"
-        with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
 
-    def _get_file_from_s3(self, file_path: str) -> str:
-        """Handles downloading of the file from S3 storage."""
-        if not self.s3_client:
-            raise RuntimeError("S3 Client is not initialized.")
+class LocalStorageProvider(StorageProvider):
+    def upload_file(
+        self,
+        file: BinaryIO,
+        filename: str,
+        on_chunk: Optional[Callable[[bytes], None]] = None,
+    ) -> Tuple[int, str, str]:
+        """Handles uploading of the file to local storage.
 
+        The file is copied in UPLOAD_CHUNK_SIZE chunks, hashing and measuring
+        it on the way, and each chunk is also passed to ``on_chunk``.
+        """
+        file_path = f"{UPLOAD_DIR}/{filename}"
+        sha256 = hashlib.sha256()
+        size = 0
         try:
-            bucket_name, key = file_path.split("//")[1].split("/")
-            local_file_path = f"{UPLOAD_DIR}/{key}"
-            self.s3_client.download_file(bucket_name, key, local_file_path)
-            return local_file_path
-        except ClientError as e:
-            raise RuntimeError(f"Error downloading file from S3: {e}")
+            with open(file_path, "wb") as f:
+                while chunk := file.read(UPLOAD_CHUNK_SIZE):
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+                    if on_chunk:
+                        on_chunk(chunk)
+
+            if size == 0:
+                raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        except Exception:
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+            raise
+
+        return size, sha256.hexdigest(), file_path
 
-    def _get_file_from_local(self, file_path: str) -> str:
+    def get_file(self, file_path: str) -> str:
         """Handles downloading of the file from local storage."""
         return file_path
 
-    def _delete_from_s3(self, filename: str) -> None:
-        """Handles deletion of the file from S3 storage."""
-        if not self.s3_client:
-            raise RuntimeError("S3 Client is not initialized.")
+    async def get_file_async(self, file_path: str) -> str:
+        return file_path
 
-        try:
-            self.s3_client.delete_object(Bucket=self.bucket_name, Key=filename)
-        except ClientError as e:
-            raise RuntimeError(f"Error deleting file from S3: {e}")
+    async def get_file_range(
+        self, file_path: str, range_header: str
+    ) -> Optional[Tuple[AsyncIterator[bytes], int, int, int]]:
+        size = (await aiofiles.os.stat(file_path)).st_size
+        byte_range = parse_range_header(range_header, size)
+        if byte_range is None:
+            return None
+        start, end = byte_range
+        return aiter_file_range(file_path, start, end), start, end, size
 
-    def _delete_from_local(self, filename: str) -> None:
+    def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from local storage."""
-        file_path = f"{UPLOAD_DIR}/{filename}"
+        file_path = f"{UPLOAD_DIR}/{file_path.split('/')[-1]}"
         if os.path.isfile(file_path):
             os.remove(file_path)
         else:
             print(f"File {file_path} not found in local storage.")
 
-    def _delete_all_from_s3(self) -> None:
-        """Handles deletion of all files from S3 storage."""
-        if not self.s3_client:
-            raise RuntimeError("S3 Client is not initialized.")
-
-        try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket_name)
-            if "Contents" in response:
-                for content in response["Contents"]:
-                    self.s3_client.delete_object(
-                        Bucket=self.bucket_name, Key=content["Key"]
-                    )
-        except ClientError as e:
-            raise RuntimeError(f"Error deleting all files from S3: {e}")
-
-    def _delete_all_from_local(self) -> None:
+    def delete_all_files(self) -> None:
         """Handles deletion of all files from local storage."""
         if os.path.exists(UPLOAD_DIR):
             for filename in os.listdir(UPLOAD_DIR):
@@ -127,40 +487,143 @@ class StorageProvider:
         else:
             print(f"Directory {UPLOAD_DIR} not found in local storage.")
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
-        """Uploads a file either to S3 or the local file system."""
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
-        contents, file_path = self._upload_to_local(contents, filename)
 
-        if self.storage_provider == "s3":
-            return self._upload_to_s3(file_path, filename)
-        return contents, file_path
+class S3StorageProvider(LocalStorageProvider):
+    """Stores files in S3, with a local read-through cache.
+
+    Uploads are written to UPLOAD_DIR while they stream to S3 and then moved
+    into the cache, so only the cache holds a local copy.
+
+    boto3 has no async API, so the async methods run its (thread-safe) client on
+    worker threads; the connection pool is sized by S3_MAX_CONCURRENCY so
+    concurrent transfers don't queue for a connection.
+    """
+
+    def __init__(self):
+        self.s3_client = boto3.client(
+            "s3",
+            region_name=config.S3_REGION_NAME,
+            endpoint_url=config.S3_ENDPOINT_URL,
+            aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
+            config=Config(max_pool_connections=S3_MAX_CONCURRENCY),
+        )
+        self.bucket_name = config.S3_BUCKET_NAME
+        self.cache = S3FileCache(self.s3_client)
+
+    @staticmethod
+    def _parse_s3_path(file_path: str) -> Tuple[str, str]:
+        """Splits ``s3://bucket/some/key`` into the bucket name and the full key."""
+        bucket_name, key = file_path.split("//", 1)[1].split("/", 1)
+        return bucket_name, key
+
+    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[int, str, str]:
+        """Handles uploading of the file to S3 storage, then caches it locally."""
+        writer = S3MultipartWriter(self.s3_client, self.bucket_name, filename)
+        try:
+            size, sha256, file_path = super().upload_file(
+                file, filename, on_chunk=writer.write
+            )
+        except Exception as e:
+            writer.abort()
+            if isinstance(e, ClientError):
+                raise RuntimeError(f"Error uploading file to S3: {e}")
+            raise
+
+        try:
+            etag = writer.complete()
+        except ClientError as e:
+            writer.abort()
+            os.remove(file_path)
+            raise RuntimeError(f"Error uploading file to S3: {e}")
+
+        # Seed the cache so processing the new file doesn't download it again
+        try:
+            self.cache.put(self.bucket_name, filename, etag, file_path)
+        except Exception as e:
+            log.error(f"Error caching uploaded file {filename}: {e}")
+
+        return size, sha256, "s3://" + self.bucket_name + "/" + filename
 
     def get_file(self, file_path: str) -> str:
-        """Downloads a file either from S3 or the local file system and returns the file path."""
-        if self.storage_provider == "s3":
-            return self._get_file_from_s3(file_path)
-        return self._get_file_from_local(file_path)
+        """Handles downloading of the file from S3 storage."""
+        try:
+            bucket_name, key = self._parse_s3_path(file_path)
+            return self.cache.get(bucket_name, key)
+        except ClientError as e:
+            raise RuntimeError(f"Error downloading file from S3: {e}")
+
+    async def get_file_range(
+        self, file_path: str, range_header: str
+    ) -> Optional[Tuple[AsyncIterator[bytes], int, int, int]]:
+        try:
+            bucket_name, key = self._parse_s3_path(file_path)
+            file_range = await asyncio.to_thread(
+                self.cache.open_range, bucket_name, key, range_header
+            )
+        except ClientError as e:
+            raise RuntimeError(f"Error downloading file from S3: {e}")
+
+        if file_range is None:
+            return None
+        source, start, end, size = file_range
+        if isinstance(source, str):
+            return aiter_file_range(source, start, end), start, end, size
+        return aiter_s3_body(source), start, end, size
 
     def delete_file(self, file_path: str) -> None:
-        """Deletes a file either from S3 or the local file system."""
-        filename = file_path.split("/")[-1]
+        """Handles deletion of the file from S3 storage."""
+        try:
+            bucket_name, key = self._parse_s3_path(file_path)
+            self.s3_client.delete_object(Bucket=bucket_name, Key=key)
+            self.cache.invalidate(bucket_name, key)
+        except ClientError as e:
+            raise RuntimeError(f"Error deleting file from S3: {e}")
 
-        if self.storage_provider == "s3":
-            self._delete_from_s3(filename)
+        # The upload is left in UPLOAD_DIR only if moving it into the cache failed
+        local_path = f"{UPLOAD_DIR}/{key.split('/')[-1]}"
+        if os.path.isfile(local_path):
+            os.remove(local_path)
 
-        # Always delete from local storage
-        self._delete_from_local(filename)
+    def _delete_objects(self, keys: list[str]) -> None:
+        response = self.s3_client.delete_objects(
+            Bucket=self.bucket_name,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+        for error in response.get("Errors", []):
+            log.error(f"Error deleting {error['Key']} from S3: {error['Message']}")
 
     def delete_all_files(self) -> None:
-        """Deletes all files from the storage."""
-        if self.storage_provider == "s3":
-            self._delete_all_from_s3()
+        """Handles deletion of all files from S3 storage.
+
+        Keys are listed a page at a time and each page (up to 1000 keys) is
+        removed with a single DeleteObjects call, several pages in parallel.
+        """
+        try:
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            with ThreadPoolExecutor(max_workers=S3_MAX_CONCURRENCY) as executor:
+                futures = [
+                    executor.submit(
+                        self._delete_objects,
+                        [content["Key"] for content in page["Contents"]],
+                    )
+                    for page in paginator.paginate(Bucket=self.bucket_name)
+                    if page.get("Contents")
+                ]
+                for future in futures:
+                    future.result()
+            self.cache.clear()
+        except ClientError as e:
+            raise RuntimeError(f"Error deleting all files from S3: {e}")
 
         # Always delete from local storage
-        self._delete_all_from_local()
+        super().delete_all_files()
+
+
+def get_storage_provider(storage_provider: str) -> StorageProvider:
+    if storage_provider == "s3":
+        return S3StorageProvider()
+    return LocalStorageProvider()
 
 
-Storage = StorageProvider(provider=config.STORAGE_PROVIDER)
+Storage = get_storage_provider(config.STORAGE_PROVIDER)
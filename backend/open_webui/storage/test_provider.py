@@ -0,0 +1,76 @@
+import hashlib
+import os
+
+import pytest
+
+from open_webui.storage.provider import S3FileCache
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.objects = {}
+
+    def head_object(self, Bucket, Key):
+        data = self.objects[(Bucket, Key)]
+        etag = hashlib.md5(data).hexdigest()
+        return {"ETag": f'"{etag}"', "ContentLength": len(data)}
+
+    def download_file(self, Bucket, Key, Filename, Config=None):
+        with open(Filename, "wb") as f:
+            f.write(self.objects[(Bucket, Key)])
+
+
+@pytest.fixture
+def s3_client():
+    return FakeS3Client()
+
+
+@pytest.fixture
+def cache(s3_client, tmp_path):
+    return S3FileCache(s3_client, cache_dir=str(tmp_path / "cache"), max_size=1024)
+
+
+def upload(cache, s3_client, tmp_path, key, data):
+    s3_client.objects[("bucket", key)] = data
+    local_path = tmp_path / os.path.basename(key)
+    local_path.write_bytes(data)
+    etag = s3_client.head_object("bucket", key)["ETag"]
+    cache.put("bucket", key, etag, str(local_path))
+
+
+def test_invalidate_removes_the_cached_file(cache, s3_client, tmp_path):
+    upload(cache, s3_client, tmp_path, "a.txt", b"hello")
+    path = cache.get("bucket", "a.txt")
+    assert os.path.isfile(path)
+
+    cache.invalidate("bucket", "a.txt")
+
+    assert not os.path.exists(path)
+    assert not os.path.exists(os.path.dirname(path))
+    assert not cache.entries
+    assert cache.total_size == 0
+
+
+def test_invalidate_keeps_content_shared_with_another_key(cache, s3_client, tmp_path):
+    upload(cache, s3_client, tmp_path, "a.txt", b"hello")
+    s3_client.objects[("bucket", "b.txt")] = b"hello"
+    path = cache.get("bucket", "a.txt")
+    other_path = cache.get("bucket", "b.txt")
+    assert os.path.dirname(path) == os.path.dirname(other_path)
+
+    cache.invalidate("bucket", "a.txt")
+
+    assert not os.path.exists(path)
+    assert os.path.isfile(other_path)
+    assert cache.total_size == len(b"hello")
+
+
+def test_deleted_file_is_not_reloaded_after_restart(cache, s3_client, tmp_path):
+    upload(cache, s3_client, tmp_path, "a.txt", b"hello")
+    path = cache.get("bucket", "a.txt")
+
+    restarted = S3FileCache(s3_client, cache_dir=cache.cache_dir, max_size=1024)
+    restarted.invalidate("bucket", "a.txt")
+
+    assert not os.path.exists(path)
+    assert not S3FileCache(s3_client, cache_dir=cache.cache_dir).entries
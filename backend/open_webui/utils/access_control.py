@@ -96,14 +96,11 @@ def has_access(
     )
 
 
-# Get all users with access to a resource
-def get_users_with_access(
+# Get the ids of users explicitly granted access to a resource
+def get_user_ids_with_access(
     type: str = "write", access_control: Optional[dict] = None
-) -> List[UserModel]:
-    if access_control is None:
-        return Users.get_users()
-
-    permission_access = access_control.get(type, {})
+) -> set[str]:
+    permission_access = (access_control or {}).get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
 
@@ -114,4 +111,16 @@ def get_users_with_access(
         if group_user_ids:
             user_ids_with_access.update(group_user_ids)
 
-    return Users.get_users_by_user_ids(list(user_ids_with_access))
+    return user_ids_with_access
+
+
+# Get all users with access to a resource
+def get_users_with_access(
+    type: str = "write", access_control: Optional[dict] = None
+) -> List[UserModel]:
+    if access_control is None:
+        return Users.get_users()
+
+    return Users.get_users_by_user_ids(
+        list(get_user_ids_with_access(type, access_control))
+    )
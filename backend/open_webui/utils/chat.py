@@ -38,6 +38,12 @@ from open_webui.models.models import Models
 
 
 from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.utils.filter import (
+    call_filter,
+    filter_chain_cache,
+    get_filter_params,
+    get_user_valves,
+)
 from open_webui.utils.models import get_all_models, check_model_access
 from open_webui.utils.payload import convert_payload_openai_to_ollama
 from open_webui.utils.response import (
@@ -75,7 +81,9 @@ async def generate_chat_completion(
 
     # Process the form_data through the pipeline
     try:
-        form_data = process_pipeline_inlet_filter(request, form_data, user, models)
+        form_data = await process_pipeline_inlet_filter(
+            request, form_data, user, models
+        )
         log.debug(
             "generate_chat_completion:check_processed_form_data", form_data=form_data
         )
@@ -188,7 +196,7 @@ async def chat_completed(request: Request, form_data: dict, user: Any):
     model = models[model_id]
 
     try:
-        data = process_pipeline_outlet_filter(request, data, user, models)
+        data = await process_pipeline_outlet_filter(request, data, user, models)
     except Exception as e:
         return Exception(f"Error: {e}")
 
@@ -210,70 +218,21 @@ async def chat_completed(request: Request, form_data: dict, user: Any):
         }
     )
 
-    def get_priority(function_id):
-        function = Functions.get_function_by_id(function_id)
-        if function is not None and hasattr(function, "valves"):
-            # TODO: Fix FunctionModel to include vavles
-            return (function.valves if function.valves else {}).get("priority", 0)
-        return 0
-
-    filter_ids = [function.id for function in Functions.get_global_filter_functions()]
-    if "info" in model and "meta" in model["info"]:
-        filter_ids.extend(model["info"]["meta"].get("filterIds", []))
-        filter_ids = list(set(filter_ids))
-
-    enabled_filter_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
-    ]
-    filter_ids = [
-        filter_id for filter_id in filter_ids if filter_id in enabled_filter_ids
-    ]
-
-    # Sort filter_ids by priority, using the get_priority function
-    filter_ids.sort(key=get_priority)
-
-    for filter_id in filter_ids:
-        filter = Functions.get_function_by_id(filter_id)
-        if not filter:
-            continue
-
-        if filter_id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[filter_id]
-        else:
-            function_module, _, _ = load_function_module_by_id(filter_id)
-            request.app.state.FUNCTIONS[filter_id] = function_module
-
-        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
-            )
-
-        if not hasattr(function_module, "outlet"):
+    for filter in filter_chain_cache.get(request, model):
+        outlet = filter.get("outlet")
+        if outlet is None:
             continue
         try:
-            outlet = function_module.outlet
-
-            # Get the signature of the function
-            sig = inspect.signature(outlet)
-            params = {"body": data}
-
             # Extra parameters to be passed to the function
             extra_params = {
                 "__model__": model,
-                "__id__": filter_id,
+                "__id__": filter["id"],
                 "__event_emitter__": __event_emitter__,
                 "__event_call__": __event_call__,
                 "__request__": request,
             }
 
-            # Add extra params in contained in function signature
-            for key, value in extra_params.items():
-                if key in sig.parameters:
-                    params[key] = value
-
-            if "__user__" in sig.parameters:
+            if "__user__" in outlet["parameters"]:
                 __user__ = {
                     "id": user.id,
                     "email": user.email,
@@ -282,21 +241,17 @@ async def chat_completed(request: Request, form_data: dict, user: Any):
                 }
 
                 try:
-                    if hasattr(function_module, "UserValves"):
-                        __user__["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, user.id
-                            )
-                        )
+                    user_valves = get_user_valves(filter["module"], filter["id"], user)
+                    if user_valves is not None:
+                        __user__["valves"] = user_valves
                 except Exception as e:
                     print(e)
 
-                params = {**params, "__user__": __user__}
+                extra_params["__user__"] = __user__
 
-            if inspect.iscoroutinefunction(outlet):
-                data = await outlet(**params)
-            else:
-                data = outlet(**params)
+            data = await call_filter(
+                outlet, get_filter_params(outlet, data, extra_params)
+            )
 
         except Exception as e:
             return Exception(f"Error: {e}")
@@ -0,0 +1,116 @@
+import inspect
+import logging
+import time
+from typing import Optional
+
+from fastapi import Request
+from open_webui.env import FILTER_CHAIN_CACHE_TTL, SRC_LOG_LEVELS
+from open_webui.models.functions import Functions
+from open_webui.models.users import UserModel
+from open_webui.utils.plugin import load_function_module_by_id
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class FilterChainCache:
+    """Compiled filter chains, keyed by the model's own filter ids.
+
+    A chain holds the active global filters and the model's filters in
+    priority order. Each filter's module is loaded with its valves already
+    applied, and the parameter names of its inlet, stream and outlet hooks are
+    read once, so a filtered request makes no function metadata queries. The
+    function routes call invalidate on every change. Chains also expire after
+    ttl seconds so changes made through other replicas are picked up.
+    """
+
+    def __init__(self, ttl: int = FILTER_CHAIN_CACHE_TTL):
+        self.ttl = ttl
+        # model filter ids -> (expires_at, chain)
+        self.chains = {}
+
+    def _compile_filter(self, request: Request, filter_id: str, valves: dict) -> dict:
+        module = request.app.state.FUNCTIONS.get(filter_id, None)
+        if module is None:
+            module, _, _ = load_function_module_by_id(filter_id)
+            request.app.state.FUNCTIONS[filter_id] = module
+
+        if hasattr(module, "valves") and hasattr(module, "Valves"):
+            module.valves = module.Valves(**valves)
+
+        compiled = {
+            "id": filter_id,
+            "module": module,
+            "file_handler": getattr(module, "file_handler", None),
+        }
+        for name in ("inlet", "stream", "outlet"):
+            handler = getattr(module, name, None)
+            if handler is None:
+                continue
+            compiled[name] = {
+                "function": handler,
+                "parameters": frozenset(inspect.signature(handler).parameters),
+                "is_coroutine": inspect.iscoroutinefunction(handler),
+            }
+        return compiled
+
+    def _compile(self, request: Request, filter_ids: tuple) -> list[dict]:
+        filters = []
+        for function in Functions.get_functions_by_type("filter", active_only=True):
+            if not function.is_global and function.id not in filter_ids:
+                continue
+
+            valves = Functions.get_function_valves_by_id(function.id) or {}
+            filters.append(self._compile_filter(request, function.id, valves))
+
+        # Read from the applied valves, so a Valves default counts when none
+        # were saved
+        filters.sort(
+            key=lambda compiled: getattr(
+                getattr(compiled["module"], "valves", None), "priority", 0
+            )
+        )
+        return filters
+
+    def get(self, request: Request, model: dict) -> list[dict]:
+        meta = (model.get("info") or {}).get("meta") or {}
+        filter_ids = tuple(sorted(set(meta.get("filterIds") or [])))
+
+        now = time.monotonic()
+        cached = self.chains.get(filter_ids)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        chain = self._compile(request, filter_ids)
+        log.debug(f"compiled filter chain {[f['id'] for f in chain]}")
+        self.chains[filter_ids] = (now + self.ttl, chain)
+        return chain
+
+    def invalidate(self):
+        self.chains.clear()
+
+
+filter_chain_cache = FilterChainCache()
+
+
+def get_filter_params(handler: dict, body: dict, extra_params: dict) -> dict:
+    """Arguments for a compiled inlet or outlet, limited to what it accepts."""
+    return {"body": body} | {
+        k: v for k, v in extra_params.items() if k in handler["parameters"]
+    }
+
+
+def get_user_valves(module, filter_id: str, user: UserModel) -> Optional[object]:
+    """The user's valves for a filter, read from the already loaded user."""
+    if not hasattr(module, "UserValves"):
+        return None
+
+    settings = user.settings.model_dump() if user.settings else {}
+    valves = settings.get("functions", {}).get("valves", {}).get(filter_id, {})
+    return module.UserValves(**valves)
+
+
+async def call_filter(handler: dict, params: dict) -> dict:
+    if handler["is_coroutine"]:
+        return await handler["function"](**params)
+    return handler["function"](**params)
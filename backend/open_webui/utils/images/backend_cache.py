@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from open_webui.env import IMAGE_BACKEND_CACHE_TTL, SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["IMAGES"])
+
+
+class ImageBackendCache:
+    """Stale-while-revalidate cache for image backend metadata.
+
+    Entries older than the TTL are still returned while a single background
+    fetch refreshes them, and they are kept if that fetch fails, so listing
+    models neither waits on the backend nor breaks when it hiccups. Only the
+    first lookup of a key waits for the backend.
+    """
+
+    def __init__(self, ttl: int = IMAGE_BACKEND_CACHE_TTL):
+        self.ttl = ttl
+        # key -> (value, fetched_at)
+        self.entries = {}
+        self.refreshing = {}
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self.entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            if time.monotonic() - fetched_at > self.ttl:
+                self._refresh(key, fetch)
+            return value
+
+        return await asyncio.shield(self._refresh(key, fetch))
+
+    def _refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self.refreshing.get(key)
+        if task is None:
+            task = self.refreshing[key] = asyncio.create_task(self._fetch(key, fetch))
+        return task
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+            self.entries[key] = (value, time.monotonic())
+            return value
+        except Exception as e:
+            if key not in self.entries:
+                raise
+            log.warning(f"Image backend refresh failed, serving cached data: {e}")
+            return self.entries[key][0]
+        finally:
+            self.refreshing.pop(key, None)
+
+    def set(self, key: str, value: Any):
+        self.entries[key] = (value, time.monotonic())
+
+    def invalidate(self):
+        self.entries.clear()
+
+
+image_backend_cache = ImageBackendCache()
@@ -3,11 +3,12 @@ import json
 import logging
 import random
 import urllib.parse
-import urllib.request
+import uuid
+from collections import OrderedDict
 from typing import Optional
 
-import websocket  # NOTE: websocket-client (https://github.com/websocket-client/websocket-client)
-from open_webui.env import SRC_LOG_LEVELS
+import aiohttp
+from open_webui.env import AIOHTTP_CLIENT_TIMEOUT, SRC_LOG_LEVELS
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -15,80 +16,191 @@ log.setLevel(SRC_LOG_LEVELS["COMFYUI"])
 
 default_headers = {"User-Agent": "Mozilla/5.0"}
 
-
-def queue_prompt(prompt, client_id, base_url, api_key):
-    log.info("queue_prompt")
-    p = {"prompt": prompt, "client_id": client_id}
-    data = json.dumps(p).encode("utf-8")
-    log.debug(f"queue_prompt data: {data}")
-    try:
-        req = urllib.request.Request(
-            f"{base_url}/prompt",
-            data=data,
-            headers={**default_headers, "Authorization": f"Bearer {api_key}"},
-        )
-        response = urllib.request.urlopen(req).read()
-        return json.loads(response)
-    except Exception as e:
-        log.exception(f"Error while queuing prompt: {e}")
-        raise e
-
-
-def get_image(filename, subfolder, folder_type, base_url, api_key):
-    log.info("get_image")
-    data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-    url_values = urllib.parse.urlencode(data)
-    req = urllib.request.Request(
-        f"{base_url}/view?{url_values}",
-        headers={**default_headers, "Authorization": f"Bearer {api_key}"},
-    )
-    with urllib.request.urlopen(req) as response:
-        return response.read()
+# How often a job waiting for completion falls back to checking the history,
+# in case its completion message was missed while the websocket reconnected
+HISTORY_POLL_INTERVAL = 10
 
 
 def get_image_url(filename, subfolder, folder_type, base_url):
-    log.info("get_image")
     data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
     url_values = urllib.parse.urlencode(data)
     return f"{base_url}/view?{url_values}"
 
 
-def get_history(prompt_id, base_url, api_key):
-    log.info("get_history")
-
-    req = urllib.request.Request(
-        f"{base_url}/history/{prompt_id}",
-        headers={**default_headers, "Authorization": f"Bearer {api_key}"},
-    )
-    with urllib.request.urlopen(req) as response:
-        return json.loads(response.read())
-
-
-def get_images(ws, prompt, client_id, base_url, api_key):
-    prompt_id = queue_prompt(prompt, client_id, base_url, api_key)["prompt_id"]
-    output_images = []
-    while True:
-        out = ws.recv()
-        if isinstance(out, str):
-            message = json.loads(out)
-            if message["type"] == "executing":
-                data = message["data"]
-                if data["node"] is None and data["prompt_id"] == prompt_id:
-                    break  # Execution is done
+class ComfyUIClient:
+    """Async client for one ComfyUI server.
+
+    Jobs share a pooled HTTP session and a single websocket, which a background
+    task keeps connected and reads from. Completion messages are routed to the
+    waiting job by prompt id, so many generations can be in flight at once
+    without a connection or a thread each.
+    """
+
+    def __init__(self, base_url: str, api_key: str):
+        self.base_url = base_url
+        self.ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://")
+        self.headers = {**default_headers, "Authorization": f"Bearer {api_key}"}
+        self.client_id = str(uuid.uuid4())
+        self.timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.reader: Optional[asyncio.Task] = None
+        self.connected = asyncio.Event()
+        # prompt_id -> future resolved with None on success or an error message
+        self.waiters = {}
+        # Results that arrived before the job started waiting for them
+        self.finished = OrderedDict()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            # No session-wide timeout, it would also close the long-lived websocket
+            self.session = aiohttp.ClientSession(headers=self.headers)
+        return self.session
+
+    def _ensure_reader(self):
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        delay = 1
+        while True:
+            try:
+                async with self._get_session().ws_connect(
+                    f"{self.ws_url}/ws?clientId={self.client_id}", heartbeat=30
+                ) as ws:
+                    log.info("WebSocket connection established.")
+                    self.connected.set()
+                    delay = 1
+                    async for msg in ws:
+                        # Previews are binary data
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self._handle_message(json.loads(msg.data))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"ComfyUI websocket error: {e}")
+
+            self.connected.clear()
+            if not self.waiters:
+                # Reconnect lazily when the next job starts
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    def _handle_message(self, message: dict):
+        data = message.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        if prompt_id is None:
+            return
+
+        if message["type"] == "executing" and data.get("node") is None:
+            self._finish(prompt_id, None)
+        elif message["type"] == "execution_error":
+            self._finish(
+                prompt_id, data.get("exception_message", "ComfyUI execution error")
+            )
+
+    def _finish(self, prompt_id: str, error: Optional[str]):
+        future = self.waiters.pop(prompt_id, None)
+        if future is None:
+            self.finished[prompt_id] = error
+            while len(self.finished) > 1000:
+                self.finished.popitem(last=False)
+        elif not future.done():
+            future.set_result(error)
+
+    async def queue_prompt(self, prompt: dict) -> str:
+        log.info("queue_prompt")
+        async with self._get_session().post(
+            f"{self.base_url}/prompt",
+            json={"prompt": prompt, "client_id": self.client_id},
+            timeout=self.timeout,
+        ) as r:
+            r.raise_for_status()
+            return (await r.json())["prompt_id"]
+
+    async def get_history(self, prompt_id: str) -> dict:
+        log.info("get_history")
+        async with self._get_session().get(
+            f"{self.base_url}/history/{prompt_id}", timeout=self.timeout
+        ) as r:
+            r.raise_for_status()
+            return await r.json()
+
+    async def _wait(self, prompt_id: str) -> dict:
+        if prompt_id in self.finished:
+            error = self.finished.pop(prompt_id)
         else:
-            continue  # previews are binary data
+            future = self.waiters.setdefault(
+                prompt_id, asyncio.get_running_loop().create_future()
+            )
+            while True:
+                try:
+                    error = await asyncio.wait_for(
+                        asyncio.shield(future), HISTORY_POLL_INTERVAL
+                    )
+                    break
+                except asyncio.TimeoutError:
+                    history = await self.get_history(prompt_id)
+                    if prompt_id in history:
+                        self.waiters.pop(prompt_id, None)
+                        error = None
+                        break
+                    self._ensure_reader()
+
+        if error:
+            raise Exception(error)
+        return (await self.get_history(prompt_id))[prompt_id]
+
+    async def get_images(self, prompt: dict) -> dict:
+        self._ensure_reader()
+        # Queue only once connected so the completion message isn't missed
+        await asyncio.wait_for(self.connected.wait(), HISTORY_POLL_INTERVAL)
 
-    history = get_history(prompt_id, base_url, api_key)[prompt_id]
-    for o in history["outputs"]:
+        prompt_id = await self.queue_prompt(prompt)
+        try:
+            history = await self._wait(prompt_id)
+        finally:
+            self.waiters.pop(prompt_id, None)
+
+        output_images = []
         for node_id in history["outputs"]:
             node_output = history["outputs"][node_id]
             if "images" in node_output:
                 for image in node_output["images"]:
                     url = get_image_url(
-                        image["filename"], image["subfolder"], image["type"], base_url
+                        image["filename"],
+                        image["subfolder"],
+                        image["type"],
+                        self.base_url,
                     )
                     output_images.append({"url": url})
-    return {"data": output_images}
+        return {"data": output_images}
+
+    async def close(self):
+        if self.reader is not None:
+            self.reader.cancel()
+        if self.session is not None:
+            await self.session.close()
+
+
+_clients = {}
+
+
+def get_comfyui_client(base_url: str, api_key: str) -> ComfyUIClient:
+    """Returns the shared client for a server, replacing it if the config changed."""
+    client = _clients.get(base_url)
+    if client is None or client.headers["Authorization"] != f"Bearer {api_key}":
+        if client is not None:
+            asyncio.create_task(client.close())
+        client = _clients[base_url] = ComfyUIClient(base_url, api_key)
+    return client
+
+
+async def close_comfyui_clients():
+    for client in _clients.values():
+        await client.close()
+    _clients.clear()
 
 
 class ComfyUINodeInput(BaseModel):
@@ -117,9 +229,8 @@ class ComfyUIGenerateImageForm(BaseModel):
 
 
 async def comfyui_generate_image(
-    model: str, payload: ComfyUIGenerateImageForm, client_id, base_url, api_key
+    model: str, payload: ComfyUIGenerateImageForm, base_url, api_key
 ):
-    ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://")
     workflow = json.loads(payload.workflow.workflow)
 
     for node in payload.workflow.nodes:
@@ -170,24 +281,11 @@ async def comfyui_generate_image(
                 workflow[node_id]["inputs"][node.key] = node.value
 
     try:
-        ws = websocket.WebSocket()
-        headers = {"Authorization": f"Bearer {api_key}"}
-        ws.connect(f"{ws_url}/ws?clientId={client_id}", header=headers)
-        log.info("WebSocket connection established.")
-    except Exception as e:
-        log.exception(f"Failed to connect to WebSocket server: {e}")
-        return None
-
-    try:
-        log.info("Sending workflow to WebSocket server.")
+        log.info("Sending workflow to ComfyUI.")
         log.info(f"Workflow: {workflow}")
-        images = await asyncio.to_thread(
-            get_images, ws, workflow, client_id, base_url, api_key
-        )
+        images = await get_comfyui_client(base_url, api_key).get_images(workflow)
     except Exception as e:
         log.exception(f"Error while receiving images: {e}")
         images = None
 
-    ws.close()
-
     return images
@@ -0,0 +1,173 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Optional
+
+import structlog
+
+log = structlog.get_logger(__name__)
+
+####################################
+# Histograms rendered in the Prometheus text exposition format
+####################################
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REGISTRY = []
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series = {}
+
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][idx] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = [
+                (key, list(counts), total)
+                for key, (counts, total) in self._series.items()
+            ]
+
+        for key, counts, total in series:
+            labels = [f'{name}="{value}"' for name, value in zip(self.label_names, key)]
+
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                bucket_labels = ",".join(labels + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+
+            series_labels = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}_sum{series_labels} {total}")
+            lines.append(f"{self.name}_count{series_labels} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in REGISTRY:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+####################################
+# Chat completion hot path
+####################################
+
+CHAT_STAGE_DURATION = Histogram(
+    "open_webui_chat_stage_duration_seconds",
+    "Time spent in each stage of /api/chat/completions.",
+    ("stage",),
+)
+
+CHAT_TIME_TO_FIRST_TOKEN = Histogram(
+    "open_webui_chat_time_to_first_token_seconds",
+    "Time from receiving the chat request to the first streamed token.",
+    ("model",),
+)
+
+CHAT_TOKENS_PER_SECOND = Histogram(
+    "open_webui_chat_tokens_per_second",
+    "Streamed content chunks per second after the first token.",
+    ("model",),
+    buckets=(1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 400),
+)
+
+
+def record_stage(stage: str, seconds: float, **fields):
+    """Record a stage timing as a histogram sample and a structured log event.
+
+    The log event carries the request_id bound by the structlog context
+    middleware, so stages of one request can be correlated.
+    """
+    CHAT_STAGE_DURATION.observe(seconds, stage=stage)
+    log.info("chat:stage", stage=stage, duration_ms=round(seconds * 1000, 2), **fields)
+
+
+@contextmanager
+def timed_stage(stage: str, **fields):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start, **fields)
+
+
+class StreamTimer:
+    """Tracks time to first token and token throughput for one streamed response.
+
+    ``token`` is called for each streamed chunk with non-empty delta content,
+    so throughput is measured in content chunks, which is one token per chunk
+    for most OpenAI-compatible servers.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        request_start_time: Optional[float] = None,
+        upstream_start_time: Optional[float] = None,
+    ):
+        self.model = model
+        self.request_start_time = request_start_time
+        self.upstream_start_time = upstream_start_time
+        self.first_token_time = None
+        self.tokens = 0
+
+    def token(self):
+        now = time.perf_counter()
+        self.tokens += 1
+        if self.first_token_time is not None:
+            return
+
+        self.first_token_time = now
+        if self.upstream_start_time is not None:
+            record_stage(
+                "upstream_ttft", now - self.upstream_start_time, model=self.model
+            )
+        if self.request_start_time is not None:
+            CHAT_TIME_TO_FIRST_TOKEN.observe(
+                now - self.request_start_time, model=self.model
+            )
+
+    def finish(self):
+        if self.first_token_time is None or self.tokens < 2:
+            return
+
+        elapsed = time.perf_counter() - self.first_token_time
+        tokens_per_second = (self.tokens - 1) / elapsed if elapsed > 0 else 0
+        CHAT_TOKENS_PER_SECOND.observe(tokens_per_second, model=self.model)
+        log.info(
+            "chat:stream_complete",
+            model=self.model,
+            tokens=self.tokens,
+            tokens_per_second=round(tokens_per_second, 2),
+        )
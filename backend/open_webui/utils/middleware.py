@@ -7,7 +7,6 @@ from aiocache import cached
 from typing import Any, Optional
 import random
 import json
-import inspect
 from uuid import uuid4
 from concurrent.futures import ThreadPoolExecutor
 
@@ -31,17 +30,16 @@ from open_webui.routers.tasks import (
     generate_chat_tags,
 )
 from open_webui.routers.retrieval import process_web_search, SearchForm
-from open_webui.utils.webhook import post_webhook
+from open_webui.utils.webhook import notification_dispatcher
 
 
 from open_webui.models.users import UserModel
-from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 from open_webui.retrieval.utils import get_sources_from_files
 
 
-from open_webui.utils.chat import generate_chat_completion
+from open_webui.utils.chat import chat_completed, generate_chat_completion
 from open_webui.utils.task import (
     get_task_model_id,
     rag_template,
@@ -54,8 +52,15 @@ from open_webui.utils.misc import (
     get_last_assistant_message,
     prepend_to_first_user_message_content,
 )
-from open_webui.utils.tools import get_tools
-from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.utils.tools import get_tools, get_tools_specs_json
+from open_webui.utils.metrics import StreamTimer, record_stage, timed_stage
+from open_webui.utils.stream import iter_sse_data, loads, observe_sse_data
+from open_webui.utils.filter import (
+    call_filter,
+    filter_chain_cache,
+    get_filter_params,
+    get_user_valves,
+)
 
 
 from open_webui.tasks import create_task
@@ -66,6 +71,9 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
+    ENABLE_STREAMING_OUTLET_FILTERS,
+    TOOL_CALL_TIMEOUT,
+    TOOL_RESULT_MAX_LENGTH,
 )
 from open_webui.constants import TASKS
 
@@ -89,92 +97,44 @@ def generate_fall_back_title(messages):
     return user_message
 
 
-async def chat_completion_filter_functions_handler(request, body, model, extra_params):
+async def chat_completion_filter_functions_handler(
+    request, body, model, extra_params, user
+):
     skip_files = None
 
-    def get_filter_function_ids(model):
-        def get_priority(function_id):
-            function = Functions.get_function_by_id(function_id)
-            if function is not None and hasattr(function, "valves"):
-                # TODO: Fix FunctionModel
-                return (function.valves if function.valves else {}).get("priority", 0)
-            return 0
-
-        filter_ids = [
-            function.id for function in Functions.get_global_filter_functions()
-        ]
-        if "info" in model and "meta" in model["info"]:
-            filter_ids.extend(model["info"]["meta"].get("filterIds", []))
-            filter_ids = list(set(filter_ids))
-
-        enabled_filter_ids = [
-            function.id
-            for function in Functions.get_functions_by_type("filter", active_only=True)
-        ]
-
-        filter_ids = [
-            filter_id for filter_id in filter_ids if filter_id in enabled_filter_ids
-        ]
-
-        filter_ids.sort(key=get_priority)
-        return filter_ids
+    for filter in filter_chain_cache.get(request, model):
+        # Check if the function has a file_handler variable
+        if filter["file_handler"] is not None:
+            skip_files = filter["file_handler"]
 
-    filter_ids = get_filter_function_ids(model)
-    for filter_id in filter_ids:
-        filter = Functions.get_function_by_id(filter_id)
-        if not filter:
+        inlet = filter.get("inlet")
+        if inlet is None:
             continue
 
-        if filter_id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[filter_id]
-        else:
-            function_module, _, _ = load_function_module_by_id(filter_id)
-            request.app.state.FUNCTIONS[filter_id] = function_module
-
-        # Check if the function has a file_handler variable
-        if hasattr(function_module, "file_handler"):
-            skip_files = function_module.file_handler
-
-        # Apply valves to the function
-        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
+        try:
+            # Create a dictionary of parameters to be passed to the function
+            params = get_filter_params(
+                inlet,
+                body,
+                {**extra_params, "__model__": model, "__id__": filter["id"]},
             )
 
-        if hasattr(function_module, "inlet"):
-            try:
-                inlet = function_module.inlet
-
-                # Create a dictionary of parameters to be passed to the function
-                params = {"body": body} | {
-                    k: v
-                    for k, v in {
-                        **extra_params,
-                        "__model__": model,
-                        "__id__": filter_id,
-                    }.items()
-                    if k in inspect.signature(inlet).parameters
-                }
-
-                if "__user__" in params and hasattr(function_module, "UserValves"):
-                    try:
-                        params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, params["__user__"]["id"]
-                            )
-                        )
-                    except Exception as e:
-                        print(e)
+            if "__user__" in params:
+                try:
+                    user_valves = get_user_valves(filter["module"], filter["id"], user)
+                    if user_valves is not None:
+                        params["__user__"] = {
+                            **params["__user__"],
+                            "valves": user_valves,
+                        }
+                except Exception as e:
+                    print(e)
 
-                if inspect.iscoroutinefunction(inlet):
-                    body = await inlet(**params)
-                else:
-                    body = inlet(**params)
+            body = await call_filter(inlet, params)
 
-            except Exception as e:
-                print(f"Error: {e}")
-                raise e
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
 
     if skip_files and "files" in body.get("metadata", {}):
         del body["metadata"]["files"]
@@ -185,21 +145,23 @@ async def chat_completion_filter_functions_handler(request, body, model, extra_p
 async def chat_completion_tools_handler(
     request: Request, body: dict, user: UserModel, models, extra_params: dict
 ) -> tuple[dict, dict]:
-    async def get_content_from_response(response) -> Optional[str]:
-        content = None
+    async def get_message_from_response(response) -> Optional[dict]:
+        message = None
         if hasattr(response, "body_iterator"):
             async for chunk in response.body_iterator:
                 data = json.loads(chunk.decode("utf-8"))
-                content = data["choices"][0]["message"]["content"]
+                message = data["choices"][0]["message"]
 
             # Cleanup any remaining background tasks if necessary
             if response.background is not None:
                 await response.background()
         else:
-            content = response["choices"][0]["message"]["content"]
-        return content
+            message = response["choices"][0]["message"]
+        return message
 
-    def get_tools_function_calling_payload(messages, task_model_id, content):
+    def get_tools_function_calling_payload(
+        messages, task_model_id, content, tools_param=None
+    ):
         user_message = get_last_user_message(messages)
         history = "\n".join(
             f"{message['role'].upper()}: \"\"\"{message['content']}\"\"\""
@@ -208,15 +170,101 @@ async def chat_completion_tools_handler(
 
         prompt = f"History:\n{history}\nQuery: {user_message}"
 
-        return {
+        payload = {
             "model": task_model_id,
-            "messages": [
-                {"role": "system", "content": content},
-                {"role": "user", "content": f"Query: {prompt}"},
-            ],
+            "messages": [{"role": "user", "content": f"Query: {prompt}"}],
             "stream": False,
             "metadata": {"task": str(TASKS.FUNCTION_CALLING)},
         }
+        if content:
+            payload["messages"].insert(0, {"role": "system", "content": content})
+        if tools_param:
+            payload["tools"] = tools_param
+            payload["tool_choice"] = "auto"
+        return payload
+
+    def get_tool_calls_from_content(content: str) -> list[dict]:
+        # A single {"name", "parameters"} object, a list of them, or
+        # {"tool_calls": [...]}
+        starts = [idx for idx in (content.find("{"), content.find("[")) if idx != -1]
+        if not starts:
+            log.error(
+                "chat_completion_tools_handler:bad_content_no_json", content=content
+            )
+            raise Exception("No JSON object found in the response")
+
+        start = min(starts)
+        end = content.rfind("]" if content[start] == "[" else "}")
+        result = json.loads(content[start : end + 1])
+        if isinstance(result, dict):
+            result = result.get("tool_calls", [result])
+        return [tool_call for tool_call in result if isinstance(tool_call, dict)]
+
+    def get_tool_calls_from_message(message: dict) -> list[dict]:
+        tool_calls = []
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function", {})
+            arguments = function.get("arguments") or {}
+            if isinstance(arguments, str):
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            tool_calls.append({"name": function.get("name"), "parameters": arguments})
+
+        if tool_calls or not message.get("content"):
+            return tool_calls
+        return get_tool_calls_from_content(message["content"])
+
+    async def call_tool(tool_function_name: str, tool_function_params: dict):
+        tool = tools[tool_function_name]
+        required_params = tool.get("spec", {}).get("parameters", {}).get("required", [])
+        tool_function_params = {
+            k: v for k, v in tool_function_params.items() if k in required_params
+        }
+
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            tool_output = await asyncio.wait_for(
+                tool["callable"](**tool_function_params), TOOL_CALL_TIMEOUT or None
+            )
+        except asyncio.TimeoutError:
+            status = "timeout"
+            log.warning(
+                "chat_completion_tools_handler:tool_timeout",
+                tool=tool_function_name,
+                timeout=TOOL_CALL_TIMEOUT,
+            )
+            tool_output = (
+                f"Tool {tool_function_name} did not respond within "
+                f"{TOOL_CALL_TIMEOUT} seconds"
+            )
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status = "error"
+            log.exception(
+                "chat_completion_tools_handler:tools_parsing_error", exc_info=e
+            )
+            tool_output = str(e)
+        finally:
+            record_stage(
+                "tool_call",
+                time.perf_counter() - start,
+                tool=tool_function_name,
+                status=status,
+            )
+
+        if (
+            isinstance(tool_output, str)
+            and TOOL_RESULT_MAX_LENGTH
+            and len(tool_output) > TOOL_RESULT_MAX_LENGTH
+        ):
+            truncated = len(tool_output) - TOOL_RESULT_MAX_LENGTH
+            tool_output = (
+                f"{tool_output[:TOOL_RESULT_MAX_LENGTH]}\n"
+                f"... ({truncated} characters truncated)"
+            )
+        return tool_output
 
     # If tool_ids field is present, call the functions
     metadata = body.get("metadata", {})
@@ -248,114 +296,89 @@ async def chat_completion_tools_handler(
     )
     log.debug("chat_completion_tools_handler:tools", tools=tools)
 
-    specs = [tool["spec"] for tool in tools.values()]
-    tools_specs = json.dumps(specs)
-
-    if request.app.state.config.TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE != "":
-        template = request.app.state.config.TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE
+    model_params = models.get(body["model"], {}).get("info", {}).get("params") or {}
+    if model_params.get("function_calling") == "native":
+        # Let the model pick tools through the OpenAI tools parameter instead
+        # of the JSON prompt
+        payload = get_tools_function_calling_payload(
+            body["messages"],
+            task_model_id,
+            None,
+            [{"type": "function", "function": tool["spec"]} for tool in tools.values()],
+        )
     else:
-        template = config.DEFAULT_TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE
+        tools_specs = get_tools_specs_json(tools)
 
-    tools_function_calling_prompt = tools_function_calling_generation_template(
-        template, tools_specs
-    )
-    log.debug(
-        "chat_completion_tools_handler:tools_function_calling_prompt",
-        tools_function_calling_prompt=tools_function_calling_prompt,
-    )
-    payload = get_tools_function_calling_payload(
-        body["messages"], task_model_id, tools_function_calling_prompt
-    )
+        if request.app.state.config.TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE != "":
+            template = request.app.state.config.TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE
+        else:
+            template = config.DEFAULT_TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE
+
+        tools_function_calling_prompt = tools_function_calling_generation_template(
+            template, tools_specs
+        )
+        log.debug(
+            "chat_completion_tools_handler:tools_function_calling_prompt",
+            tools_function_calling_prompt=tools_function_calling_prompt,
+        )
+        payload = get_tools_function_calling_payload(
+            body["messages"], task_model_id, tools_function_calling_prompt
+        )
 
     try:
-        response = await generate_chat_completion(request, form_data=payload, user=user)
+        with timed_stage("tool_selection"):
+            response = await generate_chat_completion(
+                request, form_data=payload, user=user
+            )
         log.debug(
             "chat_completion_tools_handler:generated_chat_completion", response=response
         )
-        content = await get_content_from_response(response)
+        message = await get_message_from_response(response)
         log.debug(
-            "chat_completion_tools_handler:content_from_response", content=content
+            "chat_completion_tools_handler:message_from_response", message=message
         )
 
-        if not content:
+        if not message:
             return body, {}
 
         try:
-            content = content[content.find("{") : content.rfind("}") + 1]
-            if not content:
-                log.error(
-                    "chat_completion_tools_handler:bad_content_no_json", content=content
-                )
-                raise Exception("No JSON object found in the response")
-
-            result = json.loads(content)
-
-            tool_function_name = result.get("name", None)
-            if tool_function_name not in tools:
+            tool_calls = [
+                (tool_call.get("name"), tool_call.get("parameters") or {})
+                for tool_call in get_tool_calls_from_message(message)
+                if tool_call.get("name") in tools
+            ]
+            if not tool_calls:
                 return body, {}
 
-            tool_function_params = result.get("parameters", {})
+            # Calls run concurrently; cancelling the chat request cancels the
+            # gather and with it every call still running
+            tool_outputs = await asyncio.gather(
+                *[call_tool(name, params) for name, params in tool_calls]
+            )
 
-            try:
-                required_params = (
-                    tools[tool_function_name]
-                    .get("spec", {})
-                    .get("parameters", {})
-                    .get("required", [])
-                )
-                tool_function = tools[tool_function_name]["callable"]
-                tool_function_params = {
-                    k: v
-                    for k, v in tool_function_params.items()
-                    if k in required_params
-                }
-                tool_output = await tool_function(**tool_function_params)
+            for (tool_function_name, _), tool_output in zip(tool_calls, tool_outputs):
+                if not isinstance(tool_output, str):
+                    continue
 
-            except Exception as e:
-                log.exception(
-                    "chat_completion_tools_handler:tools_parsing_error", exc_info=e
+                tool = tools[tool_function_name]
+                tool_source = f"TOOL:{tool['toolkit_id']}/{tool_function_name}"
+                sources.append(
+                    {
+                        "source": {"name": tool_source} if tool["citation"] else {},
+                        "document": [tool_output],
+                        "metadata": [{"source": tool_source}],
+                    }
                 )
-                tool_output = str(e)
-
-            if isinstance(tool_output, str):
-                if tools[tool_function_name]["citation"]:
-                    sources.append(
-                        {
-                            "source": {
-                                "name": f"TOOL:{tools[tool_function_name]['toolkit_id']}/{tool_function_name}"
-                            },
-                            "document": [tool_output],
-                            "metadata": [
-                                {
-                                    "source": f"TOOL:{tools[tool_function_name]['toolkit_id']}/{tool_function_name}"
-                                }
-                            ],
-                        }
-                    )
-                else:
-                    sources.append(
-                        {
-                            "source": {},
-                            "document": [tool_output],
-                            "metadata": [
-                                {
-                                    "source": f"TOOL:{tools[tool_function_name]['toolkit_id']}/{tool_function_name}"
-                                }
-                            ],
-                        }
-                    )
 
-                if tools[tool_function_name]["file_handler"]:
+                if tool["file_handler"]:
                     skip_files = True
 
         except Exception as e:
             log.exception(
                 "chat_completion_tools_handler:tool_execution_error", exc_info=e
             )
-            content = None
     except Exception as e:
         log.exception("chat_completion_tools_handler:error", exc_info=e)
-        content = None
 
     log.debug("chat_completion_tools_handler:tool_sources", sources=sources)
 
@@ -552,15 +575,16 @@ async def chat_completion_files_handler(
     if files := body.get("metadata", {}).get("files", None):
         log.debug("chat_completion_files_handler:files_found", files=files)
         try:
-            queries_response = await generate_queries(
-                request,
-                {
-                    "model": body["model"],
-                    "messages": body["messages"],
-                    "type": "retrieval",
-                },
-                user,
-            )
+            with timed_stage("retrieval_queries"):
+                queries_response = await generate_queries(
+                    request,
+                    {
+                        "model": body["model"],
+                        "messages": body["messages"],
+                        "type": "retrieval",
+                    },
+                    user,
+                )
             queries_response = queries_response["choices"][0]["message"]["content"]
 
             try:
@@ -588,15 +612,16 @@ async def chat_completion_files_handler(
         if len(queries) == 0:
             queries = [get_last_user_message(body["messages"])]
 
-        sources = get_sources_from_files(
-            files=files,
-            queries=queries,
-            embedding_function=request.app.state.EMBEDDING_FUNCTION,
-            k=request.app.state.config.RAG_TOP_K,
-            reranking_function=request.app.state.rf,
-            r=request.app.state.config.RAG_RELEVANCE_THRESHOLD,
-            hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
-        )
+        with timed_stage("retrieval_sources", files=len(files), queries=len(queries)):
+            sources = get_sources_from_files(
+                files=files,
+                queries=queries,
+                embedding_function=request.app.state.EMBEDDING_FUNCTION,
+                k=request.app.state.config.RAG_TOP_K,
+                reranking_function=request.app.state.rf,
+                r=request.app.state.config.RAG_RELEVANCE_THRESHOLD,
+                hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+            )
 
         log.debug("chat_completion_files_handler:sources", sources=sources)
     return body, {"sources": sources}
@@ -704,17 +729,19 @@ async def process_chat_payload(request, form_data, metadata, user, model):
     if features:
         log.debug("process_chat_payload:found_features", features=features)
         if "web_search" in features and features["web_search"]:
-            web_search_result = await chat_web_search_handler(
-                request, form_data, extra_params, user
-            )
+            with timed_stage("web_search"):
+                web_search_result = await chat_web_search_handler(
+                    request, form_data, extra_params, user
+                )
             if web_search_result is not None:
                 form_data = web_search_result
             log.debug("process_chat_payload:processed_web_search", form_data=form_data)
 
     try:
-        form_data, flags = await chat_completion_filter_functions_handler(
-            request, form_data, model, extra_params
-        )
+        with timed_stage("filters"):
+            form_data, flags = await chat_completion_filter_functions_handler(
+                request, form_data, model, extra_params, user
+            )
         log.debug(
             "process_chat_payload:from_filter_functions_handler",
             form_data=form_data,
@@ -738,9 +765,10 @@ async def process_chat_payload(request, form_data, metadata, user, model):
     form_data["metadata"] = metadata
 
     try:
-        form_data, flags = await chat_completion_tools_handler(
-            request, form_data, user, models, extra_params
-        )
+        with timed_stage("tools"):
+            form_data, flags = await chat_completion_tools_handler(
+                request, form_data, user, models, extra_params
+            )
         sources.extend(flags.get("sources", []))
         log.debug(
             "process_chat_payload:from_tools_handler", form_data=form_data, flags=flags
@@ -749,7 +777,10 @@ async def process_chat_payload(request, form_data, metadata, user, model):
         log.exception("process_chat_payload:tools_handler_error", exc_info=e)
 
     try:
-        form_data, flags = await chat_completion_files_handler(request, form_data, user)
+        with timed_stage("retrieval"):
+            form_data, flags = await chat_completion_files_handler(
+                request, form_data, user
+            )
         sources.extend(flags.get("sources", []))
     except Exception as e:
         log.exception("process_chat_payload:files_handler_error", exc_info=e)
@@ -924,6 +955,130 @@ async def process_chat_response(
                                 exc_info=e,
                             )
 
+    def get_stream_filters() -> list[tuple[dict, dict]]:
+        # Filters with a stream hook, each with the extra arguments it takes
+        model = request.app.state.MODELS.get(form_data.get("model"))
+        if not ENABLE_STREAMING_OUTLET_FILTERS or model is None:
+            return []
+
+        stream_filters = []
+        for filter in filter_chain_cache.get(request, model):
+            handler = filter.get("stream")
+            if handler is None:
+                continue
+
+            __user__ = {
+                "id": user.id,
+                "email": user.email,
+                "name": user.name,
+                "role": user.role,
+            }
+            if "__user__" in handler["parameters"]:
+                try:
+                    user_valves = get_user_valves(filter["module"], filter["id"], user)
+                    if user_valves is not None:
+                        __user__["valves"] = user_valves
+                except Exception as e:
+                    print(e)
+
+            extra_params = {
+                "__model__": model,
+                "__id__": filter["id"],
+                "__user__": __user__,
+                "__metadata__": metadata,
+                "__event_emitter__": event_emitter,
+                "__request__": request,
+            }
+            stream_filters.append(
+                (
+                    handler,
+                    {
+                        k: v
+                        for k, v in extra_params.items()
+                        if k in handler["parameters"]
+                    },
+                )
+            )
+        return stream_filters
+
+    async def apply_stream_filters(stream_filters, event: dict) -> Optional[dict]:
+        # A stream hook may rewrite the chunk, or return None to drop it
+        for handler, params in stream_filters:
+            try:
+                event = await call_filter(handler, {"event": event, **params})
+            except Exception as e:
+                log.exception("process_chat_response:stream_filter_error", exc_info=e)
+            if event is None:
+                break
+        return event
+
+    async def outlet_handler(content: str) -> tuple[str, Optional[dict]]:
+        """Runs the outlet filters on the finished response and saves the result.
+
+        This is what the client used to do by posting the whole chat to
+        /api/chat/completed. Returns the filtered content and the messages the
+        outlets changed, or None when the chat isn't stored (e.g. temporary
+        chats) and the client should still run them.
+        """
+        message_map = Chats.get_messages_by_chat_id(metadata["chat_id"])
+        if not message_map or metadata["message_id"] not in message_map:
+            return content, None
+
+        messages = [
+            {
+                key: message[key]
+                for key in ("id", "role", "content", "info", "timestamp", "sources")
+                if message.get(key) is not None
+            }
+            for message in get_message_list(message_map, metadata["message_id"])
+        ]
+        messages[-1]["content"] = content
+        original = {message["id"]: message.get("content") for message in messages}
+
+        # Saved here as the client no longer uploads the chat when it's done
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            metadata["chat_id"], metadata["message_id"], {"done": True}
+        )
+
+        try:
+            with timed_stage("outlet_filters"):
+                data = await chat_completed(
+                    request,
+                    {
+                        "model": form_data["model"],
+                        "messages": messages,
+                        "chat_id": metadata["chat_id"],
+                        "session_id": metadata["session_id"],
+                        "id": metadata["message_id"],
+                    },
+                    user,
+                )
+            if isinstance(data, Exception):
+                raise data
+        except Exception as e:
+            log.exception("process_chat_response:outlet_handler:error", exc_info=e)
+            return content, {"messages": []}
+
+        changed = [
+            message
+            for message in data.get("messages", [])
+            if message.get("id") in original
+            and message.get("content") != original[message["id"]]
+        ]
+        for message in changed:
+            if message["id"] == metadata["message_id"]:
+                content = message["content"]
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                metadata["chat_id"],
+                message["id"],
+                {
+                    "content": message["content"],
+                    "originalContent": original[message["id"]],
+                },
+            )
+
+        return content, {"messages": changed}
+
     event_emitter = None
     if (
         "session_id" in metadata
@@ -937,6 +1092,29 @@ async def process_chat_response(
 
     if not isinstance(response, StreamingResponse):
         if event_emitter:
+            for event in events:
+                await event_emitter(
+                    {
+                        "type": "chat:completion",
+                        "data": event,
+                    }
+                )
+
+                # Save message in the database
+                Chats.upsert_message_to_chat_by_id_and_message_id(
+                    metadata["chat_id"],
+                    metadata["message_id"],
+                    {
+                        **event,
+                    },
+                )
+
+            if response.get("usage"):
+                Chats.upsert_message_to_chat_by_id_and_message_id(
+                    metadata["chat_id"],
+                    metadata["message_id"],
+                    {"usage": response["usage"]},
+                )
 
             if "selected_model_id" in response:
                 Chats.upsert_message_to_chat_by_id_and_message_id(
@@ -959,6 +1137,10 @@ async def process_chat_response(
                         }
                     )
 
+                    completed = None
+                    if ENABLE_STREAMING_OUTLET_FILTERS:
+                        content, completed = await outlet_handler(content)
+
                     title = Chats.get_chat_title_by_id(metadata["chat_id"])
 
                     await event_emitter(
@@ -968,24 +1150,30 @@ async def process_chat_response(
                                 "done": True,
                                 "content": content,
                                 "title": title,
+                                **(
+                                    {"completed": completed}
+                                    if completed is not None
+                                    else {}
+                                ),
                             },
                         }
                     )
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        metadata["chat_id"],
-                        metadata["message_id"],
-                        {
-                            "content": content,
-                        },
-                    )
+                    with timed_stage("db_persist"):
+                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                            metadata["chat_id"],
+                            metadata["message_id"],
+                            {
+                                "content": content,
+                            },
+                        )
 
                     # Send a webhook notification if the user is not active
                     if get_active_status_by_user_id(user.id) is None:
                         webhook_url = Users.get_user_webhook_url_by_id(user.id)
                         if webhook_url:
-                            post_webhook(
+                            notification_dispatcher.notify(
                                 webhook_url,
                                 f"{title} - {request.app.state.config.WEBUI_URL}/c/{metadata['chat_id']}\n\n{content}",
                                 {
@@ -1018,8 +1206,16 @@ async def process_chat_response(
                 metadata["chat_id"], metadata["message_id"]
             )
             content = message.get("content", "") if message else ""
+            stream_timer = StreamTimer(
+                form_data.get("model"),
+                request_start_time=getattr(request.state, "start_time", None),
+                upstream_start_time=getattr(request.state, "upstream_start_time", None),
+            )
 
+            usage = None
             try:
+                stream_filters = get_stream_filters()
+
                 for event in events:
                     await event_emitter(
                         {
@@ -1037,23 +1233,12 @@ async def process_chat_response(
                         },
                     )
 
-                async for line in response.body_iterator:
-                    line = line.decode("utf-8") if isinstance(line, bytes) else line
-                    data = line
-
-                    # Skip empty lines
-                    if not data.strip():
+                async for data in iter_sse_data(response.body_iterator):
+                    if data == b"[DONE]":
                         continue
 
-                    # "data: " is the prefix for each event
-                    if not data.startswith("data: "):
-                        continue
-
-                    # Remove the prefix
-                    data = data[len("data: ") :]
-
                     try:
-                        data = json.loads(data)
+                        data = loads(data)
 
                         if "selected_model_id" in data:
                             Chats.upsert_message_to_chat_by_id_and_message_id(
@@ -1065,13 +1250,23 @@ async def process_chat_response(
                             )
 
                         else:
+                            if stream_filters:
+                                data = await apply_stream_filters(stream_filters, data)
+                                if data is None:
+                                    continue
+
+                            if data.get("usage"):
+                                usage = data["usage"]
+
+                            # The usage chunk has no choices
                             value = (
-                                data.get("choices", [])[0]
+                                (data.get("choices") or [{}])[0]
                                 .get("delta", {})
                                 .get("content")
                             )
 
                             if value:
+                                stream_timer.token()
                                 content = f"{content}{value}"
 
                                 if ENABLE_REALTIME_CHAT_SAVE:
@@ -1095,32 +1290,45 @@ async def process_chat_response(
                             }
                         )
 
-                    except Exception as e:
-                        done = "data: [DONE]" in line
+                    except Exception:
+                        continue
+
+                stream_timer.finish()
 
-                        if done:
-                            pass
-                        else:
-                            continue
+                if usage:
+                    # Saved here as the client only uploads the chat when
+                    # outlet filters run client-side
+                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                        metadata["chat_id"],
+                        metadata["message_id"],
+                        {"usage": usage},
+                    )
+
+                completed = None
+                if ENABLE_STREAMING_OUTLET_FILTERS:
+                    content, completed = await outlet_handler(content)
 
                 title = Chats.get_chat_title_by_id(metadata["chat_id"])
                 data = {"done": True, "content": content, "title": title}
+                if completed is not None:
+                    data["completed"] = completed
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        metadata["chat_id"],
-                        metadata["message_id"],
-                        {
-                            "content": content,
-                        },
-                    )
+                    with timed_stage("db_persist"):
+                        Chats.upsert_message_to_chat_by_id_and_message_id(
+                            metadata["chat_id"],
+                            metadata["message_id"],
+                            {
+                                "content": content,
+                            },
+                        )
 
                 # Send a webhook notification if the user is not active
                 if get_active_status_by_user_id(user.id) is None:
                     webhook_url = Users.get_user_webhook_url_by_id(user.id)
                     if webhook_url:
-                        post_webhook(
+                        notification_dispatcher.notify(
                             webhook_url,
                             f"{title} - {request.app.state.config.WEBUI_URL}/c/{metadata['chat_id']}\n\n{content}",
                             {
@@ -1175,8 +1383,26 @@ async def process_chat_response(
             for event in events:
                 yield wrap_item(json.dumps(event))
 
-            async for data in original_generator:
+            stream_timer = StreamTimer(
+                form_data.get("model"),
+                request_start_time=getattr(request.state, "start_time", None),
+                upstream_start_time=getattr(request.state, "upstream_start_time", None),
+            )
+
+            def on_data(data):
+                # Role, usage and [DONE] chunks carry no tokens
+                if b'"content"' not in data:
+                    return
+                try:
+                    delta = (loads(data).get("choices") or [{}])[0].get("delta")
+                except Exception:
+                    return
+                if delta and delta.get("content"):
+                    stream_timer.token()
+
+            async for data in observe_sse_data(original_generator, on_data):
                 yield data
+            stream_timer.finish()
 
         return StreamingResponse(
             stream_wrapper(response.body_iterator, events),
@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import redis.asyncio as redis
+from open_webui.env import (
+    MODEL_LIST_CACHE_MAX_BACKOFF,
+    MODEL_LIST_CACHE_REDIS_URL,
+    MODEL_LIST_CACHE_TTL,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+def get_config_version(*config) -> str:
+    """Fingerprint of the connection settings a model list was fetched under."""
+    return hashlib.sha256(
+        json.dumps(config, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+
+
+class ModelListCache:
+    """Stale-while-revalidate cache of the model lists reported by backends.
+
+    Entries are keyed by backend URL, a fingerprint of its API key and the
+    config version, so changing connections never serves another setup's
+    models. Only the first lookup of a key waits on the backend; afterwards the
+    cached list is returned immediately and refreshed in the background, both
+    on read once it is older than the TTL and by a periodic task. A backend
+    that fails is retried with exponential backoff while its last good list
+    keeps being served. Lists are also written to Redis so replicas pick up
+    each other's fetches instead of all querying the backends.
+    """
+
+    REDIS_PREFIX = "open-webui:model-list"
+    BACKOFF_BASE = 5
+
+    def __init__(
+        self,
+        ttl: int = MODEL_LIST_CACHE_TTL,
+        max_backoff: int = MODEL_LIST_CACHE_MAX_BACKOFF,
+        redis_url: str = MODEL_LIST_CACHE_REDIS_URL,
+    ):
+        self.ttl = ttl
+        self.max_backoff = max_backoff
+        self.redis_url = redis_url
+
+        self.entries = {}
+        self.refreshing = {}
+        self._redis: Optional[redis.Redis] = None
+        self._redis_retry_at = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _get_redis_key(self, url: str, key: Optional[str], config_version: str):
+        url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+        key_hash = hashlib.sha256((key or "").encode()).hexdigest()[:16]
+        return f"{self.REDIS_PREFIX}:{url_hash}:{key_hash}:{config_version}"
+
+    def _get_redis(self) -> Optional[redis.Redis]:
+        if not self.redis_url or time.time() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            self._redis = redis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        # Don't let an unreachable Redis slow down every lookup
+        log.warning(f"Model list cache: Redis unavailable, using local cache: {e}")
+        self._redis_retry_at = time.time() + self.max_backoff
+
+    async def _load_shared(self, redis_key: str):
+        r = self._get_redis()
+        if r is None:
+            return None
+        try:
+            data = await r.get(redis_key)
+            return json.loads(data) if data else None
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+
+    async def _store_shared(self, redis_key: str, value: Any, fetched_at: float):
+        r = self._get_redis()
+        if r is None:
+            return
+        try:
+            await r.set(
+                redis_key,
+                json.dumps({"value": value, "fetched_at": fetched_at}),
+                ex=self.ttl + self.max_backoff,
+            )
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def get(
+        self,
+        url: str,
+        key: Optional[str],
+        config_version: str,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Returns the cached model list for url, fetching it only on a cold miss.
+
+        fetch must return None when the backend could not be reached. Callers
+        must not mutate the returned value, it is shared between requests.
+        """
+        redis_key = self._get_redis_key(url, key, config_version)
+        now = time.time()
+
+        entry = self.entries.get(redis_key)
+        if entry is None:
+            entry = self.entries[redis_key] = {
+                "url": url,
+                "value": None,
+                "fetched_at": None,
+                "failures": 0,
+                "retry_at": 0,
+            }
+        entry["fetch"] = fetch
+        entry["read_at"] = now
+
+        if entry["fetched_at"] is None:
+            if now < entry["retry_at"]:
+                return None
+            return await asyncio.shield(self._refresh(redis_key))
+
+        if now - entry["fetched_at"] > self.ttl and now >= entry["retry_at"]:
+            self._refresh(redis_key)
+        return entry["value"]
+
+    def _refresh(self, redis_key: str) -> asyncio.Task:
+        task = self.refreshing.get(redis_key)
+        if task is None:
+            task = self.refreshing[redis_key] = asyncio.create_task(
+                self._fetch(redis_key)
+            )
+        return task
+
+    async def _fetch(self, redis_key: str) -> Any:
+        entry = self.entries[redis_key]
+        try:
+            shared = await self._load_shared(redis_key)
+            if shared and time.time() - shared["fetched_at"] <= self.ttl:
+                entry["value"] = shared["value"]
+                entry["fetched_at"] = shared["fetched_at"]
+                return entry["value"]
+
+            try:
+                value = await entry["fetch"]()
+            except Exception as e:
+                log.exception(e)
+                value = None
+
+            now = time.time()
+            if value is None:
+                entry["failures"] += 1
+                backoff = min(
+                    self.max_backoff, self.BACKOFF_BASE * 2 ** (entry["failures"] - 1)
+                )
+                entry["retry_at"] = now + backoff
+                log.warning(
+                    f"Model list for {entry['url']} unavailable, retrying in {backoff}s"
+                )
+
+                if entry["value"] is None and shared:
+                    # Another replica's list is better than none
+                    entry["value"] = shared["value"]
+                    entry["fetched_at"] = shared["fetched_at"]
+                return entry["value"]
+
+            entry.update(value=value, fetched_at=now, failures=0, retry_at=0)
+            await self._store_shared(redis_key, value, now)
+            return value
+        finally:
+            self.refreshing.pop(redis_key, None)
+
+    async def invalidate(self, url: Optional[str] = None):
+        """Drops the cached lists for url, or every list, here and in Redis."""
+        for redis_key, entry in list(self.entries.items()):
+            if url is None or entry["url"] == url:
+                self.entries.pop(redis_key, None)
+
+        r = self._get_redis()
+        if r is None:
+            return
+        if url is None:
+            pattern = f"{self.REDIS_PREFIX}:*"
+        else:
+            url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+            pattern = f"{self.REDIS_PREFIX}:{url_hash}:*"
+        try:
+            keys = [redis_key async for redis_key in r.scan_iter(match=pattern)]
+            if keys:
+                await r.delete(*keys)
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def run(self):
+        """Refreshes stale lists on a schedule and forgets ones no longer read."""
+        while True:
+            # Jitter keeps replicas from refreshing in lockstep
+            await asyncio.sleep(self.ttl * random.uniform(0.5, 1))
+
+            now = time.time()
+            for redis_key, entry in list(self.entries.items()):
+                if now - entry["read_at"] > self.ttl * 10:
+                    self.entries.pop(redis_key, None)
+                elif (
+                    entry["fetched_at"] is not None
+                    and now - entry["fetched_at"] > self.ttl
+                    and now >= entry["retry_at"]
+                ):
+                    self._refresh(redis_key)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+model_list_cache = ModelListCache()
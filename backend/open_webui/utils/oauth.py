@@ -15,6 +15,7 @@ from starlette.responses import RedirectResponse
 
 from open_webui.models.auths import Auths
 from open_webui.models.users import Users
+from open_webui.models.channels import Channels
 from open_webui.models.groups import Groups, GroupModel, GroupUpdateForm
 from open_webui.config import (
     config,
@@ -145,6 +146,7 @@ class OAuthManager:
                 Groups.update_group_by_id(
                     id=group_model.id, form_data=update_form, overwrite=False
                 )
+                Channels.sync_channel_access_by_group_id(group_model.id)
 
         # Add user to new groups
         for group_model in all_available_groups:
@@ -170,6 +172,7 @@ class OAuthManager:
                 Groups.update_group_by_id(
                     id=group_model.id, form_data=update_form, overwrite=False
                 )
+                Channels.sync_channel_access_by_group_id(group_model.id)
 
     async def handle_login(self, provider, request):
         if provider not in config.OAUTH_PROVIDERS:
@@ -1,8 +1,8 @@
-import json
 from open_webui.utils.misc import (
     openai_chat_chunk_message_template,
     openai_chat_completion_message_template,
 )
+from open_webui.utils.stream import dumps, iter_ndjson
 
 
 def convert_response_ollama_to_openai(ollama_response: dict) -> dict:
@@ -14,9 +14,7 @@ def convert_response_ollama_to_openai(ollama_response: dict) -> dict:
 
 
 async def convert_streaming_response_ollama_to_openai(ollama_streaming_response):
-    async for data in ollama_streaming_response.body_iterator:
-        data = json.loads(data)
-
+    async for data in iter_ndjson(ollama_streaming_response.body_iterator):
         model = data.get("model", "ollama")
         message_content = data.get("message", {}).get("content", "")
         done = data.get("done", False)
@@ -67,7 +65,7 @@ async def convert_streaming_response_ollama_to_openai(ollama_streaming_response)
             model, message_content if not done else None, usage
         )
 
-        line = f"data: {json.dumps(data)}\n\n"
+        line = f"data: {dumps(data)}\n\n"
         yield line
 
     yield "data: [DONE]\n\n"
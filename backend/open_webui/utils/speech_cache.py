@@ -0,0 +1,240 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import aiofiles
+from open_webui.config import (
+    SPEECH_CACHE_DIR,
+    SPEECH_CACHE_MAX_AGE,
+    SPEECH_CACHE_MAX_SIZE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["AUDIO"])
+
+
+class PendingSpeech:
+    """Audio that is still being synthesized, shared by every request for it.
+
+    Chunks are kept in memory until synthesis finishes so late joiners can
+    replay them from the start and then follow the live stream.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        # Resolves once the first chunk arrives, or with the upstream error
+        self.ready = asyncio.get_running_loop().create_future()
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def append(self, chunk: bytes):
+        self.chunks.append(chunk)
+        if not self.ready.done():
+            self.ready.set_result(None)
+        self._notify()
+
+    def finish(self):
+        self.done = True
+        if not self.ready.done():
+            self.ready.set_result(None)
+        self._notify()
+
+    def fail(self, error: BaseException):
+        self.error = error
+        if not self.ready.done():
+            self.ready.set_exception(error)
+        self._notify()
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        idx = 0
+        while True:
+            changed = self._changed
+            while idx < len(self.chunks):
+                yield self.chunks[idx]
+                idx += 1
+            if self.error is not None:
+                raise self.error
+            if self.done:
+                return
+            await changed.wait()
+
+
+class SpeechCache:
+    """Size- and age-bounded cache of synthesized speech.
+
+    Audio is stored as ``{name}.mp3`` next to the ``{name}.json`` request body,
+    where name is the hash of the request. An in-memory index, rebuilt from disk
+    on start, tracks size and creation time of every entry in LRU order.
+    Entries older than max_age are dropped, and the least recently used ones
+    are evicted once the cache grows past max_size bytes.
+
+    Identical requests that arrive while the audio is still being synthesized
+    share one upstream call, and every client streams the audio as it arrives.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = SPEECH_CACHE_DIR,
+        max_size: int = SPEECH_CACHE_MAX_SIZE,
+        max_age: int = SPEECH_CACHE_MAX_AGE,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.max_age = max_age
+
+        # name -> (size, created_at), least recently used first
+        self.index = OrderedDict()
+        self.total_size = 0
+        self.pending = {}
+        self.tasks = set()
+        self.stats = {"hits": 0, "misses": 0, "shared": 0, "evictions": 0}
+
+        self._load()
+
+    def _load(self):
+        found = []
+        for path in self.cache_dir.glob("*.mp3"):
+            stat = path.stat()
+            found.append((stat.st_atime, path.stem, stat.st_size, stat.st_mtime))
+        for _, name, size, created_at in sorted(found):
+            self.index[name] = (size, created_at)
+            self.total_size += size
+
+    def get_file_path(self, name: str) -> Path:
+        return self.cache_dir.joinpath(f"{name}.mp3")
+
+    def get_body_path(self, name: str) -> Path:
+        return self.cache_dir.joinpath(f"{name}.json")
+
+    def _remove(self, name: str):
+        size, _ = self.index.pop(name, (0, 0))
+        self.total_size -= size
+        for path in (self.get_file_path(name), self.get_body_path(name)):
+            path.unlink(missing_ok=True)
+
+    def _evict(self):
+        now = time.time()
+        expired = [
+            name
+            for name, (_, created_at) in self.index.items()
+            if now - created_at > self.max_age
+        ]
+        for name in expired:
+            self._remove(name)
+            self.stats["evictions"] += 1
+
+        while self.total_size > self.max_size and len(self.index) > 1:
+            name = next(iter(self.index))
+            self._remove(name)
+            self.stats["evictions"] += 1
+
+    def get(self, name: str) -> Optional[Path]:
+        """Returns the cached audio for name, counting a hit or a miss."""
+        file_path = self.get_file_path(name)
+
+        entry = self.index.get(name)
+        if entry is None and file_path.is_file():
+            # Written by another route or replica sharing the directory
+            stat = file_path.stat()
+            entry = self.index[name] = (stat.st_size, stat.st_mtime)
+            self.total_size += stat.st_size
+
+        if entry is not None:
+            if time.time() - entry[1] > self.max_age or not file_path.is_file():
+                self._remove(name)
+            else:
+                self.index.move_to_end(name)
+                self.stats["hits"] += 1
+                return file_path
+
+        self.stats["misses"] += 1
+        return None
+
+    def add(self, name: str, payload: dict):
+        """Indexes audio that was written directly to get_file_path(name)."""
+        with open(self.get_body_path(name), "w") as f:
+            f.write(json.dumps(payload))
+
+        size = self.get_file_path(name).stat().st_size
+        previous_size, _ = self.index.pop(name, (0, 0))
+        self.index[name] = (size, time.time())
+        self.total_size += size - previous_size
+        self._evict()
+
+    async def stream(
+        self, name: str, chunks: AsyncIterator[bytes], payload: dict
+    ) -> AsyncIterator[bytes]:
+        """Streams audio from an upstream chunk iterator while caching it.
+
+        If the same audio is already being synthesized the new request joins it
+        and chunks is closed unused. Raises the upstream error if synthesis
+        fails before any audio arrives.
+        """
+        pending = self.pending.get(name)
+        if pending is None:
+            pending = self.pending[name] = PendingSpeech()
+            task = asyncio.create_task(self._synthesize(name, pending, chunks, payload))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        else:
+            self.stats["shared"] += 1
+            await chunks.aclose()
+
+        await asyncio.shield(pending.ready)
+        return pending.iter_chunks()
+
+    async def _synthesize(
+        self,
+        name: str,
+        pending: PendingSpeech,
+        chunks: AsyncIterator[bytes],
+        payload: dict,
+    ):
+        # Runs independently of the requests so a client disconnecting doesn't
+        # cancel synthesis for the others or leave a partial file behind
+        file_path = self.get_file_path(name)
+        part_path = file_path.with_suffix(".mp3.part")
+        try:
+            async with aiofiles.open(part_path, "wb") as f:
+                async for chunk in chunks:
+                    pending.append(chunk)
+                    await f.write(chunk)
+
+            os.replace(part_path, file_path)
+            self.add(name, payload)
+            pending.finish()
+        except BaseException as e:
+            log.exception(e)
+            part_path.unlink(missing_ok=True)
+            pending.fail(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self.pending.pop(name, None)
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self.index),
+            "size": self.total_size,
+            "max_size": self.max_size,
+            "max_age": self.max_age,
+            "in_progress": len(self.pending),
+            "hit_rate": self.stats["hits"] / lookups if lookups else None,
+        }
+
+
+speech_cache = SpeechCache()
@@ -0,0 +1,109 @@
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+####################################
+# JSON
+#
+# orjson is used when it is installed. The functions accept and ignore the
+# standard library's keyword arguments, so this module can also be handed to
+# libraries that take a json module, like python-socketio.
+####################################
+
+
+def loads(data: Union[str, bytes], **kwargs) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, **kwargs) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            # e.g. non-string keys or types orjson doesn't know; json may still cope
+            pass
+    return json.dumps(obj)
+
+
+####################################
+# Stream framing
+####################################
+
+
+async def iter_lines(
+    chunks: AsyncIterable[Union[str, bytes]],
+) -> AsyncIterator[bytes]:
+    """Yields the lines of a byte stream, however its chunks were split.
+
+    Upstream chunks can end mid-line or carry several lines at once; lines are
+    returned without their line ending, and chunks that hold whole lines are
+    sliced rather than copied.
+    """
+    pending = bytearray()
+    async for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            if pending:
+                pending += chunk[start:end]
+                line = bytes(pending)
+                pending.clear()
+            else:
+                line = chunk[start:end]
+            start = end + 1
+            yield line[:-1] if line.endswith(b"\r") else line
+        pending += chunk[start:]
+
+    if pending:
+        yield bytes(pending)
+
+
+async def iter_ndjson(chunks: AsyncIterable[Union[str, bytes]]) -> AsyncIterator[Any]:
+    """Parses a newline-delimited JSON stream, skipping blank lines."""
+    async for line in iter_lines(chunks):
+        if line.strip():
+            yield loads(line)
+
+
+async def iter_sse_data(
+    chunks: AsyncIterable[Union[str, bytes]],
+) -> AsyncIterator[bytes]:
+    """Yields the unparsed payload of every data line of a server-sent event stream.
+
+    Each data line is taken as one event, which is how OpenAI-compatible
+    servers send them, so streams missing the blank line between events are
+    still read correctly. Comments and other fields are skipped.
+    """
+    async for line in iter_lines(chunks):
+        if line.startswith(b"data:"):
+            data = line[5:]
+            yield data[1:] if data.startswith(b" ") else data
+
+
+async def observe_sse_data(
+    chunks: AsyncIterable[Union[str, bytes]], on_data: Callable[[bytes], None]
+) -> AsyncIterator[Union[str, bytes]]:
+    """Passes a server-sent event stream through unchanged, calling ``on_data``
+    with the payload of every data line once the line is complete."""
+    pending = bytearray()
+    async for chunk in chunks:
+        raw = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        if b"\n" in raw:
+            *lines, rest = (pending + raw).split(b"\n")
+            pending = bytearray(rest)
+            for line in lines:
+                if line.startswith(b"data:"):
+                    data = line[5:].rstrip(b"\r")
+                    on_data(bytes(data[1:] if data.startswith(b" ") else data))
+        else:
+            pending += raw
+        yield chunk
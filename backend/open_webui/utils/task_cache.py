@@ -0,0 +1,121 @@
+import asyncio
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+import structlog
+from open_webui.env import TASK_CACHE_MAX_ENTRIES, TASK_CACHE_TTL
+
+log = structlog.get_logger(__name__)
+
+
+def normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return " ".join(content.split())
+    return content
+
+
+class TaskResponseCache:
+    """TTL- and size-bounded LRU cache of task model completions.
+
+    Completions are keyed by task type, user, task model and parameters, and
+    the whitespace-normalized prompt, so repeated calls with the same
+    conversation, like query generation for web search and then for retrieval
+    in one turn, reuse the first answer. Identical calls made while one is in
+    flight wait for it instead of asking the task model again.
+    """
+
+    def __init__(
+        self, ttl: int = TASK_CACHE_TTL, max_entries: int = TASK_CACHE_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # key -> (response, expires_at), least recently used first
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.stats = {"hits": 0, "misses": 0, "shared": 0}
+
+    @staticmethod
+    def get_key(user_id: str, payload: dict) -> str:
+        messages = [
+            {**message, "content": normalize_content(message.get("content"))}
+            for message in payload.get("messages", [])
+        ]
+        params = {
+            key: value
+            for key, value in payload.items()
+            if key not in ("messages", "metadata")
+        }
+        task = payload.get("metadata", {}).get("task")
+
+        return hashlib.sha256(
+            json.dumps(
+                [task, user_id, params, messages], sort_keys=True, default=str
+            ).encode()
+        ).hexdigest()
+
+    def _store(self, key: str, response: dict):
+        self.entries[key] = (response, time.monotonic() + self.ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get_or_generate(
+        self, user_id: str, payload: dict, generate: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        if self.ttl <= 0 or self.max_entries <= 0 or payload.get("stream"):
+            return await generate()
+
+        key = self.get_key(user_id, payload)
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.stats["hits"] += 1
+                log.debug(
+                    "task_cache:hit", task=payload.get("metadata", {}).get("task")
+                )
+                return copy.deepcopy(entry[0])
+            del self.entries[key]
+
+        pending = self.pending.get(key)
+        if pending is not None:
+            self.stats["shared"] += 1
+            try:
+                return copy.deepcopy(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request that started the generation was cancelled, not
+                # this one; take it over
+                return await self.get_or_generate(user_id, payload, generate)
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            response = await generate()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            # Only keep successful completions, not error or streaming responses
+            if isinstance(response, dict) and "choices" in response:
+                self._store(key, copy.deepcopy(response))
+            return response
+        finally:
+            self.pending.pop(key, None)
+
+
+task_response_cache = TaskResponseCache()
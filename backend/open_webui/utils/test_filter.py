@@ -0,0 +1,143 @@
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.utils import filter
+from open_webui.utils.filter import FilterChainCache
+
+
+class FakeFilter:
+    class Valves:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    def __init__(self):
+        self.valves = self.Valves()
+
+    def inlet(self, body, __user__=None):
+        return body
+
+    async def outlet(self, body):
+        return body
+
+
+@pytest.fixture
+def functions(monkeypatch):
+    """Fake function rows and valves, counting the metadata queries."""
+    state = {
+        "rows": [],
+        "valves": {},
+        "queries": 0,
+    }
+
+    def get_functions_by_type(type, active_only=False):
+        state["queries"] += 1
+        return state["rows"]
+
+    monkeypatch.setattr(
+        filter,
+        "Functions",
+        SimpleNamespace(
+            get_functions_by_type=get_functions_by_type,
+            get_function_valves_by_id=lambda id: state["valves"].get(id),
+        ),
+    )
+    return state
+
+
+def add_function(functions, request, id, priority=0, is_global=False):
+    functions["rows"].append(SimpleNamespace(id=id, is_global=is_global))
+    functions["valves"][id] = {"priority": priority}
+    request.app.state.FUNCTIONS[id] = FakeFilter()
+
+
+@pytest.fixture
+def app_request():
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(FUNCTIONS={})))
+
+
+def make_model(*filter_ids):
+    return {"info": {"meta": {"filterIds": list(filter_ids)}}}
+
+
+def test_chain_holds_global_and_model_filters_in_priority_order(functions, app_request):
+    add_function(functions, app_request, "late", priority=10)
+    add_function(functions, app_request, "global", priority=5, is_global=True)
+    add_function(functions, app_request, "early", priority=1)
+    add_function(functions, app_request, "unused", priority=0)
+
+    chain = FilterChainCache(ttl=60).get(app_request, make_model("late", "early"))
+
+    assert [compiled["id"] for compiled in chain] == ["early", "global", "late"]
+
+
+def test_priority_defaults_to_the_valves_class(functions, app_request):
+    add_function(functions, app_request, "saved", priority=5)
+    functions["rows"].append(SimpleNamespace(id="default", is_global=True))
+
+    class DefaultPriorityFilter(FakeFilter):
+        class Valves(FakeFilter.Valves):
+            priority = 10
+
+    app_request.app.state.FUNCTIONS["default"] = DefaultPriorityFilter()
+
+    chain = FilterChainCache(ttl=60).get(app_request, make_model("saved"))
+
+    assert [compiled["id"] for compiled in chain] == ["saved", "default"]
+
+
+def test_compiled_filters_carry_valves_and_hook_signatures(functions, app_request):
+    add_function(functions, app_request, "a", priority=3)
+
+    (compiled,) = FilterChainCache(ttl=60).get(app_request, make_model("a"))
+
+    assert compiled["module"].valves.priority == 3
+    assert compiled["inlet"]["parameters"] == {"body", "__user__"}
+    assert not compiled["inlet"]["is_coroutine"]
+    assert compiled["outlet"]["is_coroutine"]
+    assert "stream" not in compiled
+
+
+def test_chains_are_cached_per_filter_id_set(functions, app_request):
+    add_function(functions, app_request, "a")
+    add_function(functions, app_request, "b")
+    cache = FilterChainCache(ttl=60)
+
+    first = cache.get(app_request, make_model("a", "b"))
+    second = cache.get(app_request, make_model("b", "a", "a"))
+
+    assert first is second
+    assert functions["queries"] == 1
+
+    cache.get(app_request, make_model("a"))
+    assert functions["queries"] == 2
+
+
+def test_invalidate_recompiles_chains(functions, app_request):
+    add_function(functions, app_request, "a", priority=2)
+    add_function(functions, app_request, "b", priority=1)
+    cache = FilterChainCache(ttl=60)
+    model = make_model("a", "b")
+    assert [compiled["id"] for compiled in cache.get(app_request, model)] == ["b", "a"]
+
+    functions["valves"]["a"]["priority"] = 0
+    assert [compiled["id"] for compiled in cache.get(app_request, model)] == ["b", "a"]
+
+    cache.invalidate()
+    assert [compiled["id"] for compiled in cache.get(app_request, model)] == ["a", "b"]
+
+
+def test_chains_expire_after_ttl(functions, app_request, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(filter.time, "monotonic", lambda: now[0])
+    add_function(functions, app_request, "a")
+    cache = FilterChainCache(ttl=60)
+
+    cache.get(app_request, make_model("a"))
+    now[0] += 59
+    cache.get(app_request, make_model("a"))
+    assert functions["queries"] == 1
+
+    now[0] += 1
+    cache.get(app_request, make_model("a"))
+    assert functions["queries"] == 2
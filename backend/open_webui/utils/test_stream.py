@@ -0,0 +1,79 @@
+import pytest
+
+from open_webui.utils.stream import (
+    iter_lines,
+    iter_ndjson,
+    iter_sse_data,
+    observe_sse_data,
+)
+
+
+async def iterate(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_joins_lines_split_across_chunks():
+    chunks = [b"hel", b"lo\nwor", b"ld\n"]
+    assert await collect(iter_lines(iterate(chunks))) == [b"hello", b"world"]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_splits_merged_chunks():
+    chunks = [b"one\ntwo\n\nthree\n"]
+    assert await collect(iter_lines(iterate(chunks))) == [
+        b"one",
+        b"two",
+        b"",
+        b"three",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_strips_crlf_even_when_split():
+    chunks = [b"one\r\ntwo\r", b"\nthree"]
+    assert await collect(iter_lines(iterate(chunks))) == [b"one", b"two", b"three"]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_accepts_str_chunks():
+    chunks = ["café\n", "naïve"]
+    assert await collect(iter_lines(iterate(chunks))) == [
+        "café".encode(),
+        "naïve".encode(),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_parses_split_objects_and_skips_blank_lines():
+    chunks = [b'{"a": 1}\n\n{"b"', b": [1, 2]}\r\n", b"  \n"]
+    assert await collect(iter_ndjson(iterate(chunks))) == [{"a": 1}, {"b": [1, 2]}]
+
+
+@pytest.mark.asyncio
+async def test_iter_sse_data_yields_data_lines_only():
+    chunks = [
+        b'data: {"a"',
+        b": 1}\r\n\r\n: keep-alive\r\nevent: ping\r\ndata:[DONE]\r\n\r\n",
+    ]
+    assert await collect(iter_sse_data(iterate(chunks))) == [b'{"a": 1}', b"[DONE]"]
+
+
+@pytest.mark.asyncio
+async def test_iter_sse_data_reads_events_without_blank_lines():
+    chunks = [b"data: 1\ndata: 2\n"]
+    assert await collect(iter_sse_data(iterate(chunks))) == [b"1", b"2"]
+
+
+@pytest.mark.asyncio
+async def test_observe_sse_data_passes_chunks_through():
+    chunks = [b'data: {"a"', b": 1}\r\n\r\nevent: ping\ndata: [DONE]\n\n", "data: x\n"]
+    seen = []
+
+    assert await collect(observe_sse_data(iterate(chunks), seen.append)) == chunks
+    assert seen == [b'{"a": 1}', b"[DONE]", b"x"]
@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+
+from open_webui.utils import task_cache
+from open_webui.utils.task_cache import TaskResponseCache
+
+
+def make_payload(content="What is the capital of France?", **kwargs):
+    return {
+        "model": "task-model",
+        "messages": [{"role": "user", "content": content}],
+        "metadata": {"task": "title_generation"},
+        **kwargs,
+    }
+
+
+def make_generate(response=None):
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return response or {"choices": [{"message": {"content": "Paris"}}]}
+
+    return generate, calls
+
+
+@pytest.mark.asyncio
+async def test_repeated_calls_reuse_the_first_completion():
+    cache = TaskResponseCache(ttl=60, max_entries=10)
+    generate, calls = make_generate()
+
+    first = await cache.get_or_generate("user", make_payload(), generate)
+    # Whitespace differences in the prompt don't matter
+    second = await cache.get_or_generate(
+        "user", make_payload("What is  the capital\nof France?"), generate
+    )
+
+    assert first == second
+    assert len(calls) == 1
+    assert cache.stats == {"hits": 1, "misses": 1, "shared": 0}
+
+
+@pytest.mark.asyncio
+async def test_cached_completions_are_copies():
+    cache = TaskResponseCache(ttl=60, max_entries=10)
+    generate, _ = make_generate()
+
+    first = await cache.get_or_generate("user", make_payload(), generate)
+    first["choices"][0]["message"]["content"] = "changed"
+    second = await cache.get_or_generate("user", make_payload(), generate)
+
+    assert second["choices"][0]["message"]["content"] == "Paris"
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_by_user_task_and_params():
+    cache = TaskResponseCache(ttl=60, max_entries=10)
+    generate, calls = make_generate()
+
+    await cache.get_or_generate("user", make_payload(), generate)
+    await cache.get_or_generate("other", make_payload(), generate)
+    await cache.get_or_generate("user", make_payload(temperature=0.5), generate)
+    await cache.get_or_generate(
+        "user", {**make_payload(), "metadata": {"task": "tags_generation"}}, generate
+    )
+
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_streaming_and_error_responses_are_not_cached():
+    cache = TaskResponseCache(ttl=60, max_entries=10)
+    generate, calls = make_generate({"error": "overloaded"})
+
+    await cache.get_or_generate("user", make_payload(stream=True), generate)
+    await cache.get_or_generate("user", make_payload(), generate)
+    await cache.get_or_generate("user", make_payload(), generate)
+
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(task_cache.time, "monotonic", lambda: now[0])
+    cache = TaskResponseCache(ttl=60, max_entries=10)
+    generate, calls = make_generate()
+
+    await cache.get_or_generate("user", make_payload(), generate)
+    now[0] += 61
+    await cache.get_or_generate("user", make_payload(), generate)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    cache = TaskResponseCache(ttl=60, max_entries=2)
+    generate, calls = make_generate()
+
+    await cache.get_or_generate("user", make_payload("a"), generate)
+    await cache.get_or_generate("user", make_payload("b"), generate)
+    await cache.get_or_generate("user", make_payload("a"), generate)
+    await cache.get_or_generate("user", make_payload("c"), generate)
+    assert len(calls) == 3
+
+    # "b" was the least recently used, "a" is still cached
+    await cache.get_or_generate("user", make_payload("a"), generate)
+    assert len(calls) == 3
+    await cache.get_or_generate("user", make_payload("b"), generate)
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_generation():
+    cache = TaskResponseCache(ttl=60, max_entries=10)
+    release = asyncio.Event()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await release.wait()
+        return {"choices": []}
+
+    tasks = [
+        asyncio.create_task(cache.get_or_generate("user", make_payload(), generate))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [{"choices": []}] * 3
+    assert len(calls) == 1
+    assert cache.stats["shared"] == 2
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_owner_is_cancelled():
+    cache = TaskResponseCache(ttl=60, max_entries=10)
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.Event().wait()
+        return {"choices": []}
+
+    owner = asyncio.create_task(cache.get_or_generate("user", make_payload(), generate))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(
+        cache.get_or_generate("user", make_payload(), generate)
+    )
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    assert await waiter == {"choices": []}
+    assert len(calls) == 2
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+
+@pytest.mark.asyncio
+async def test_waiters_get_the_generation_error():
+    cache = TaskResponseCache(ttl=60, max_entries=10)
+    release = asyncio.Event()
+
+    async def generate():
+        await release.wait()
+        raise ValueError("task model failed")
+
+    tasks = [
+        asyncio.create_task(cache.get_or_generate("user", make_payload(), generate))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not cache.pending
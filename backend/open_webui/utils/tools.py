@@ -1,7 +1,9 @@
+import asyncio
 import inspect
+import json
 import logging
 import re
-from typing import Any, Awaitable, Callable, get_type_hints
+from typing import Any, Awaitable, Callable, Optional, get_type_hints
 from functools import update_wrapper, partial
 
 
@@ -28,59 +30,145 @@ def apply_extra_params_to_tool_function(
         return partial_func
 
     async def new_function(*args, **kwargs):
-        return partial_func(*args, **kwargs)
+        # Sync tools usually block on I/O; run them off the event loop so calls
+        # overlap and their timeouts can fire. A timed out call is abandoned,
+        # but its thread runs to completion.
+        return await asyncio.to_thread(partial_func, *args, **kwargs)
 
     update_wrapper(new_function, function)
     return new_function
 
 
+class ToolRegistry:
+    """Per-tool data that only changes when the tool does.
+
+    Cleaned specs, their JSON and the pydantic model of every function, plus
+    the tool's valves, are built once per tool version, identified by the
+    row's updated_at (which valve updates also bump) and the loaded module.
+    A chat turn then costs one query for the versions of its tools instead of
+    loading each tool row and its valves and rebuilding everything. The tool
+    routes call invalidate on every change, since updated_at only has
+    second resolution.
+    """
+
+    def __init__(self):
+        # tool id -> entry for the latest version seen
+        self.entries = {}
+
+    def _build(self, tool_id: str, version: tuple, module) -> Optional[dict]:
+        tools = Tools.get_tool_by_id(tool_id)
+        if tools is None:
+            return None
+
+        valves = None
+        if hasattr(module, "valves") and hasattr(module, "Valves"):
+            valves = module.Valves(**(Tools.get_tool_valves_by_id(tool_id) or {}))
+
+        functions = []
+        for spec in tools.specs:
+            # Remove internal parameters
+            spec = {
+                **spec,
+                "parameters": {
+                    **spec["parameters"],
+                    "properties": {
+                        key: val
+                        for key, val in spec["parameters"]["properties"].items()
+                        if not key.startswith("__")
+                    },
+                },
+            }
+            function = getattr(module, spec["name"])
+            functions.append(
+                {
+                    "name": spec["name"],
+                    "function": function,
+                    "spec": spec,
+                    "spec_json": json.dumps(spec),
+                    "pydantic_model": function_to_pydantic_model(function),
+                }
+            )
+
+        return {
+            "version": version,
+            "tools": tools,
+            "valves": valves,
+            "functions": functions,
+            "file_handler": hasattr(module, "file_handler") and module.file_handler,
+            "citation": hasattr(module, "citation") and module.citation,
+        }
+
+    def get(self, request: Request, tool_id: str, updated_at: int) -> Optional[dict]:
+        module = request.app.state.TOOLS.get(tool_id, None)
+        if module is None:
+            module, _ = load_tools_module_by_id(tool_id)
+            request.app.state.TOOLS[tool_id] = module
+
+        version = (updated_at, id(module))
+        entry = self.entries.get(tool_id)
+        if entry is None or entry["version"] != version:
+            entry = self._build(tool_id, version, module)
+            if entry is None:
+                self.entries.pop(tool_id, None)
+                return None
+            self.entries[tool_id] = entry
+
+        if entry["valves"] is not None:
+            module.valves = entry["valves"]
+        return entry
+
+    def invalidate(self, tool_id: str):
+        self.entries.pop(tool_id, None)
+
+
+tool_registry = ToolRegistry()
+
+
+def get_user_valves(user: UserModel, tool_id: str) -> dict:
+    # The user was loaded for this request, so their settings are current
+    settings = user.settings.model_dump() if user.settings else {}
+    return settings.get("tools", {}).get("valves", {}).get(tool_id, {})
+
+
 # Mutation on extra_params
 def get_tools(
     request: Request, tool_ids: list[str], user: UserModel, extra_params: dict
 ) -> dict[str, dict]:
     tools_dict = {}
 
+    versions = Tools.get_tool_versions_by_ids(tool_ids)
     for tool_id in tool_ids:
-        tools = Tools.get_tool_by_id(tool_id)
-        if tools is None:
+        if tool_id not in versions:
             continue
 
-        module = request.app.state.TOOLS.get(tool_id, None)
-        if module is None:
-            module, _ = load_tools_module_by_id(tool_id)
-            request.app.state.TOOLS[tool_id] = module
+        entry = tool_registry.get(request, tool_id, versions[tool_id])
+        if entry is None:
+            continue
+        tools = entry["tools"]
+        module = request.app.state.TOOLS[tool_id]
 
         extra_params["__id__"] = tool_id
-        if hasattr(module, "valves") and hasattr(module, "Valves"):
-            valves = Tools.get_tool_valves_by_id(tool_id) or {}
-            module.valves = module.Valves(**valves)
-
         if hasattr(module, "UserValves"):
             extra_params["__user__"]["valves"] = module.UserValves(  # type: ignore
-                **Tools.get_user_valves_by_id_and_user_id(tool_id, user.id)
+                **get_user_valves(user, tool_id)
             )
 
-        for spec in tools.specs:
-            # Remove internal parameters
-            spec["parameters"]["properties"] = {
-                key: val
-                for key, val in spec["parameters"]["properties"].items()
-                if not key.startswith("__")
-            }
-
-            function_name = spec["name"]
+        for function in entry["functions"]:
+            function_name = function["name"]
 
             # convert to function that takes only model params and inserts custom params
-            original_func = getattr(module, function_name)
-            callable = apply_extra_params_to_tool_function(original_func, extra_params)
+            callable = apply_extra_params_to_tool_function(
+                function["function"], extra_params
+            )
             # TODO: This needs to be a pydantic model
             tool_dict = {
                 "toolkit_id": tool_id,
                 "callable": callable,
-                "spec": spec,
-                "pydantic_model": function_to_pydantic_model(callable),
-                "file_handler": hasattr(module, "file_handler") and module.file_handler,
-                "citation": hasattr(module, "citation") and module.citation,
+                "spec": function["spec"],
+                "spec_json": function["spec_json"],
+                "pydantic_model": function["pydantic_model"],
+                "file_handler": entry["file_handler"],
+                "citation": entry["citation"],
             }
 
             # TODO: if collision, prepend toolkit name
@@ -94,6 +182,11 @@ def get_tools(
     return tools_dict
 
 
+def get_tools_specs_json(tools: dict[str, dict]) -> str:
+    """The specs of tools as a JSON list, joined from their precomputed JSON."""
+    return "[" + ", ".join(tool["spec_json"] for tool in tools.values()) + "]"
+
+
 def parse_description(docstring: str | None) -> str:
     """
     Parse a function's docstring to extract the description.
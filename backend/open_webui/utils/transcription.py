@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional
+
+from open_webui.env import SRC_LOG_LEVELS, WHISPER_CHUNK_SECONDS, WHISPER_WORKERS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["AUDIO"])
+
+SAMPLE_RATE = 16000
+
+
+class WhisperWorkerPool:
+    """Runs faster-whisper transcriptions on a pool of worker threads.
+
+    Requests queue on the pool instead of running on the event loop or
+    serializing on one model call. The model should be created with
+    ``num_workers`` equal to the pool size so calls from different threads run in
+    parallel. Recordings longer than ``chunk_seconds`` are split at silences
+    found by the VAD model, the first chunk is transcribed to detect the
+    language, and the remaining chunks are transcribed in parallel and yielded
+    in order as partial transcripts.
+    """
+
+    def __init__(
+        self, workers: int = WHISPER_WORKERS, chunk_seconds: int = WHISPER_CHUNK_SECONDS
+    ):
+        self.workers = workers
+        self.chunk_seconds = chunk_seconds
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="whisper"
+        )
+        self.model = None
+        self.model_name: Optional[str] = None
+
+    def set_model(self, model, model_name: Optional[str] = None):
+        self.model = model
+        self.model_name = model_name
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: fn(*args, **kwargs))
+
+    def _transcribe_audio(self, audio, language: Optional[str] = None):
+        segments, info = self.model.transcribe(audio, beam_size=5, language=language)
+        # segments is a generator; decoding happens while it is consumed
+        text = "".join(segment.text for segment in segments)
+        return text, info
+
+    def _split(self, file_path: str) -> list:
+        from faster_whisper.audio import decode_audio
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        audio = decode_audio(file_path, sampling_rate=SAMPLE_RATE)
+        max_samples = self.chunk_seconds * SAMPLE_RATE
+        if len(audio) <= max_samples:
+            return [audio]
+
+        speech = get_speech_timestamps(
+            audio, VadOptions(max_speech_duration_s=self.chunk_seconds)
+        )
+
+        chunks = []
+        start = end = None
+        for segment in speech:
+            if start is None:
+                start = segment["start"]
+            elif segment["end"] - start > max_samples:
+                chunks.append(audio[start:end])
+                start = segment["start"]
+            end = segment["end"]
+        if start is not None:
+            chunks.append(audio[start:end])
+
+        return chunks
+
+    async def transcribe_stream(self, file_path: str) -> AsyncIterator[str]:
+        """Yields the transcript of each chunk of the recording, in order."""
+        if self.model is None:
+            raise RuntimeError("Whisper model is not loaded")
+
+        chunks = await self._run(self._split, file_path)
+        if not chunks:
+            return
+        log.debug(f"Transcribing {file_path} in {len(chunks)} chunks")
+
+        text, info = await self._run(self._transcribe_audio, chunks[0])
+        log.info(
+            "Detected language '%s' with probability %f"
+            % (info.language, info.language_probability)
+        )
+        yield text
+
+        pending = [
+            asyncio.ensure_future(
+                self._run(self._transcribe_audio, chunk, language=info.language)
+            )
+            for chunk in chunks[1:]
+        ]
+        try:
+            for future in pending:
+                text, _ = await future
+                yield text
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def transcribe(self, file_path: str) -> str:
+        return "".join([text async for text in self.transcribe_stream(file_path)])
+
+
+whisper_pool = WhisperWorkerPool()
@@ -1,54 +1,101 @@
+import asyncio
 import json
 import logging
+import random
+from typing import Optional
+from urllib.parse import urlparse
 
+import aiohttp
 import requests
 from open_webui.config import WEBUI_FAVICON_URL, WEBUI_NAME
-from open_webui.env import SRC_LOG_LEVELS, VERSION
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    VERSION,
+    WEBHOOK_BATCH_WINDOW,
+    WEBHOOK_MAX_CONCURRENCY,
+    WEBHOOK_MAX_RETRIES,
+    WEBHOOK_TIMEOUT,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["WEBHOOK"])
 
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+def is_text_webhook(url: str) -> bool:
+    """Slack, Google Chat and Discord webhooks only carry the message text."""
+    return (
+        "https://hooks.slack.com" in url
+        or "https://chat.googleapis.com" in url
+        or "https://discord.com/api/webhooks" in url
+    )
+
+
+def combine_text_messages(url: str, messages: list[str]) -> list[str]:
+    """Join messages for a text webhook, split to fit Discord's length limit."""
+    separator = "\n\n---\n\n"
+    if "https://discord.com/api/webhooks" not in url:
+        return [separator.join(messages)]
+
+    limit = DISCORD_MESSAGE_LIMIT
+    chunks = []
+    for message in messages:
+        for start in range(0, len(message), limit):
+            piece = message[start : start + limit]
+            if chunks and len(chunks[-1]) + len(separator) + len(piece) <= limit:
+                chunks[-1] += separator + piece
+            else:
+                chunks.append(piece)
+    return chunks
+
+
+def build_webhook_payload(url: str, message: str, event_data: dict) -> dict:
+    payload = {}
+
+    # Slack and Google Chat Webhooks
+    if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
+        payload["text"] = message
+    # Discord Webhooks
+    elif "https://discord.com/api/webhooks" in url:
+        payload["content"] = (
+            message
+            if len(message) <= DISCORD_MESSAGE_LIMIT
+            else f"{message[: DISCORD_MESSAGE_LIMIT - 20]}... (truncated)"
+        )
+    # Microsoft Teams Webhooks
+    elif "webhook.office.com" in url:
+        action = event_data.get("action", "undefined")
+        facts = [
+            {"name": name, "value": value}
+            for name, value in json.loads(event_data.get("user", "{}")).items()
+        ]
+        payload = {
+            "@type": "MessageCard",
+            "@context": "http://schema.org/extensions",
+            "themeColor": "0076D7",
+            "summary": message,
+            "sections": [
+                {
+                    "activityTitle": message,
+                    "activitySubtitle": f"{WEBUI_NAME} ({VERSION}) - {action}",
+                    "activityImage": WEBUI_FAVICON_URL,
+                    "facts": facts,
+                    "markdown": True,
+                }
+            ],
+        }
+    # Default Payload
+    else:
+        payload = {**event_data}
+
+    return payload
+
 
 def post_webhook(url: str, message: str, event_data: dict) -> bool:
     try:
         log.debug(f"post_webhook: {url}, {message}, {event_data}")
-        payload = {}
-
-        # Slack and Google Chat Webhooks
-        if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
-            payload["text"] = message
-        # Discord Webhooks
-        elif "https://discord.com/api/webhooks" in url:
-            payload["content"] = (
-                message
-                if len(message) < 2000
-                else f"{message[: 2000 - 20]}... (truncated)"
-            )
-        # Microsoft Teams Webhooks
-        elif "webhook.office.com" in url:
-            action = event_data.get("action", "undefined")
-            facts = [
-                {"name": name, "value": value}
-                for name, value in json.loads(event_data.get("user", {})).items()
-            ]
-            payload = {
-                "@type": "MessageCard",
-                "@context": "http://schema.org/extensions",
-                "themeColor": "0076D7",
-                "summary": message,
-                "sections": [
-                    {
-                        "activityTitle": message,
-                        "activitySubtitle": f"{WEBUI_NAME} ({VERSION}) - {action}",
-                        "activityImage": WEBUI_FAVICON_URL,
-                        "facts": facts,
-                        "markdown": True,
-                    }
-                ],
-            }
-        # Default Payload
-        else:
-            payload = {**event_data}
+        payload = build_webhook_payload(url, message, event_data)
 
         log.debug(f"payload: {payload}")
         r = requests.post(url, json=payload)
@@ -58,3 +105,139 @@ def post_webhook(url: str, message: str, event_data: dict) -> bool:
     except Exception as e:
         log.exception(e)
         return False
+
+
+class NotificationDispatcher:
+    """Delivers webhook notifications in the background.
+
+    ``notify`` only queues the notification, so callers on the request path
+    never wait on a webhook endpoint. Notifications for the same URL that arrive
+    within WEBHOOK_BATCH_WINDOW are grouped: text-only destinations (Slack,
+    Google Chat, Discord) get a single combined message, split into as many
+    messages as Discord's length limit requires, others get one request per
+    notification, in order. At most WEBHOOK_MAX_CONCURRENCY requests are in
+    flight at once; a delivery waiting out a retry backoff does not hold a slot.
+    Rate limits, server errors and connection failures are retried with
+    exponential backoff; notifications that still fail are written to the log
+    as dead letters.
+    """
+
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 30
+
+    def __init__(
+        self,
+        max_concurrency: int = WEBHOOK_MAX_CONCURRENCY,
+        max_retries: int = WEBHOOK_MAX_RETRIES,
+        batch_window: float = WEBHOOK_BATCH_WINDOW,
+        timeout: int = WEBHOOK_TIMEOUT,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.batch_window = batch_window
+        self.timeout = timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending = {}
+        self._flush_handles = {}
+        self._tasks = set()
+
+    def notify(self, url: str, message: str, event_data: dict):
+        """Queue a notification; must be called from the event loop."""
+        loop = asyncio.get_running_loop()
+
+        self._pending.setdefault(url, []).append((message, event_data))
+        if url not in self._flush_handles:
+            self._flush_handles[url] = loop.call_later(
+                self.batch_window, self._flush, url
+            )
+
+    def _flush(self, url: str):
+        handle = self._flush_handles.pop(url, None)
+        if handle:
+            handle.cancel()
+
+        batch = self._pending.pop(url, None)
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._deliver(url, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                trust_env=True,
+            )
+        return self._session
+
+    async def _deliver(self, url: str, batch: list):
+        if is_text_webhook(url):
+            messages = [message for message, _ in batch]
+            batch = [(text, {}) for text in combine_text_messages(url, messages)]
+
+        for message, event_data in batch:
+            try:
+                payload = build_webhook_payload(url, message, event_data)
+            except Exception as e:
+                self._dead_letter(url, message, f"Invalid payload: {e}", 0)
+                continue
+            await self._post(url, message, payload)
+
+    async def _post(self, url: str, message: str, payload: dict) -> bool:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        error = None
+        attempt = 0
+        for attempt in range(1, self.max_retries + 2):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    async with self._get_session().post(url, json=payload) as r:
+                        if r.status < 400:
+                            log.debug(f"webhook delivered: {urlparse(url).netloc}")
+                            return True
+
+                        error = f"HTTP {r.status}: {(await r.text())[:200]}"
+                        if r.status != 429 and r.status < 500:
+                            break
+                        retry_after = r.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt > self.max_retries:
+                break
+
+            delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** (attempt - 1))
+            delay *= random.uniform(0.5, 1.5)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(int(retry_after), self.BACKOFF_MAX))
+            await asyncio.sleep(delay)
+
+        self._dead_letter(url, message, error, attempt)
+        return False
+
+    def _dead_letter(self, url: str, message: str, error: str, attempts: int):
+        # Webhook URLs embed their secret, so only the host is logged
+        log.error(
+            f"webhook dead letter: host={urlparse(url).netloc} attempts={attempts} error={error}"
+        )
+        log.debug(f"webhook dead letter message: {message}")
+
+    async def close(self):
+        """Send everything still queued, then close the HTTP session."""
+        for url in list(self._pending.keys()):
+            self._flush(url)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -13,3 +13,10 @@ except ImportError:
 
 API_KEY = os.getenv("PIPELINES_API_KEY", "0p3n-w3bu!")
 PIPELINES_DIR = os.getenv("PIPELINES_DIR", "./pipelines")
+
+# Streaming pipelines run their blocking generators on the anyio thread pool
+# (40 threads by default). Keep it at least as large as the Bedrock connection
+# pool so burst capacity is bounded by the upstream quota, not by threads.
+THREAD_POOL_SIZE = int(
+    os.getenv("THREAD_POOL_SIZE", os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "100"))
+)
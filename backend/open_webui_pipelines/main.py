@@ -15,11 +15,13 @@ from utils.pipelines.custom_exceptions import RateLimitException
 
 from contextlib import asynccontextmanager
 from concurrent.futures import ThreadPoolExecutor
-from schemas import FilterForm, OpenAIChatCompletionForm
+from schemas import FilterBatchForm, FilterForm, OpenAIChatCompletionForm
 from urllib.parse import urlparse
 
 import shutil
+import asyncio
 import aiohttp
+import anyio
 import os
 import importlib.util
 import time
@@ -29,7 +31,7 @@ import uuid
 import structlog
 from utils.logs import setup_logging, structlog_context_middleware_factory
 
-from config import API_KEY, PIPELINES_DIR
+from config import API_KEY, PIPELINES_DIR, THREAD_POOL_SIZE
 
 if not os.path.exists(PIPELINES_DIR):
     os.makedirs(PIPELINES_DIR)
@@ -96,6 +98,10 @@ def get_all_pipelines():
                         and hasattr(pipeline.valves, "priority")
                         else 0
                     ),
+                    # Commutative filters may run concurrently with their neighbours;
+                    # declaring it promises to only change body keys that the
+                    # neighbouring filters leave alone
+                    "commutative": getattr(pipeline, "commutative", False),
                     "valves": pipeline.valves if hasattr(pipeline, "valves") else None,
                 }
         else:
@@ -211,6 +217,7 @@ async def reload():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
     await on_startup()
     yield
     await on_shutdown()
@@ -271,6 +278,7 @@ async def get_models():
                                 else []
                             ),
                             "priority": pipeline.get("priority", 0),
+                            "commutative": pipeline.get("commutative", False),
                         }
                         if pipeline.get("type", "pipe") == "filter"
                         else {}
@@ -291,6 +299,22 @@ async def get_status():
     return {"status": True}
 
 
+@app.get("/v1/bedrock/metrics")
+@app.get("/bedrock/metrics")
+async def get_bedrock_metrics(user: str = Depends(get_current_user)):
+    if user != API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+        )
+
+    # Imported lazily so the server doesn't assume the Bedrock role unless a
+    # pipeline that needs it has been loaded.
+    from utils.pipelines.aws import bedrock_client_manager
+
+    return bedrock_client_manager.get_metrics()
+
+
 @app.get("/v1/pipelines")
 @app.get("/pipelines")
 async def list_pipelines(user: str = Depends(get_current_user)):
@@ -633,6 +657,44 @@ async def filter_outlet(pipeline_id: str, form_data: FilterForm):
         )
 
 
+async def run_filter_batch(run_filter, form_data: FilterBatchForm):
+    """Runs filters in order on one parsed body, timing each of them.
+
+    A filter that exceeds the timeout is skipped and the chain carries on with
+    the body it was given. Errors raised by a filter end the chain and are
+    returned as they are by the single filter endpoints.
+    """
+    body = form_data.body
+    timings = []
+    for pipeline_id in form_data.filter_ids:
+        start = time.perf_counter()
+        timing = {"id": pipeline_id}
+        try:
+            body = await asyncio.wait_for(
+                run_filter(pipeline_id, FilterForm(body=body, user=form_data.user)),
+                form_data.timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Filter {pipeline_id} timed out, skipping")
+            timing["timed_out"] = True
+        timing["duration"] = round(time.perf_counter() - start, 4)
+        timings.append(timing)
+
+    return {"body": body, "timings": timings}
+
+
+@app.post("/v1/filters/inlet:batch")
+@app.post("/filters/inlet:batch")
+async def filter_inlet_batch(form_data: FilterBatchForm):
+    return await run_filter_batch(filter_inlet, form_data)
+
+
+@app.post("/v1/filters/outlet:batch")
+@app.post("/filters/outlet:batch")
+async def filter_outlet_batch(form_data: FilterBatchForm):
+    return await run_filter_batch(filter_outlet, form_data)
+
+
 @app.post("/v1/chat/completions")
 @app.post("/chat/completions")
 async def generate_openai_chat_completion(form_data: OpenAIChatCompletionForm):
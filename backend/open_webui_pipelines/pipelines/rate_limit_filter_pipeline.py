@@ -8,6 +8,7 @@ import asyncio
 
 from pydantic import BaseModel
 import redis
+import redis.asyncio
 import structlog
 
 from utils.pipelines.custom_exceptions import RateLimitException
@@ -33,6 +34,75 @@ DEFAULT_REQUEST_LIMITS = {
     },
 }
 
+# Length of the sliding window the limits apply to, in seconds.
+RATE_LIMIT_WINDOW = 60
+
+# Users whose count is below this fraction of their limit (while the global count
+# is below the same fraction of the global limit) are admitted from a local cache.
+# Those requests are counted locally and added to Redis in one pipeline every
+# LOCAL_CACHE_TTL seconds, or with the user's next script call if that is sooner.
+LOCAL_HEADROOM_RATIO = float(os.getenv("RATE_LIMIT_LOCAL_HEADROOM_RATIO", "0.5"))
+LOCAL_CACHE_TTL = int(os.getenv("RATE_LIMIT_LOCAL_CACHE_TTL", "5"))
+
+# Checks and increments the user and global counters in one atomic call.
+# Counts are a sliding window approximated from the current and previous fixed
+# windows: previous * (1 - elapsed fraction of the current window) + current.
+#
+# KEYS: user current, user previous, global current, global previous
+# ARGV: user limit, global limit, window seconds, elapsed fraction,
+#       locally admitted requests not yet counted
+# Returns: {blocked (0 = no, 1 = user limit, 2 = global limit),
+#           user count, global count, effective user limit}
+SLIDING_WINDOW_SCRIPT = """
+local user_limit = tonumber(ARGV[1])
+local global_limit = tonumber(ARGV[2])
+local window = tonumber(ARGV[3])
+local weight = 1 - tonumber(ARGV[4])
+local unrecorded = tonumber(ARGV[5])
+
+local function incr(key, amount)
+    redis.call('INCRBY', key, amount)
+    -- Keep each window around for one extra period so it can serve as "previous"
+    if redis.call('TTL', key) < 0 then
+        redis.call('EXPIRE', key, window * 2)
+    end
+end
+
+if unrecorded > 0 then
+    incr(KEYS[1], unrecorded)
+    incr(KEYS[3], unrecorded)
+end
+
+local user_count = tonumber(redis.call('GET', KEYS[1]) or '0')
+    + weight * tonumber(redis.call('GET', KEYS[2]) or '0')
+local global_count = tonumber(redis.call('GET', KEYS[3]) or '0')
+    + weight * tonumber(redis.call('GET', KEYS[4]) or '0')
+
+-- Let users go past their own limit while plenty of global quota is free
+local effective_user_limit = user_limit
+local safe_free_quota = (global_limit - global_count) * 0.25
+if effective_user_limit < safe_free_quota then
+    effective_user_limit = safe_free_quota
+end
+
+local blocked = 0
+if global_count >= global_limit then
+    blocked = 2
+elseif user_count >= effective_user_limit then
+    blocked = 1
+end
+
+if blocked == 0 then
+    incr(KEYS[1], 1)
+    incr(KEYS[3], 1)
+    user_count = user_count + 1
+    global_count = global_count + 1
+end
+
+return {blocked, math.floor(user_count), math.floor(global_count),
+    math.floor(effective_user_limit)}
+"""
+
 
 class Pipeline:
     class Valves(BaseModel):
@@ -110,7 +180,7 @@ class Pipeline:
         try:
             verify_ssl = os.getenv("DEV", "false").lower() == "false"
             logger.info("Redis SSL verification", result=verify_ssl)
-            self.redis_client = redis.Redis(
+            redis_kwargs = dict(
                 host=parsed_url.hostname,
                 port=parsed_url.port if parsed_url.port else 6379,
                 db=0,
@@ -121,20 +191,23 @@ class Pipeline:
                 ssl=verify_ssl,  # Enable SSL/TLS
                 ssl_cert_reqs=None,  # Skip certificate validation, or use 'required' for validation
             )
+            # The blocking client is only used for the connection test below;
+            # requests go through the asyncio client so they never block the loop.
+            test_client = redis.Redis(**redis_kwargs)
 
             # Test Redis connection with simple get/set operations
             test_key = "connection_test_key"
             test_value = "connection_test_value"
 
             # Test set operation
-            set_result = self.redis_client.set(
+            set_result = test_client.set(
                 test_key, test_value, ex=60
             )  # Set with 60 second expiration
             if not set_result:
                 logger.warning("Redis SET test failed")
 
             # Test get operation
-            get_result = self.redis_client.get(test_key)
+            get_result = test_client.get(test_key)
             if get_result != test_value:
                 logger.warning(
                     "Redis GET test failed", expected=test_value, actual=get_result
@@ -145,7 +218,17 @@ class Pipeline:
                 )
 
             # Clean up test key
-            self.redis_client.delete(test_key)
+            test_client.delete(test_key)
+            test_client.close()
+
+            self.redis_client = redis.asyncio.Redis(**redis_kwargs)
+            self.rate_limit_script = self.redis_client.register_script(
+                SLIDING_WINDOW_SCRIPT
+            )
+            self.local_allowances = {}
+            # (user_id, model_id) -> locally admitted requests not yet in Redis
+            self.unrecorded = {}
+            self.flush_task = None
 
             logger.info("Successfully connected to Redis")
         except redis.exceptions.TimeoutError as e:
@@ -159,182 +242,209 @@ class Pipeline:
 
     async def on_startup(self):
         logger.info("on_startup")
-        pass
+        if getattr(self, "redis_client", None) is not None:
+            self.flush_task = asyncio.create_task(self.flush_loop())
 
     async def on_shutdown(self):
         logger.info("on_shutdown")
-        pass
-
-    def get_global_redis_key(self, model_id: str):
+        if getattr(self, "redis_client", None) is not None:
+            if self.flush_task is not None:
+                self.flush_task.cancel()
+                self.flush_task = None
+            await self.flush_unrecorded()
+            await self.redis_client.aclose()
+
+    def get_global_redis_key(self, model_id: str, window: int):
         """Generate Redis keys for global rate limits."""
-        now = int(time.time())
-        key = f"global:{model_id}:rate:minute:{now // 60}"
+        key = f"global:{model_id}:rate:minute:{window}"
         logger.debug("get_global_redis_key", key=key)
         return key
 
-    def get_user_redis_key(self, user_id: str, model_id: str):
+    def get_user_redis_key(self, user_id: str, model_id: str, window: int):
         """Generate Redis keys for user rate limits."""
-        now = int(time.time())
-        key = f"user:{user_id}:{model_id}:rate:minute:{now // 60}"
+        key = f"user:{user_id}:{model_id}:rate:minute:{window}"
         logger.debug("get_user_redis_key", key=key)
         return key
 
-    def get_user_last_blocked_redis_key(self, user_id: str, model_id: str):
-        """Generate Redis keys for user rate limits."""
-        key = f"user:{user_id}:{model_id}:last_blocked"
-        logger.debug("get_user_last_blocked_redis_key", key=key)
-        return key
-
-    def get_rate_limit_info(self, user_id: str, model_id: str):
-        """Get both the current count and remaining TTL for a rate limit key in one request."""
-        user_minute_key = self.get_user_redis_key(user_id, model_id)
-        global_minute_key = self.get_global_redis_key(model_id)
-
-        # Using a pipeline to keep redis traffic down
-        pipe = self.redis_client.pipeline()
-        pipe.get(user_minute_key)
-        pipe.ttl(user_minute_key)
-        pipe.get(global_minute_key)
-        pipe.ttl(global_minute_key)
-        user_count, user_ttl, global_count, global_ttl = pipe.execute()
-
-        user_count = int(user_count or 0)
-        user_key_expires_at = int(time.time()) + user_ttl if user_ttl else None
-        global_count = int(global_count or 0)
-        global_key_expires_at = int(time.time()) + global_ttl if global_ttl else None
-
-        return {
-            "user_count": user_count,
-            "user_key_expires_at": user_key_expires_at,
-            "global_count": global_count,
-            "global_key_expires_at": global_key_expires_at,
-        }
-
-    def set_last_blocked_time(self, user_id: str, model_id: str):
-
-        user_last_blocked_key = self.get_user_last_blocked_redis_key(user_id, model_id)
-
-        rate_limit_info = self.get_rate_limit_info(user_id, model_id)
-        logger.debug("Rate limit", info=rate_limit_info)
+    async def check_and_increment(self, user_id: str, model_id: str):
+        """Atomically check the user and global limits and count the request.
 
-        global_current_count = rate_limit_info["global_count"]
-        user_current_count = rate_limit_info["user_count"]
-        user_key_expires_at = rate_limit_info["user_key_expires_at"]
+        Returns (blocked, user_count, global_count, effective_user_limit), where
+        blocked is 0 when the request was admitted, 1 when the user limit was hit
+        and 2 when the global limit was hit.
+        """
+        now = time.time()
+        window = int(now) // RATE_LIMIT_WINDOW
+        elapsed = (now % RATE_LIMIT_WINDOW) / RATE_LIMIT_WINDOW
+        limits = self.request_limits_dict[model_id]
+        unrecorded = self.unrecorded.pop((user_id, model_id), 0)
 
-        global_limit = self.request_limits_dict[model_id].get("global_limit", 2000)
+        try:
+            blocked, user_count, global_count, effective_user_limit = (
+                await self.rate_limit_script(
+                    keys=[
+                        self.get_user_redis_key(user_id, model_id, window),
+                        self.get_user_redis_key(user_id, model_id, window - 1),
+                        self.get_global_redis_key(model_id, window),
+                        self.get_global_redis_key(model_id, window - 1),
+                    ],
+                    args=[
+                        limits.get("user_limit", 50),
+                        limits.get("global_limit", 2000),
+                        RATE_LIMIT_WINDOW,
+                        elapsed,
+                        unrecorded,
+                    ],
+                )
+            )
+        except Exception:
+            self.record_locally(user_id, model_id, unrecorded)
+            raise
         logger.debug(
-            "global_limit",
+            "Rate limit",
+            user=user_id,
             model=model_id,
-            current_count=global_current_count / global_limit,
+            blocked=blocked,
+            user_count=user_count,
+            global_count=global_count,
+            effective_user_limit=effective_user_limit,
         )
-        safe_free_quota = (global_limit - global_current_count) * 0.25
-        logger.debug("safe_free_quota", safe_free_quota=safe_free_quota)
 
-        user_limit = self.request_limits_dict[model_id].get("user_limit", 50)
-        logger.debug(
-            "user_limit",
-            user=user_id,
-            model=model_id,
-            current_count=user_current_count / user_limit,
+        self.update_local_allowance(
+            user_id,
+            model_id,
+            blocked,
+            user_count,
+            global_count,
+            effective_user_limit,
+            limits.get("global_limit", 2000),
         )
+        return int(blocked), int(user_count), int(global_count), effective_user_limit
+
+    def update_local_allowance(
+        self,
+        user_id: str,
+        model_id: str,
+        blocked: int,
+        user_count: int,
+        global_count: int,
+        effective_user_limit: int,
+        global_limit: int,
+    ):
+        """Remember how many requests a user can clearly make without asking Redis."""
+        key = (user_id, model_id)
+        if blocked or global_count >= global_limit * LOCAL_HEADROOM_RATIO:
+            self.local_allowances.pop(key, None)
+            return
 
-        original_user_limit = user_limit
-        if user_limit < safe_free_quota:
-            user_limit = safe_free_quota
-        logger.debug("Adjusted user limit", limit=user_limit)
-
-        if user_current_count >= user_limit:
-            logger.warning(
-                "User rate limit exceeded",
-                user=user_id,
-                model=model_id,
-                current_count=user_current_count / user_limit,
-            )
-            current_time = int(time.time())
-            self.redis_client.set(user_last_blocked_key, current_time)
-            last_period_start_time = user_key_expires_at - 60
-            return (
-                True,
-                f"You've exceeded your limit of {original_user_limit}"
-                + f" requests since {last_period_start_time}",
-                last_period_start_time,
-            )
+        allowance = int(effective_user_limit * LOCAL_HEADROOM_RATIO) - user_count
+        if allowance > 0:
+            self.local_allowances[key] = (time.time() + LOCAL_CACHE_TTL, allowance)
+        else:
+            self.local_allowances.pop(key, None)
+
+    def take_local_allowance(self, user_id: str, model_id: str) -> bool:
+        key = (user_id, model_id)
+        entry = self.local_allowances.get(key)
+        if not entry:
+            return False
+
+        expires_at, allowance = entry
+        if expires_at < time.time() or allowance <= 0:
+            self.local_allowances.pop(key, None)
+            return False
+
+        self.local_allowances[key] = (expires_at, allowance - 1)
+        return True
+
+    def record_locally(self, user_id: str, model_id: str, count: int = 1):
+        """Count requests admitted without Redis until the next flush."""
+        if count > 0:
+            key = (user_id, model_id)
+            self.unrecorded[key] = self.unrecorded.get(key, 0) + count
+
+    async def flush_unrecorded(self):
+        """Add the locally admitted requests to the Redis counters in one pipeline.
+
+        Requests are counted in the window they are flushed in, which can be
+        the one after they were admitted when a flush straddles a boundary.
+        """
+        if not self.unrecorded:
+            return
 
-        return False, None, None
+        unrecorded, self.unrecorded = self.unrecorded, {}
+        window = int(time.time()) // RATE_LIMIT_WINDOW
+        global_counts = {}
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for (user_id, model_id), count in unrecorded.items():
+                key = self.get_user_redis_key(user_id, model_id, window)
+                pipe.incrby(key, count)
+                pipe.expire(key, RATE_LIMIT_WINDOW * 2)
+                global_counts[model_id] = global_counts.get(model_id, 0) + count
+            for model_id, count in global_counts.items():
+                key = self.get_global_redis_key(model_id, window)
+                pipe.incrby(key, count)
+                pipe.expire(key, RATE_LIMIT_WINDOW * 2)
 
-    def is_rate_limited(self, user_id: str, model_id: str) -> bool:
+            try:
+                await pipe.execute()
+            except Exception as e:
+                logger.exception("Redis error when recording requests", exc_info=e)
+                for (user_id, model_id), count in unrecorded.items():
+                    self.record_locally(user_id, model_id, count)
+
+    async def flush_loop(self):
+        while True:
+            await asyncio.sleep(LOCAL_CACHE_TTL)
+            await self.flush_unrecorded()
+
+    async def is_rate_limited(self, user_id: str, model_id: str):
         logger.debug("Checking rate limits", user=user_id, model=model_id)
         if model_id not in self.models:
             logger.warning("Model not found in request limits", model=model_id)
-            return False, None
+            return False, None, None
 
-        logger.debug(
-            "Model found, checking rate limits for user", model=model_id, user=user_id
-        )
-        user_last_blocked_key = self.get_user_last_blocked_redis_key(user_id, model_id)
+        if self.take_local_allowance(user_id, model_id):
+            logger.debug("User clearly under limit", user=user_id, model=model_id)
+            self.record_locally(user_id, model_id)
+            return False, None, None
 
         try:
-            user_last_blocked_time = self.redis_client.get(user_last_blocked_key)
-            logger.debug(
-                "User last blocked time",
-                user=user_id,
-                last_blocked_time=user_last_blocked_time,
-            )
+            blocked, _, _, _ = await self.check_and_increment(user_id, model_id)
         except redis.exceptions.TimeoutError as e:
             logger.exception(
-                "Redis operation timed out when checking last blocked time", exc_info=e
+                "Redis operation timed out when checking rate limits", exc_info=e
             )
             # Return a default/safe value instead of failing
             return False, None, None
         except Exception as e:
-            logger.exception("Redis error when checking last blocked time", exc_info=e)
+            logger.exception("Redis error when checking rate limits", exc_info=e)
             return False, None, None
 
-        if (
-            user_last_blocked_time
-            and int(user_last_blocked_time) > int(time.time()) - 60
-        ):
-            logger.warning(
-                "User was blocked less than 60 seconds ago",
-                user=user_id,
-                model=model_id,
+        if not blocked:
+            logger.debug(
+                "Proceeding without blocking user", user=user_id, model=model_id
             )
-            return self.set_last_blocked_time(user_id, model_id)
-
-        logger.debug("Proceeding without blocking user", user=user_id, model=model_id)
-        return False, None, None
-
-    async def log_request(self, user_id: str, model_id: str):
-        logger.debug("Logging request", user=user_id, model=model_id)
-        minute_key = self.get_user_redis_key(user_id, model_id)
-        new_user_count = self.redis_client.incr(minute_key)
-        logger.debug(
-            "Incremented user request count",
-            new_user_count=new_user_count,
-            key=minute_key,
-        )
-
-        expiry_result = self.redis_client.expire(minute_key, 60, nx=True)
-        logger.debug(
-            "Set expiry on user key", minute_key=minute_key, expiry_result=expiry_result
-        )
+            return False, None, None
 
-        # Log global request
-        global_key = self.get_global_redis_key(model_id)
-        new_global_count = self.redis_client.incr(global_key)
-        logger.debug(
-            "Incremented global request count",
-            new_global_count=new_global_count,
-            key=global_key,
-        )
+        last_period_start_time = int(time.time()) - RATE_LIMIT_WINDOW
+        if blocked == 2:
+            logger.warning("Global rate limit exceeded", user=user_id, model=model_id)
+            return (
+                True,
+                "This model has reached its request limit"
+                + f" since {last_period_start_time}",
+                last_period_start_time,
+            )
 
-        expiry_result = self.redis_client.expire(global_key, 60, nx=True)
-        logger.debug(
-            "Set expiry on global key",
-            global_key=global_key,
-            expiry_result=expiry_result,
+        original_user_limit = self.request_limits_dict[model_id].get("user_limit", 50)
+        logger.warning("User rate limit exceeded", user=user_id, model=model_id)
+        return (
+            True,
+            f"You've exceeded your limit of {original_user_limit}"
+            + f" requests since {last_period_start_time}",
+            last_period_start_time,
         )
-        _, _, _ = self.set_last_blocked_time(user_id, model_id)
 
     async def inlet(self, body: dict, user: Optional[dict] = None) -> dict:
 
@@ -343,17 +453,16 @@ class Pipeline:
         model_id = body["model"]
 
         logger.debug("Processing inlet request", user_id=user_id, model=model_id)
-        limited, msg, last_period_start_time = self.is_rate_limited(user_id, model_id)
+        limited, msg, last_period_start_time = await self.is_rate_limited(
+            user_id, model_id
+        )
         if limited:
             logger.error(f"Rate limit check failed with msg: {msg}")
             raise RateLimitException(
                 msg,
                 requests_limit=self.request_limits_dict[model_id].get("user_limit", 50),
-                requests_period=60,
+                requests_period=RATE_LIMIT_WINDOW,
                 last_period_start_time=last_period_start_time,
             )
 
-        logger.debug("Logging request in bg task...")
-        asyncio.create_task(self.log_request(user_id, model_id))
-
         return body
@@ -35,3 +35,11 @@ class FilterForm(BaseModel):
     body: dict
     user: Optional[dict] = None
     model_config = ConfigDict(extra="allow")
+
+
+class FilterBatchForm(BaseModel):
+    filter_ids: List[str]
+    body: dict
+    user: Optional[dict] = None
+    timeout: Optional[float] = None
+    model_config = ConfigDict(extra="allow")
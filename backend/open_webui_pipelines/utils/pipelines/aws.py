@@ -1,16 +1,36 @@
 import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
 import boto3
 from botocore.credentials import RefreshableCredentials
 from botocore.session import get_session
 
 from botocore.config import Config
 from dotenv import load_dotenv
+import structlog
 
 load_dotenv()
 
+logger = structlog.get_logger(__name__)
+
 AWS_DEFAULT_REGION = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
 ROLE_ARN = os.getenv("BEDROCK_ASSUME_ROLE", None)
 
+# Size the connection pool to the Bedrock concurrency quota, not the botocore
+# default of 10, so bursts don't queue for a free connection.
+BEDROCK_MAX_POOL_CONNECTIONS = int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "100"))
+
+# Assumed-role credentials last 15 minutes. The background refresher renews them
+# this many seconds before they expire, well before botocore would block a request
+# on its own refresh.
+CREDENTIALS_DURATION_SECONDS = 900
+CREDENTIALS_REFRESH_MARGIN_SECONDS = int(
+    os.getenv("BEDROCK_CREDENTIALS_REFRESH_MARGIN_SECONDS", "300")
+)
+
 
 def refreshable_session(
     role_arn, session_name="AssumeRoleSession", region_name=AWS_DEFAULT_REGION
@@ -21,7 +41,7 @@ def refreshable_session(
         response = sts_client.assume_role(
             RoleArn=role_arn,
             RoleSessionName=session_name,
-            DurationSeconds=900,  # 15 minutes
+            DurationSeconds=CREDENTIALS_DURATION_SECONDS,
         )
         credentials = response["Credentials"]
         return {
@@ -36,19 +56,165 @@ def refreshable_session(
     refreshable_credentials = RefreshableCredentials.create_from_metadata(
         metadata=refresh(), refresh_using=refresh, method="sts-assume-role"
     )
+    # botocore's defaults (15 / 10 minutes) are longer than the credential
+    # lifetime, which would make every request try to refresh inline. Only fall
+    # back to an inline refresh if the background refresher has fallen behind.
+    refreshable_credentials._advisory_refresh_timeout = 60
+    refreshable_credentials._mandatory_refresh_timeout = 30
 
     botocore_session._credentials = refreshable_credentials
     botocore_session.set_config_variable("region", region_name)
 
-    return boto3.Session(botocore_session=botocore_session)
+    return boto3.Session(botocore_session=botocore_session), refreshable_credentials
 
 
 retry_config = Config(
     retries={
         "max_attempts": 5,  # Maximum number of retry attempts
         "mode": "standard",  # Retry mode: 'standard' or 'adaptive'
-    }
+    },
+    max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
 )
 
-session = refreshable_session(ROLE_ARN)
-bedrock_client = session.client("bedrock-runtime", config=retry_config)
+
+class BedrockClientManager:
+    """Owns the shared Bedrock runtime client.
+
+    The client is created once with a connection pool sized by
+    BEDROCK_MAX_POOL_CONNECTIONS, assumed-role credentials are renewed by a
+    daemon thread before they expire, and per-model call counts and latencies are
+    collected from botocore events.
+    """
+
+    def __init__(
+        self,
+        role_arn=ROLE_ARN,
+        region_name=AWS_DEFAULT_REGION,
+        config=retry_config,
+    ):
+        self.credentials = None
+        if role_arn:
+            session, self.credentials = refreshable_session(
+                role_arn, region_name=region_name
+            )
+        else:
+            logger.warning("BEDROCK_ASSUME_ROLE not set, using default credentials")
+            session = boto3.Session(region_name=region_name)
+
+        self.client = session.client("bedrock-runtime", config=config)
+        self.max_pool_connections = config.max_pool_connections
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = defaultdict(
+            lambda: {
+                "requests": 0,
+                "errors": 0,
+                "in_flight": 0,
+                "total_response_time_ms": 0.0,
+            }
+        )
+        events = self.client.meta.events
+        events.register("provide-client-params.bedrock-runtime.*", self._on_request)
+        events.register("after-call.bedrock-runtime.*", self._on_response)
+        events.register("after-call-error.bedrock-runtime.*", self._on_error)
+
+        self._stop = threading.Event()
+        self._refresher = None
+        if self.credentials is not None:
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name="bedrock-credentials", daemon=True
+            )
+            self._refresher.start()
+
+    def get_client(self):
+        return self.client
+
+    ####################################
+    # Credentials
+    ####################################
+
+    def _seconds_until_refresh(self) -> float:
+        expiry_time = self.credentials._expiry_time
+        remaining = (expiry_time - datetime.now(timezone.utc)).total_seconds()
+        return remaining - CREDENTIALS_REFRESH_MARGIN_SECONDS
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            wait = self._seconds_until_refresh()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+
+            try:
+                with self.credentials._refresh_lock:
+                    self.credentials._protected_refresh(is_mandatory=True)
+                logger.info(
+                    "Refreshed Bedrock credentials",
+                    expiry_time=self.credentials._expiry_time.isoformat(),
+                )
+            except Exception as e:
+                logger.exception("Failed to refresh Bedrock credentials", exc_info=e)
+                # Requests still refresh inline once the mandatory timeout is hit
+                self._stop.wait(10)
+
+    def stop(self):
+        self._stop.set()
+
+    ####################################
+    # Metrics
+    ####################################
+
+    def _on_request(self, params, context, **kwargs):
+        model_id = params.get("modelId", "unknown")
+        context["bedrock_model_id"] = model_id
+        context["bedrock_start_time"] = time.perf_counter()
+        with self._metrics_lock:
+            self._metrics[model_id]["requests"] += 1
+            self._metrics[model_id]["in_flight"] += 1
+
+    def _finish(self, context, error: bool):
+        model_id = context.get("bedrock_model_id")
+        if model_id is None:
+            return
+        elapsed = (time.perf_counter() - context["bedrock_start_time"]) * 1000
+        with self._metrics_lock:
+            metrics = self._metrics[model_id]
+            metrics["in_flight"] -= 1
+            metrics["total_response_time_ms"] += elapsed
+            if error:
+                metrics["errors"] += 1
+
+    def _on_response(self, http_response, context, **kwargs):
+        self._finish(context, error=http_response.status_code >= 400)
+
+    def _on_error(self, context, **kwargs):
+        self._finish(context, error=True)
+
+    def get_metrics(self) -> dict:
+        """Per-model counters; in_flight counts calls still waiting for response headers."""
+        with self._metrics_lock:
+            models = {}
+            for model_id, metrics in self._metrics.items():
+                completed = metrics["requests"] - metrics["in_flight"]
+                models[model_id] = {
+                    "requests": metrics["requests"],
+                    "errors": metrics["errors"],
+                    "in_flight": metrics["in_flight"],
+                    "avg_response_time_ms": (
+                        metrics["total_response_time_ms"] / completed
+                        if completed
+                        else None
+                    ),
+                }
+
+        return {
+            "max_pool_connections": self.max_pool_connections,
+            "credentials_expiry_time": (
+                self.credentials._expiry_time.isoformat() if self.credentials else None
+            ),
+            "models": models,
+        }
+
+
+bedrock_client_manager = BedrockClientManager()
+bedrock_client = bedrock_client_manager.get_client()
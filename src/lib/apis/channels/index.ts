@@ -39,11 +39,20 @@ export const deleteChannelById = async (channel_id: string) => {
 
 export const getChannelMessages = async (
 	channel_id: string,
-	skip: number = 0,
-	limit: number = 50
+	before: number | null = null,
+	limit: number = 50,
+	beforeId: string | null = null
 ) => {
+	const searchParams = new URLSearchParams({ limit: `${limit}` });
+	if (before !== null) {
+		searchParams.append('before', `${before}`);
+	}
+	if (beforeId !== null) {
+		searchParams.append('before_id', beforeId);
+	}
+
 	return await apiFetch(
-		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?skip=${skip}&limit=${limit}`,
+		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?${searchParams.toString()}`,
 		{
 			method: 'GET'
 		}